@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks of single checks across frame sizes, dtypes, column counts and failure rates.
+
+`Scaling` goes up to 10**8 rows, so it needs several GB of memory.
+
+"""
+import numpy as np
+
+import bulwark.checks as ck
+from bulwark.generic import bad_locations
+
+from .common import DTYPES, failing_rows, make_frame, run
+
+ROWS = [10 ** 3, 10 ** 5, 10 ** 7]
+FAILURE_RATES = [0, 0.001, 0.1]
+
+
+class Scaling(object):
+    """How has_no_nans scales with rows on a single float column, up to 10**8 rows."""
+    params = [[10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7, 10 ** 8]]
+    param_names = ["n_rows"]
+    timeout = 600
+
+    def setup(self, n_rows):
+        self.df = make_frame(n_rows)
+
+    def time_has_no_nans(self, n_rows):
+        ck.has_no_nans(self.df)
+
+    def peakmem_has_no_nans(self, n_rows):
+        ck.has_no_nans(self.df)
+
+
+class HasNoX(object):
+    params = [ROWS, [1, 20], ["int64", "float64", "object"], FAILURE_RATES]
+    param_names = ["n_rows", "n_cols", "dtype", "failure_rate"]
+    timeout = 300
+
+    def setup(self, n_rows, n_cols, dtype, failure_rate):
+        self.df = make_frame(n_rows, n_cols, dtype)
+        if failure_rate:
+            self.df = self.df.astype("float64" if dtype == "int64" else dtype)
+            self.df.iloc[failing_rows(n_rows, failure_rate), -1] = np.nan
+
+    def time_has_no_nans(self, n_rows, n_cols, dtype, failure_rate):
+        run(ck.has_no_nans, self.df)
+
+    def time_has_no_x(self, n_rows, n_cols, dtype, failure_rate):
+        run(ck.has_no_x, self.df, values=[-1, "missing"])
+
+    def peakmem_has_no_nans(self, n_rows, n_cols, dtype, failure_rate):
+        run(ck.has_no_nans, self.df)
+
+
+class IsMonotonic(object):
+    params = [ROWS, DTYPES[:3], FAILURE_RATES, [False, True]]
+    param_names = ["n_rows", "dtype", "failure_rate", "strict"]
+    timeout = 300
+
+    def setup(self, n_rows, dtype, failure_rate, strict):
+        self.df = make_frame(n_rows, 1, dtype)
+        rows = failing_rows(n_rows, failure_rate)
+        # Swapping a row with the next breaks monotonicity there
+        rows = rows[rows < n_rows - 1]
+        values = self.df["c0"].to_numpy().copy()
+        values[rows], values[rows + 1] = values[rows + 1], values[rows]
+        self.df["c0"] = values
+
+    def time_is_monotonic(self, n_rows, dtype, failure_rate, strict):
+        run(ck.is_monotonic, self.df, increasing=True, strict=strict)
+
+    def peakmem_is_monotonic(self, n_rows, dtype, failure_rate, strict):
+        run(ck.is_monotonic, self.df, increasing=True, strict=strict)
+
+
+class HasValsWithinNStd(object):
+    params = [ROWS, [1, 20], FAILURE_RATES, [None, 2 ** 20]]
+    param_names = ["n_rows", "n_cols", "failure_rate", "memory_budget"]
+    timeout = 300
+
+    def setup(self, n_rows, n_cols, failure_rate, memory_budget):
+        rng = np.random.RandomState(42)
+        self.df = make_frame(n_rows, n_cols)
+        self.df[:] = rng.randn(n_rows, n_cols)
+        self.df.iloc[failing_rows(n_rows, failure_rate), 0] = 100.
+
+    def time_has_vals_within_n_std(self, n_rows, n_cols, failure_rate, memory_budget):
+        run(ck.has_vals_within_n_std, self.df, n=5, memory_budget=memory_budget)
+
+    def peakmem_has_vals_within_n_std(self, n_rows, n_cols, failure_rate, memory_budget):
+        run(ck.has_vals_within_n_std, self.df, n=5, memory_budget=memory_budget)
+
+
+class HasValsWithinSet(object):
+    params = [ROWS, ["object", "category"], [10, 10 ** 4]]
+    param_names = ["n_rows", "dtype", "n_allowed"]
+    timeout = 300
+
+    def setup(self, n_rows, dtype, n_allowed):
+        self.df = make_frame(n_rows, 1, "category").astype({"c0": dtype})
+        self.items = {"c0": list(range(100)) + list(range(-n_allowed, 0))}
+
+    def time_has_vals_within_set(self, n_rows, dtype, n_allowed):
+        run(ck.has_vals_within_set, self.df, self.items)
+
+
+class IsSameAs(object):
+    params = [ROWS, ["int64", "float64", "object"], FAILURE_RATES, [False, True]]
+    param_names = ["n_rows", "dtype", "failure_rate", "fast"]
+    timeout = 300
+
+    def setup(self, n_rows, dtype, failure_rate, fast):
+        self.df = make_frame(n_rows, 5, dtype)
+        self.other = self.df.copy()
+        self.other.iloc[failing_rows(n_rows, failure_rate), -1] = self.df.iloc[0, -1]
+
+    def time_is_same_as(self, n_rows, dtype, failure_rate, fast):
+        run(ck.is_same_as, self.df, self.other, fast=fast)
+
+    def peakmem_is_same_as(self, n_rows, dtype, failure_rate, fast):
+        run(ck.is_same_as, self.df, self.other, fast=fast)
+
+
+class Uniqueness(object):
+    """Exact uniqueness checks against their sketch-based counterparts."""
+    params = [ROWS, ["int64", "object"], ["unique", "approx_unique"]]
+    param_names = ["n_rows", "dtype", "check"]
+    timeout = 300
+
+    def setup(self, n_rows, dtype, check):
+        self.df = make_frame(n_rows, 1, dtype)
+        self.check = getattr(ck, check)
+
+    def time_check(self, n_rows, dtype, check):
+        run(self.check, self.df)
+
+    def peakmem_check(self, n_rows, dtype, check):
+        run(self.check, self.df)
+
+
+class BadLocations(object):
+    params = [ROWS, [1, 20], FAILURE_RATES, [None, 100]]
+    param_names = ["n_rows", "n_cols", "failure_rate", "max_locations"]
+    timeout = 300
+
+    def setup(self, n_rows, n_cols, failure_rate, max_locations):
+        self.mask = make_frame(n_rows, n_cols, "int64") < 0
+        self.mask.iloc[failing_rows(n_rows, failure_rate), :] = True
+
+    def time_bad_locations(self, n_rows, n_cols, failure_rate, max_locations):
+        bad_locations(self.mask, max_locations=max_locations)
+
+    def peakmem_bad_locations(self, n_rows, n_cols, failure_rate, max_locations):
+        bad_locations(self.mask, max_locations=max_locations)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Data generators shared by the benchmarks."""
+import numpy as np
+import pandas as pd
+
+DTYPES = ["int64", "float64", "datetime64[ns]", "object", "category"]
+
+
+def make_column(n_rows, dtype, rng):
+    """Makes a column of `dtype` with increasing values (so it's monotonic and unique)."""
+    values = np.arange(n_rows)
+    if dtype == "int64":
+        return values
+    if dtype == "float64":
+        return values + rng.rand(n_rows) / 2
+    if dtype == "datetime64[ns]":
+        return pd.Timestamp("2000-01-01") + pd.to_timedelta(values, unit="s")
+    if dtype == "object":
+        return pd.Index(values).astype(str).str.zfill(10)
+    if dtype == "category":
+        return pd.Categorical(values % 100)
+    raise ValueError(dtype)
+
+
+def make_frame(n_rows, n_cols=1, dtype="float64", seed=42):
+    """Makes a pd.DataFrame of `n_cols` columns of `dtype`."""
+    rng = np.random.RandomState(seed)
+    return pd.DataFrame({"c{}".format(i): make_column(n_rows, dtype, rng)
+                         for i in range(n_cols)})
+
+
+def failing_rows(n_rows, failure_rate, seed=0):
+    """Positions of a `failure_rate` fraction of `n_rows` rows, spread evenly at random."""
+    n_failing = int(round(n_rows * failure_rate))
+    return np.sort(np.random.RandomState(seed).choice(n_rows, n_failing, replace=False))
+
+
+def run(check, *args, **kwargs):
+    """Calls `check`, ignoring failures, which are part of what's being timed."""
+    try:
+        check(*args, **kwargs)
+    except AssertionError:
+        pass
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks of the overhead decorators add to the functions they decorate."""
+import bulwark.decorators as dc
+
+from .common import make_frame
+
+
+class DecoratorOverhead(object):
+    """Calls on a tiny frame, so the time is dominated by the wrapper rather than the check."""
+    params = [["none", "enabled", "disabled", "sample_every", "cache"]]
+    param_names = ["decorator"]
+
+    def setup(self, decorator):
+        from bulwark.cache import ResultCache
+
+        df = make_frame(10)
+        options = {"none": None,
+                   "enabled": {},
+                   "disabled": {"enabled": False},
+                   "sample_every": {"sample_every": 100},
+                   "cache": {"cache": ResultCache()}}[decorator]
+
+        def load():
+            return df
+
+        self.load = load if options is None else dc.HasNoNans(**options)(load)
+
+    def time_call(self, decorator):
+        self.load()
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks of import time, each in a fresh interpreter."""
+
+
+class Import(object):
+    def timeraw_import_bulwark(self):
+        return "import bulwark"
+
+    def timeraw_import_decorators(self):
+        return "import bulwark.decorators"
+
+    def timeraw_decorate(self):
+        return """
+        import bulwark.decorators as dc
+
+        @dc.HasNoNans()
+        def load():
+            pass
+        """
+
+    def timeraw_import_checks(self):
+        return "import bulwark.checks"
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks of fused vs. one-check-at-a-time execution of `multi_check`."""
+import numpy as np
+import pandas as pd
+
+import bulwark.checks as ck
+
+
+class MultiCheck(object):
+    params = [[10 ** 5, 10 ** 6, 10 ** 7], [False, True]]
+    param_names = ["n_rows", "fused"]
+
+    def setup(self, n_rows, fused):
+        rng = np.random.RandomState(42)
+        self.df = pd.DataFrame({"a": rng.randint(0, 100, n_rows),
+                                "b": rng.randn(n_rows),
+                                "c": rng.rand(n_rows),
+                                "d": rng.choice(["x", "y", "z"], n_rows)})
+        self.checks = {ck.has_no_nans: {},
+                       ck.has_no_infs: {"columns": ["b", "c"]},
+                       ck.has_no_neg_infs: {"columns": ["b", "c"]},
+                       ck.has_vals_within_range: {"items": {"a": (0, 100), "c": (0, 1)}},
+                       ck.has_vals_within_set: {"items": {"d": ["x", "y", "z"]}},
+                       ck.has_set_within_vals: {"items": {"d": ["x", "y"]}},
+                       ck.is_shape: {"shape": (n_rows, 4)}}
+
+    def time_multi_check(self, n_rows, fused):
+        ck.multi_check(self.df, self.checks, fused=fused)
+
+    def peakmem_multi_check(self, n_rows, fused):
+        ck.multi_check(self.df, self.checks, fused=fused)
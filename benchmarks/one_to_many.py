@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks of `one_to_many` across key cardinalities."""
+import numpy as np
+import pandas as pd
+
+import bulwark.checks as ck
+
+
+class OneToMany(object):
+    params = [[10 ** 6], [10, 10 ** 3, 10 ** 5, 10 ** 6]]
+    param_names = ["n_rows", "n_keys"]
+
+    def setup(self, n_rows, n_keys):
+        rng = np.random.RandomState(42)
+        many = rng.randint(0, n_keys, n_rows)
+        self.df = pd.DataFrame({"many": many, "unit": many % 97})
+        self.df_bad = self.df.copy()
+        self.df_bad.loc[::1000, "unit"] = -1
+
+    def time_one_to_many(self, n_rows, n_keys):
+        ck.one_to_many(self.df, "unit", "many")
+
+    def time_one_to_many_failing(self, n_rows, n_keys):
+        try:
+            ck.one_to_many(self.df_bad, "unit", "many")
+        except AssertionError:
+            pass
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Validation in background threads, for latency-sensitive code paths.
+
+Decorators given ``background=`` return the decorated function's pd.DataFrame right away,
+and hand it to a `BackgroundValidator`, whose worker threads check it shortly afterwards.
+Failures are reported to a callback, or logged, rather than raised.
+
+The queue of frames waiting to be checked is bounded. Once it's full, further frames either
+wait for a free slot (backpressure) or are dropped, and counted.
+Frames must not be modified after they're returned, until they've been checked.
+
+Examples:
+    >>> import bulwark.decorators as dc
+    >>> import pandas as pd
+    >>> from bulwark.background import BackgroundValidator
+    >>> failures = []
+    >>> validator = BackgroundValidator(callback=lambda e, label: failures.append(label))
+    >>> @dc.HasNoNans(background=validator)
+    ... def load():
+    ...     return pd.DataFrame({'a': [1, None]})
+    >>> df = load()
+    >>> validator.flush()
+    True
+    >>> failures
+    ['load']
+    >>> validator.shutdown()
+
+"""
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_default = None
+_default_lock = threading.Lock()
+
+
+class BackgroundValidator(object):
+    """A bounded pool of threads that run checks off the calling thread.
+
+    Args:
+        n_workers (int): Number of worker threads.
+        max_queue (int): Maximum number of checks waiting for a worker.
+        on_full (str): What happens to a check submitted while the queue is full:
+                       "block" waits for a free slot, "drop" discards it.
+        callback (function): Called with the error (usually an AssertionError) and the label
+                             of each failing check, in a worker thread.
+                             Default is to log failures to the ``bulwark.background`` logger.
+
+    Attributes:
+        n_checked (int): Number of checks run.
+        n_failed (int): Number of checks that failed.
+        n_dropped (int): Number of checks dropped because the queue was full.
+
+    """
+
+    def __init__(self, n_workers=1, max_queue=100, on_full="block", callback=None):
+        if on_full not in ("block", "drop"):
+            raise ValueError('`on_full` must be "block" or "drop".')
+        if n_workers < 1:
+            raise ValueError("`n_workers` must be a positive integer.")
+
+        self.on_full = on_full
+        self.callback = callback
+        self.n_checked = self.n_failed = self.n_dropped = 0
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._n_pending = 0
+        self._done = threading.Condition()
+        self._closed = False
+        self._workers = [threading.Thread(target=self._work, daemon=True,
+                                          name="bulwark-background-{}".format(i))
+                         for i in range(n_workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, check, df, label=None):
+        """Queues ``check(df)`` to be run by a worker.
+
+        Args:
+            check (function): Raises an AssertionError if `df` is invalid.
+            df (pd.DataFrame): Any pd.DataFrame.
+            label (str): Reported with failures, e.g. the name of the decorated function.
+
+        Returns:
+            Whether the check was queued, rather than dropped.
+
+        """
+        if self._closed:
+            raise RuntimeError("BackgroundValidator has been shut down.")
+
+        with self._done:
+            self._n_pending += 1
+        try:
+            self._queue.put((check, df, label), block=self.on_full == "block")
+        except queue.Full:
+            with self._done:
+                self._n_pending -= 1
+                self.n_dropped += 1
+                self._done.notify_all()
+            return False
+        return True
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            check, df, label = job
+            error = None
+            try:
+                check(df)
+            except Exception as e:
+                error = e
+            # Don't keep the frame alive while waiting for the next one
+            del job, df
+
+            if error is not None:
+                self._report(error, label)
+            with self._done:
+                self.n_checked += 1
+                self.n_failed += error is not None
+                self._n_pending -= 1
+                self._done.notify_all()
+
+    def _report(self, error, label):
+        if self.callback is None:
+            logger.warning("Background check of %s failed: %s", label, error)
+            return
+        try:
+            self.callback(error, label)
+        except Exception:
+            logger.exception("Background validation callback failed")
+
+    def flush(self, timeout=None):
+        """Waits for all submitted checks to finish.
+
+        Args:
+            timeout (float or None): Maximum number of seconds to wait. None waits indefinitely.
+
+        Returns:
+            Whether all checks finished within `timeout`.
+
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._done:
+            while self._n_pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._done.wait(remaining)
+        return True
+
+    def shutdown(self, wait=True):
+        """Stops the workers, after they've run the checks already submitted if `wait`."""
+        if self._closed:
+            return
+        self._closed = True
+        if wait:
+            self.flush()
+        for _ in self._workers:
+            try:
+                self._queue.put(None, block=wait)
+            except queue.Full:  # Workers are daemons, so they don't keep the process alive
+                break
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+
+def default_validator():
+    """The BackgroundValidator used by decorators given ``background=True``.
+
+    It has a single worker, blocks once 100 checks are waiting and logs failures.
+
+    """
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = BackgroundValidator()
+        return _default
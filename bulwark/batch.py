@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Validation of data split into many partitions, e.g. daily batches, across a process pool.
+
+Each partition is validated in a worker process with a `bulwark.streaming.StreamValidator`,
+and the workers' validators are merged in partition order. So cross-row checks
+(e.g. `unique` or `is_monotonic`) hold across all partitions, as if they were one pd.DataFrame.
+If approximate checks like `approx_unique` flag values they can't count exactly, the
+partitions are read a second time to count them (see `StreamValidator.confirm`).
+
+Partitions can be file paths, which workers read themselves, or pd.DataFrames.
+On Python 3.8+, the numeric columns of pd.DataFrames are passed to workers through
+shared memory, rather than being pickled through a pipe.
+
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from bulwark.streaming import StreamValidator
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+
+_READERS = {".csv": pd.read_csv,
+            ".feather": pd.read_feather,
+            ".parquet": pd.read_parquet,
+            ".pickle": pd.read_pickle,
+            ".pkl": pd.read_pickle}
+
+
+def read_partition(path):
+    """Reads a partition from `path`, based on its file extension."""
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext not in _READERS:
+        raise ValueError("Can't tell how to read {}. Pass a `reader`.".format(path))
+    return _READERS[ext](path)
+
+
+class SharedFrame(object):
+    """A pd.DataFrame whose numeric columns are stored in a shared memory block.
+
+    Pickling a SharedFrame only pickles the block's name, the layout of the columns and the
+    other (e.g. object) columns, so it's cheap to send to another process.
+    The process that created it has to call `unlink` once it's no longer needed.
+
+    Args:
+        df (pd.DataFrame): Any pd.DataFrame.
+
+    """
+
+    def __init__(self, df):
+        positions = [i for i, dtype in enumerate(df.dtypes) if _is_shareable(dtype)]
+        arrays = [df.iloc[:, i].to_numpy() for i in positions]
+
+        self.columns = df.columns
+        self.index = df.index
+        index_shareable = not isinstance(df.index, (pd.RangeIndex, pd.MultiIndex))
+        if index_shareable and _is_shareable(df.index.dtype):
+            # Only the name is pickled, the values go in the shared block like a column
+            self.index = pd.Index([], dtype=df.index.dtype, name=df.index.name)
+            positions.append(None)
+            arrays.append(df.index.to_numpy())
+        self.n_rows = len(df)
+        self.others = {i: df.iloc[:, i].array for i in range(df.shape[1]) if i not in positions}
+        self.layout = []
+
+        offset = 0
+        for i, arr in zip(positions, arrays):
+            self.layout.append((i, arr.dtype.str, offset))
+            offset += arr.nbytes
+        self._shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self.name = self._shm.name
+        for (i, dtype, offset), arr in zip(self.layout, arrays):
+            self._view(self._shm, dtype, offset)[:] = arr
+
+    def _view(self, shm, dtype, offset):
+        return np.ndarray(self.n_rows, dtype=dtype, buffer=shm.buf, offset=offset)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_shm"]
+        return state
+
+    def to_frame(self):
+        """Rebuilds the pd.DataFrame, copying its numeric columns out of shared memory."""
+        shm = shared_memory.SharedMemory(name=self.name)
+        try:
+            columns = dict(self.others)
+            for i, dtype, offset in self.layout:
+                columns[i] = self._view(shm, dtype, offset)
+            index = self.index
+            if None in columns:
+                index = pd.Index(columns.pop(None).copy(), name=index.name)
+            df = pd.DataFrame({i: columns[i] for i in range(len(self.columns))},
+                              index=index, copy=True)
+        finally:
+            shm.close()
+        df.columns = self.columns
+        return df
+
+    def unlink(self):
+        """Frees the shared memory block."""
+        self._shm.close()
+        self._shm.unlink()
+
+
+def _is_shareable(dtype):
+    return isinstance(dtype, np.dtype) and dtype.kind in "biufcmM"
+
+
+def _read(partition, reader):
+    if isinstance(partition, SharedFrame):
+        return partition.to_frame()
+    if isinstance(partition, pd.DataFrame):
+        return partition
+    return reader(partition)
+
+
+def _validate_partition(partition, checks, reader):
+    validator = StreamValidator(checks, label="Partition", mergeable=True)
+    validator.update(_read(partition, reader))
+    return validator
+
+
+def batch_check(partitions, checks, warn=False, n_jobs=-1, reader=read_partition,
+                shared=True):
+    """Validates partitions as if they were a single pd.DataFrame, across processes.
+
+    Row-local checks are reported per partition, and cross-row checks across all of them.
+    The `checks` (and `reader`) have to be picklable, e.g. not lambdas.
+
+    Args:
+        partitions (list): pd.DataFrames, or paths for `reader` to read, in order.
+        checks (dict): Mapping of check functions to parameters for those check functions,
+                       as for `bulwark.checks.multi_check`.
+        warn (bool): Indicates whether an error should be raised
+                     or only a warning notification should be displayed.
+                     Default is to error.
+        n_jobs (int or None): Number of processes. None or 1 validates partitions in this
+                              process, -1 uses one process per CPU.
+        reader (function): Reads a partition from a path. Defaults to `read_partition`.
+        shared (bool): Whether to pass pd.DataFrames' numeric columns through shared memory.
+                       Ignored on Python < 3.8.
+
+    Returns:
+        Number of partitions validated.
+
+    """
+    if n_jobs is not None and n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+
+    if n_jobs is None or n_jobs <= 1:
+        validators = [_validate_partition(p, checks, reader) for p in partitions]
+    else:
+        validators = _map_partitions(partitions, checks, reader, n_jobs,
+                                     shared and shared_memory is not None)
+
+    merged = StreamValidator(checks, warn=warn, label="Partition")
+    for validator in validators:
+        merged.merge(validator)
+    if merged.unconfirmed():
+        # Values approximate checks flagged are counted exactly, reading partitions again
+        merged.confirm(_read(p, reader) for p in partitions)
+    else:
+        merged.finalize()
+    return merged.n_chunks
+
+
+def _map_partitions(partitions, checks, reader, n_jobs, shared):
+    """Validates `partitions` in a pool, keeping at most 2 per process in flight."""
+    validators = []
+    pending = deque()
+
+    def collect():
+        future, shared_frame = pending.popleft()
+        try:
+            validators.append(future.result())
+        finally:
+            if shared_frame is not None:
+                shared_frame.unlink()
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        try:
+            for partition in partitions:
+                shared_frame = None
+                if shared and isinstance(partition, pd.DataFrame):
+                    partition = shared_frame = SharedFrame(partition)
+                pending.append((pool.submit(_validate_partition, partition, checks, reader),
+                                shared_frame))
+                if len(pending) >= 2 * n_jobs:
+                    collect()
+            while pending:
+                collect()
+        finally:
+            for future, shared_frame in pending:
+                future.cancel()
+                if shared_frame is not None:
+                    shared_frame.unlink()
+
+    return validators
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Opt-in cache of check results, so frames that are validated over and over
+(e.g. lookup or dimension tables) are only checked once.
+
+Results are keyed on a fingerprint of the pd.DataFrame, the check function and its parameters.
+By default, the fingerprint hashes every cell, which is usually much cheaper than the checks.
+Pass ``sample`` to only hash some evenly spaced rows instead, at the risk of missing changes
+to the other rows.
+
+"""
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MISS = object()
+
+
+def fingerprint(df, sample=None):
+    """Computes a digest of `df`'s schema, shape, index and values.
+
+    Args:
+        df (pd.DataFrame or pd.Series): Any pd.DataFrame or pd.Series.
+        sample (int or None): Number of evenly spaced rows to hash. None hashes all rows.
+
+    Returns:
+        Hex digest (str).
+
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    dtypes = df.dtypes if isinstance(df, pd.DataFrame) else pd.Series([df.dtype], [df.name])
+    digest.update(repr((type(df).__name__, df.shape, list(dtypes.items()),
+                        str(df.index.dtype))).encode())
+
+    if sample is not None and len(df) > sample:
+        df = df.iloc[np.linspace(0, len(df) - 1, sample).astype(np.intp)]
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+
+    return digest.hexdigest()
+
+
+def _freeze(obj):
+    """Converts check parameters into something hashable."""
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        return ("__frame__", fingerprint(obj if not isinstance(obj, pd.Index)
+                                         else obj.to_series()))
+    if isinstance(obj, np.ndarray):
+        return ("__array__", str(obj.dtype), obj.shape, hashlib.blake2b(obj.tobytes()).digest())
+    if isinstance(obj, dict):
+        return ("__dict__", tuple(sorted(((_freeze(k), _freeze(v)) for k, v in obj.items()),
+                                         key=repr)))
+    if isinstance(obj, (list, tuple)):
+        return (type(obj).__name__, tuple(_freeze(v) for v in obj))
+    if isinstance(obj, (set, frozenset)):
+        return ("__set__", tuple(sorted((_freeze(v) for v in obj), key=repr)))
+    try:
+        hash(obj)
+    except TypeError:
+        return ("__repr__", repr(obj))
+    return obj
+
+
+class ResultCache(object):
+    """Size-bounded LRU cache of check results.
+
+    Passing and failing results are both cached; a cached failure is raised again as a new
+    exception with the same arguments.
+
+    Args:
+        maxsize (int): Maximum number of results to keep. The least recently used are evicted.
+        sample (int or None): Number of rows to fingerprint frames with. See `fingerprint`.
+
+    Examples:
+        >>> import bulwark.checks as ck
+        >>> import pandas as pd
+        >>> from bulwark.cache import ResultCache
+        >>> cache = ResultCache(maxsize=64)
+        >>> df = pd.DataFrame({'a': [1, 2, 3]})
+        >>> for _ in range(3):
+        ...     _ = ck.multi_check(df, {ck.has_no_nans: {}, ck.unique: {}}, cache=cache)
+        >>> cache.info()
+        {'hits': 4, 'misses': 2, 'evictions': 0, 'size': 2, 'maxsize': 64}
+
+    """
+
+    def __init__(self, maxsize=128, sample=None):
+        self.maxsize = maxsize
+        self.sample = sample
+        self.hits = self.misses = self.evictions = 0
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def fingerprint(self, df):
+        return fingerprint(df, self.sample)
+
+    def get(self, df_fingerprint, func, params):
+        """Looks up a result.
+
+        Returns:
+            The cached AssertionError or None, or `MISS` if there's no cached result.
+
+        """
+        key = (df_fingerprint, func, _freeze(params))
+        with self._lock:
+            try:
+                result = self._results[key]
+            except KeyError:
+                self.misses += 1
+                return MISS
+            self._results.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, df_fingerprint, func, params, error):
+        """Stores a result, `error` being the AssertionError raised by the check or None."""
+        key = (df_fingerprint, func, _freeze(params))
+        if error is not None:
+            # Drop the traceback, which would keep the checked frame alive
+            error = copy.copy(error)
+        with self._lock:
+            self._results[key] = error
+            self._results.move_to_end(key)
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+                self.evictions += 1
+
+    def call(self, func, df, params):
+        """Calls ``func(df, **params)``, unless its result is already cached.
+
+        Returns:
+            Original `df`.
+
+        """
+        df_fingerprint = self.fingerprint(df)
+        error = self.get(df_fingerprint, func, params)
+        if error is MISS:
+            try:
+                func(df, **params)
+                error = None
+            except AssertionError as e:
+                self.put(df_fingerprint, func, params, e)
+                raise
+            self.put(df_fingerprint, func, params, error)
+
+        if error is not None:
+            # A copy, so the cached error doesn't accumulate tracebacks
+            raise copy.copy(error)
+        return df
+
+    def info(self):
+        """Returns the cache's hit, miss and eviction counts and its size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "size": len(self._results), "maxsize": self.maxsize}
+
+    def clear(self):
+        """Drops all cached results and resets the counters."""
+        with self._lock:
+            self._results.clear()
+            self.hits = self.misses = self.evictions = 0
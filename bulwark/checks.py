@@ -7,14 +7,21 @@ Each function in this module should:
 - return the original, unaltered pd.DataFrame
 
 """
-import operator
 import warnings
+from inspect import isfunction
 
 import numpy as np
 import pandas as pd
 import pandas.testing as tm
 
-from bulwark.generic import bad_locations
+from bulwark.generic import (MAX_BAD_LOCATIONS, ValueSet, bad_location_counts, bad_locations,
+                             batched_violations, column_positions, differing_rows, hash_rows,
+                             isin_any, isin_mask, memory_batches, monotonic_violations,
+                             observed_values, special_floats)
+from bulwark.metrics import instrument
+from bulwark.report import (SAMPLE_SIZE, ValidationError, ValidationReport, Violation,
+                            violation_error)
+from bulwark.sketches import HyperLogLog, duplicated_values
 
 # Required for DeprecationWarnings to not be ignored
 warnings.simplefilter('always', DeprecationWarning)
@@ -67,28 +74,39 @@ def has_columns(df, columns, exact_cols=False, exact_order=False):
     return df
 
 
-def has_no_x(df, values=None, columns=None):
+def has_no_x(df, values=None, columns=None, memory_budget=None):
     """Asserts that there are no user-specified `values` in `df`'s `columns`.
 
+    Columns are checked one at a time, in batches of rows, stopping at the first one with
+    any of `values`. nan and inf `values` are found with dtype-specific kernels:
+    integer and boolean columns are skipped, and float columns use np.isnan and comparisons.
+
     Args:
         df (pd.DataFrame): Any pd.DataFrame.
         values (list): A list of values to check for in the pd.DataFrame.
         columns (list): A subset of columns to check for `values`.
+        memory_budget (int): Maximum bytes of intermediate masks at a time.
+                             Default is `bulwark.generic.MEMORY_BUDGET`.
 
     Returns:
         Original `df`.
 
     """
-    values = values if values is not None else []
+    values = list(values) if values is not None else []
     columns = columns if columns is not None else df.columns
-
-    try:
-        assert not df[columns].isin(values).values.any()
-    except AssertionError as e:
-        missing = df[columns].isin(values)
-        msg = bad_locations(missing)
-        e.args = msg
-        raise
+    if not pd.api.types.is_list_like(columns):
+        columns = [columns]
+
+    special = special_floats(values)
+    positions = column_positions(df, columns)
+    # A mask, and a temporary for float comparisons, per row
+    batches = memory_batches(len(df), 2, memory_budget)
+    if any(isin_any(df.iloc[rows, i], values, special) for _, i in positions for rows in batches):
+        locs, violations = batched_violations(
+            df, positions, lambda col, ser: isin_mask(ser, values, special), batches,
+            max_locations=MAX_BAD_LOCATIONS)
+        raise ValidationError(*locs, report=ValidationReport.from_columns(
+            "has_no_x", df.index, violations))
     return df
 
 
@@ -171,6 +189,7 @@ def has_set_within_vals(df, items):
 
     In other words, the given values in the `items` dict should all be a subset of
     the values found in the associated column in `df`.
+    For categorical columns, the values found are read off the codes.
 
     Args:
         df (pd.DataFrame): Any pd.DataFrame.
@@ -203,7 +222,7 @@ def has_set_within_vals(df, items):
     bad_cols_vals = {}
 
     for col, vals in items.items():
-        missing_vals = np.setdiff1d(vals, df[col].unique(), assume_unique=True).tolist()
+        missing_vals = np.setdiff1d(vals, observed_values(df[col]), assume_unique=True).tolist()
         if missing_vals:
             bad_cols_vals.update({col: missing_vals})
 
@@ -234,18 +253,45 @@ def has_unique_index(df):
         Original `df`.
 
     """
-    try:
-        assert df.index.is_unique
-    except AssertionError as e:
-        e.args = df.index[df.index.duplicated()].unique()
-        raise
+    if not df.index.is_unique:
+        bad = df.index.duplicated()
+        positions = np.flatnonzero(bad)
+        msg = ("Index contains non-unique values: {}"
+               .format(df.index[positions].unique()[:MAX_BAD_LOCATIONS].tolist()))
+        raise ValidationError(msg, report=ValidationReport.from_columns(
+            "has_unique_index", df.index, [(None, len(positions), positions)], message=msg))
 
     return df
 
 
-def is_monotonic(df, items=None, increasing=None, strict=False):
+def has_approx_unique_index(df, error_rate=0.001, capacity=None):
+    """Asserts that `df`'s index is unique, like `has_unique_index`, in less memory.
+
+    See `approx_unique`.
+
+    Args:
+        df (pd.DataFrame): Any pd.DataFrame.
+        error_rate (float): False positive rate of the Bloom filter.
+        capacity (int): Number of values to size the Bloom filter for.
+                        Default is the number of rows.
+
+    Returns:
+        Original `df`.
+
+    """
+    dups = duplicated_values(df.index, error_rate, capacity)
+    if len(dups):
+        raise AssertionError("Index contains non-unique values: {}"
+                             .format(dups[:MAX_BAD_LOCATIONS].tolist()))
+    return df
+
+
+def is_monotonic(df, items=None, increasing=None, strict=False, by=None):
     """Asserts that the `df` is monotonic.
 
+    Adjacent values are compared directly, so integers and datetimes are never upcast,
+    and pairs with a null value are ignored.
+
     Args:
         df (pd.DataFrame): Any pd.DataFrame.
         items (dict): Mapping of columns to conditions (increasing, strict)
@@ -253,6 +299,9 @@ def is_monotonic(df, items=None, increasing=None, strict=False):
         increasing (bool, None): None checks for either increasing or decreasing monotonicity.
         strict (bool): Whether the comparison should be strict,
                        meaning two values in a row being equal should fail.
+        by (str or list): Column(s) to group `df` by, so that monotonicity is only required
+                          within each group (e.g. per sensor), keeping the rows' order.
+                          Rows with a null group are ignored.
 
     Returns:
         Original `df`.
@@ -290,44 +339,45 @@ def is_monotonic(df, items=None, increasing=None, strict=False):
         3            4                3            1                1
 
         The following check will fail,
-        displaying a list of which (row, column)s caused the issue:
+        reporting the rows of each column that caused the issue:
 
         >>> df2 = pd.DataFrame({'not_monotonic': [1, 2, 3, 2]})
         >>> ck.is_monotonic(df2, increasing=True, strict=False)
         Traceback (most recent call last):
             ...
-        AssertionError: [(3, 'not_monotonic')]
+        bulwark.report.ValidationError: is_monotonic: 1 row(s) of column 'not_monotonic' \
+failed, e.g. at index [3]
+
+        Monotonicity can also be required within groups only:
+
+        >>> df3 = pd.DataFrame({'sensor': ['a', 'b', 'a', 'b'], 'time': [1, 5, 2, 6]})
+        >>> ck.is_monotonic(df3, increasing=True, by='sensor')
+          sensor  time
+        0      a     1
+        1      b     5
+        2      a     2
+        3      b     6
 
     """
+    if by is None:
+        groups = None
+    else:
+        by = [by] if isinstance(by, str) or not pd.api.types.is_list_like(by) else list(by)
+        groups = df.groupby(by, sort=False).ngroup().fillna(-1).to_numpy(dtype=np.intp)
+
     if items is None:
-        items = {col: (increasing, strict) for col in df}
-
-    operator_choices = {
-        # key = (increasing, strict)
-        (True, True): operator.gt,
-        (False, True): operator.lt,
-        (True, False): operator.ge,
-        (False, False): operator.le,
-        (None, True): (operator.gt, operator.lt),
-        (None, False): (operator.ge, operator.le),
-    }
-
-    bad = pd.DataFrame()
-    for col, (increasing, strict) in items.items():
-        ser_diff = df[col].diff().dropna()
-        op = operator_choices[(increasing, strict)]
-
-        if increasing is None:
-            ser_diff_incr = op[0](ser_diff, 0)
-            ser_diff_dec = op[1](ser_diff, 0)
-            if not ser_diff_incr.all() | ser_diff_dec.all():
-                bad[ser_diff.name] = ~ser_diff_incr | ~ser_diff_dec
-        else:
-            bad[ser_diff.name] = ~op(ser_diff, 0)
+        items = {col: (increasing, strict) for col in df if by is None or col not in by}
 
-    if np.any(bad):
-        msg = bad_locations(bad)
-        raise AssertionError(msg)
+    bad = pd.DataFrame({col: monotonic_violations(df[col], increasing, strict, groups)
+                        for col, (increasing, strict) in items.items()},
+                       index=df.index, columns=list(items))
+
+    if bad.values.any():
+        msg = bad_locations(bad, max_locations=MAX_BAD_LOCATIONS)
+        violations = [(col, count, np.flatnonzero(bad[col].to_numpy())[:SAMPLE_SIZE])
+                      for col, count in bad_location_counts(bad).items()]
+        raise ValidationError(msg, report=ValidationReport.from_columns(
+            "is_monotonic", df.index, violations))
 
     return df
 
@@ -372,7 +422,140 @@ def unique(df, columns=None):
         columns = df.columns
     for col in columns:
         if not df[col].is_unique:
-            raise AssertionError("Column {!r} contains non-unique values".format(col))
+            msg = "Column {!r} contains non-unique values".format(col)
+            positions = np.flatnonzero(df[col].duplicated().to_numpy())
+            raise ValidationError(msg, report=ValidationReport.from_columns(
+                "unique", df.index, [(col, len(positions), positions)], message=msg))
+    return df
+
+
+def approx_unique(df, columns=None, error_rate=0.001, capacity=None):
+    """Asserts that columns in `df` only have unique values, like `unique`, in less memory.
+
+    Each column's values are added to a Bloom filter one batch of rows at a time, which
+    flags the ones that were probably added before. Only the flagged values are then counted
+    exactly, which rules out the filter's false positives. The filter never misses a repeat
+    of a value that hashes the same (see `bulwark.sketches.hash_values`), which equal
+    numbers, strings and datetimes always do. This takes 1.5 to 3 bytes per row (depending on
+    `error_rate`), plus batches of intermediates bounded by `bulwark.generic.MEMORY_BUDGET`,
+    instead of a hash table of every distinct value, but is up to 3 times slower.
+
+    Args:
+        df (pd.DataFrame): Any pd.DataFrame.
+        columns (list): A subset of columns to check for uniqueness of row values.
+        error_rate (float): False positive rate of the Bloom filter. Lower rates take more
+                            memory, but leave fewer values to count exactly.
+        capacity (int): Number of values to size the Bloom filter for.
+                        Default is the number of rows.
+
+    Returns:
+        Original `df`.
+
+    Examples:
+        >>> import bulwark.checks as ck
+        >>> import pandas as pd
+        >>> df = pd.DataFrame({'a': [1, 2, 3, 2], 'b': ['x', 'y', 'z', 'w']})
+        >>> ck.approx_unique(df)
+        Traceback (most recent call last):
+            ...
+        AssertionError: Column 'a' contains non-unique values: [2]
+
+    """
+    if columns is None:
+        columns = df.columns
+    for col in columns:
+        dups = duplicated_values(df[col], error_rate, capacity)
+        if len(dups):
+            raise AssertionError("Column {!r} contains non-unique values: {}"
+                                 .format(col, dups[:MAX_BAD_LOCATIONS].tolist()))
+    return df
+
+
+def has_distinct_count(df, items, error_rate=0.01):
+    """Asserts that the number of distinct non-null values of columns is within bounds.
+
+    The number is first estimated with a HyperLogLog, one batch of rows at a time.
+    Only if that isn't clearly within the bounds is it counted exactly,
+    with a hash table of every distinct value, so the result is exact.
+    An estimate is clearly within the bounds if 4 standard errors from it still are,
+    so a column only wrongly passes if its estimate is off by more than that,
+    about once in 30000 times.
+
+    Args:
+        df (pd.DataFrame): Any pd.DataFrame.
+        items (dict): Mapping of columns to (lower, upper) bounds on their number of
+                      distinct values, inclusive. None leaves that side unbounded.
+        error_rate (float): Relative standard error of the estimates.
+
+    Returns:
+        Original `df`.
+
+    Examples:
+        >>> import bulwark.checks as ck
+        >>> import pandas as pd
+        >>> df = pd.DataFrame({'a': [1, 2, 3, 2], 'b': ['x', 'x', 'x', None]})
+        >>> ck.has_distinct_count(df, {'a': (3, None), 'b': (2, 10)})
+        Traceback (most recent call last):
+            ...
+        AssertionError: Column 'b' has 1 distinct value(s), outside (2, 10)
+
+    """
+    for col, (lower, upper) in items.items():
+        ser = df[col]
+        sketch = HyperLogLog(error_rate)
+        # Hashes and a few masks
+        for rows in memory_batches(len(ser), 40):
+            sketch.add(ser.iloc[rows])
+        low, high = sketch.bounds()
+        if (lower is None or low >= lower) and (upper is None or high <= upper):
+            continue
+
+        n_distinct = ser.nunique()
+        if (lower is not None and n_distinct < lower) or (upper is not None and n_distinct > upper):
+            raise AssertionError("Column {!r} has {} distinct value(s), outside {}"
+                                 .format(col, n_distinct, (lower, upper)))
+    return df
+
+
+def has_unique_key(df, columns):
+    """Asserts that the combination of `columns` uniquely identifies each row of `df`.
+
+    Rows are hashed into a single uint64 per row and duplicates are found by sorting the
+    hashes, without building a MultiIndex or tuples. Only rows with colliding hashes are
+    then compared exactly, so hash collisions can't cause false failures.
+
+    Args:
+        df (pd.DataFrame): Any pd.DataFrame.
+        columns (list): The columns making up the key.
+
+    Returns:
+        Original `df`.
+
+    Examples:
+        >>> import bulwark.checks as ck
+        >>> import pandas as pd
+        >>> df = pd.DataFrame({'account': [1, 1, 2, 2], 'day': [1, 2, 1, 1]})
+        >>> ck.has_unique_key(df, ['account', 'day'])
+        Traceback (most recent call last):
+            ...
+        AssertionError: 1 duplicated key(s) in ['account', 'day']: [(2, 1)]
+
+    """
+    hashes = hash_rows(df, columns)
+    sorted_hashes = np.sort(hashes)
+    collisions = sorted_hashes[1:][sorted_hashes[1:] == sorted_hashes[:-1]]
+    if not len(collisions):
+        return df
+
+    # Only rows sharing a hash can share a key, so compare just those exactly
+    candidates = df.iloc[np.flatnonzero(np.isin(hashes, collisions))][list(columns)]
+    dups = candidates[candidates.duplicated()].drop_duplicates()
+    if len(dups):
+        msg = ("{} duplicated key(s) in {}: {}"
+               .format(len(dups), list(columns),
+                       list(dups.head(MAX_BAD_LOCATIONS).itertuples(index=False, name=None))))
+        raise AssertionError(msg)
+
     return df
 
 
@@ -389,19 +572,23 @@ def within_set(df, items=None):
 def has_vals_within_set(df, items=None):
     """Asserts that `df` is a subset of items.
 
+    Categorical columns are checked on their categories and codes, without touching each value.
+
     Args:
         df (pd.DataFrame): Any pd.DataFrame.
         items (dict): Mapping of columns (col) to array-like of values (v) that
                       ``df[col]`` is expected to be a subset of.
+                      Values can be precompiled into a `bulwark.generic.ValueSet`.
 
     Returns:
         Original `df`.
 
     """
     for col, v in items.items():
-        if not df[col].isin(v).all():
-            bad = df.loc[~df[col].isin(v), col]
-            raise AssertionError('Not in set', bad)
+        v = v if isinstance(v, ValueSet) else ValueSet(v)
+        within = v.isin_mask(df[col])
+        if not within.all():
+            raise violation_error("has_vals_within_set", col, ~within, df[col], 'Not in set')
     return df
 
 
@@ -444,16 +631,14 @@ def has_vals_within_range(df, items=None):
         >>> ck.has_vals_within_range(df, items= {'a': (0, 3), 'b': ('a', 'b')})
         Traceback (most recent call last):
             ...
-        AssertionError: ('Outside range', 0    False
-        1    False
-        2     True
-        Name: b, dtype: bool)
+        bulwark.report.ValidationError: has_vals_within_range: 1 row(s) of column 'b' failed, \
+e.g. at index [2]
 
     """
     for col, (lower, upper) in items.items():
-        if (lower > df[col]).any() or (upper < df[col]).any():
-            bad = (lower > df[col]) | (upper < df[col])
-            raise AssertionError("Outside range", bad)
+        bad = (lower > df[col]) | (upper < df[col])
+        if bad.any():
+            raise violation_error("has_vals_within_range", col, bad, df[col], "Outside range")
     return df
 
 
@@ -467,23 +652,49 @@ def within_n_std(df, n=3):
     return has_vals_within_n_std(df, n)
 
 
-def has_vals_within_n_std(df, n=3):
+def has_vals_within_n_std(df, n=3, memory_budget=None):
     """Asserts that every value is within ``n`` standard deviations of its column's mean.
 
+    Means and standard deviations are computed in batches of columns, and values compared
+    with them in batches of rows, so intermediates fit in `memory_budget`.
+
     Args:
         df (pd.DataFrame): Any pd.DataFrame.
         n (int): Number of standard deviations from the mean.
+        memory_budget (int): Maximum bytes of intermediates at a time.
+                             Default is `bulwark.generic.MEMORY_BUDGET`.
 
     Returns:
         Original `df`.
 
     """
-    means = df.mean()
-    stds = df.std()
-    inliers = (np.abs(df[means.index] - means) < n * stds)
-    if not np.all(inliers):
-        msg = bad_locations(~inliers)
-        raise AssertionError(msg)
+    if not df.columns.is_unique or not df.shape[1]:
+        # Means of duplicate columns can't be told apart by name
+        means = df.mean()
+        stds = df.std()
+        inliers = (np.abs(df[means.index] - means) < n * stds)
+        if not np.all(inliers):
+            msg = bad_locations(~inliers, max_locations=MAX_BAD_LOCATIONS)
+            raise AssertionError(msg)
+        return df
+
+    # Reductions copy a column or two of floats
+    means, stds = [], []
+    for cols in memory_batches(df.shape[1], 16 * len(df), memory_budget):
+        means.append(df.iloc[:, cols].mean())
+        stds.append(df.iloc[:, cols].std())
+    means, bounds = pd.concat(means), n * pd.concat(stds)
+
+    def outliers(col, ser):
+        return ~(np.abs(ser - means[col]) < bounds[col])
+
+    # Deviations, their absolute values and a mask per row
+    msg, violations = batched_violations(df, column_positions(df, means.index), outliers,
+                                         memory_batches(len(df), 17, memory_budget),
+                                         max_locations=MAX_BAD_LOCATIONS)
+    if len(msg):
+        raise ValidationError(msg, report=ValidationReport.from_columns(
+            "has_vals_within_n_std", df.index, violations))
     return df
 
 
@@ -522,37 +733,126 @@ def one_to_many(df, unitcol, manycol):
     Returns:
         Original `df`.
 
+    Examples:
+        The following check will fail, reporting every ``manycol`` value
+        with more than one ``unitcol`` value (up to `MAX_BAD_LOCATIONS` of them):
+
+        >>> import bulwark.checks as ck
+        >>> import pandas as pd
+        >>> df = pd.DataFrame({'dept': ['a', 'a', 'b', 'b', 'c'],
+        ...                    'emp': ['x', 'y', 'x', 'z', 'w']})
+        >>> ck.one_to_many(df, 'dept', 'emp')
+        Traceback (most recent call last):
+            ...
+        bulwark.report.ValidationError: emp has 1 value(s) with multiple dept values: \
+{'x': ['a', 'b']}
+
     """
     subset = df[[manycol, unitcol]].drop_duplicates()
-    for many in subset[manycol].unique():
-        if subset[subset[manycol] == many].shape[0] > 1:
-            msg = ("{} in {} has multiple values for {}"
-                   .format(many, manycol, unitcol))
-            raise AssertionError(msg)
+    many = subset[manycol]
+    bad = many.duplicated(keep=False) & many.notna()
+    if bad.any():
+        bad_many = many[bad].unique()
+        shown = subset[many.isin(bad_many[:MAX_BAD_LOCATIONS])]
+        units = shown.groupby(manycol, sort=False)[unitcol].agg(list).to_dict()
+        msg = ("{} has {} value(s) with multiple {} values: {}"
+               .format(manycol, len(bad_many), unitcol, units))
+        positions = np.flatnonzero(df[manycol].isin(bad_many).to_numpy())
+        raise ValidationError(msg, report=ValidationReport.from_columns(
+            "one_to_many", df.index, [(manycol, len(positions), positions)], message=msg))
 
     return df
 
 
-def is_same_as(df, df_to_compare, **kwargs):
+def is_same_as(df, df_to_compare, fast=False, memory_budget=None, **kwargs):
     """Asserts that two pd.DataFrames are equal.
 
+    By default, this is pandas' ``assert_frame_equal``. With `fast`, shapes, columns and dtypes
+    are compared first, stopping before any values are if they differ. Then the index and
+    each column are compared in batches of rows, so intermediates fit in `memory_budget`.
+    Values must be exactly equal, or both null, and the error's report counts the differing
+    rows of each column, with a sample of them.
+
     Args:
         df (pd.DataFrame): Any pd.DataFrame.
         df_to_compare (pd.DataFrame): A second pd.DataFrame.
+        fast (bool): Whether to compare schemas, then values in batches of rows,
+                     instead of using ``assert_frame_equal``.
+        memory_budget (int): Maximum bytes of intermediate masks at a time, if `fast`.
+                             Default is `bulwark.generic.MEMORY_BUDGET`.
         **kwargs (dict): Keyword arguments passed through to pandas' ``assert_frame_equal``.
+                         Not supported if `fast`.
 
     Returns:
         Original `df`.
 
+    Examples:
+        >>> import bulwark.checks as ck
+        >>> import pandas as pd
+        >>> df = pd.DataFrame({'a': [1, 2, 3], 'b': [1., None, 3.]})
+        >>> ck.is_same_as(df, df.copy(), fast=True)
+           a    b
+        0  1  1.0
+        1  2  NaN
+        2  3  3.0
+        >>> ck.is_same_as(df, df.assign(b=[1., 2., 4.]), fast=True)
+        Traceback (most recent call last):
+            ...
+        bulwark.report.ValidationError: is_same_as: 2 row(s) of column 'b' failed, \
+e.g. at index [1, 2]
+
     """
-    try:
-        tm.assert_frame_equal(df, df_to_compare, **kwargs)
-    except AssertionError as exc:
-        raise AssertionError("DataFrames are not equal") from exc
+    if not fast:
+        try:
+            tm.assert_frame_equal(df, df_to_compare, **kwargs)
+        except AssertionError as exc:
+            raise AssertionError("DataFrames are not equal") from exc
+        return df
+    if kwargs:
+        raise TypeError("is_same_as doesn't take {} if fast.".format(sorted(kwargs)))
+
+    schema = []
+    if df.shape != df_to_compare.shape:
+        schema.append("Shapes differ: {} != {}".format(df.shape, df_to_compare.shape))
+    elif not df.columns.equals(df_to_compare.columns):
+        schema.append("Columns differ, only in df: {}, only in df_to_compare: {}".format(
+            df.columns.difference(df_to_compare.columns, sort=False).tolist(),
+            df_to_compare.columns.difference(df.columns, sort=False).tolist()))
+    else:
+        schema.extend("Dtypes of column {!r} differ: {} != {}".format(col, a, b)
+                      for col, a, b in zip(df.columns, df.dtypes, df_to_compare.dtypes) if a != b)
+    if schema:
+        raise ValidationError("DataFrames are not equal", report=ValidationReport.from_violations(
+            Violation("is_same_as", None, -1, (), (), msg) for msg in schema))
+
+    batches = memory_batches(len(df), 2, memory_budget)
+    reports = []
+    if not df.index.equals(df_to_compare.index):
+        index, other = df.index, df_to_compare.index
+        if isinstance(index, pd.MultiIndex) or isinstance(other, pd.MultiIndex):
+            index, other = index.to_flat_index(), other.to_flat_index()
+        count, positions = differing_rows(index, other, batches)
+        labels = [df.index[pos] for pos in positions]
+        msg = ("Indexes differ in {} row(s), e.g. at index {}".format(count, labels) if count
+               else "Indexes differ: {!r} != {!r}".format(type(df.index).__name__,
+                                                          type(df_to_compare.index).__name__))
+        reports.append(ValidationReport.from_violations([
+            Violation("is_same_as", None, count or -1, positions, labels, msg)]))
+
+    violations = []
+    for i, col in enumerate(df.columns):
+        count, positions = differing_rows(df.iloc[:, i], df_to_compare.iloc[:, i], batches)
+        if count:
+            violations.append((col, count, positions))
+    reports.append(ValidationReport.from_columns("is_same_as", df.index, violations))
+
+    report = ValidationReport.concat(reports)
+    if len(report):
+        raise ValidationError("DataFrames are not equal", report=report)
     return df
 
 
-def multi_check(df, checks, warn=False):
+def multi_check(df, checks, warn=False, fused=True, n_jobs=1, cache=None):
     """Asserts that all checks pass.
 
     Args:
@@ -561,23 +861,95 @@ def multi_check(df, checks, warn=False):
         warn (bool): Indicates whether an error should be raised
                      or only a warning notification should be displayed.
                      Default is to error.
+        fused (bool): Whether built-in checks should be evaluated in a single pass per column,
+                      sharing intermediates like null masks, min/max and uniques.
+                      See `bulwark.engine` for details.
+                      Failing checks are always re-run on their own to build their messages.
+        n_jobs (int or None): Number of threads to run checks (and, if fused, columns) across.
+                              None or 1 runs sequentially; -1 uses one thread per CPU.
+                              Errors are reported in the order of `checks` either way.
+        cache (bulwark.cache.ResultCache): Cache to look up and store each check's result in,
+                                           keyed on a fingerprint of `df`.
 
     Returns:
         Original `df`.
 
     """
-    error_msgs = []
-    for func, params in checks.items():
-        try:
-            func(df, **params)
-        except AssertionError as e:
-            error_msgs.append(e)
+    from bulwark import engine  # engine imports this module
+
+    results = {}
+    to_run = checks
+    if cache is not None:
+        from bulwark.cache import MISS
+        df_fingerprint = cache.fingerprint(df)
+        for func, params in checks.items():
+            results[func] = cache.get(df_fingerprint, func, params)
+        to_run = {func: params for func, params in checks.items() if results[func] is MISS}
+
+    if fused:
+        errors = engine.run_fused(df, to_run, n_jobs=n_jobs)
+    else:
+        errors = engine.map_jobs(lambda check: engine.run_check(df, *check),
+                                 list(to_run.items()), n_jobs)
+    results.update(zip(to_run, errors))
+
+    if cache is not None:
+        for func, params in to_run.items():
+            cache.put(df_fingerprint, func, params, results[func])
+
+    errors = [(func, results[func]) for func in checks if results[func] is not None]
+    error_msgs = [e for _, e in errors]
 
     if warn and error_msgs:
         print(error_msgs)
         return df
     elif error_msgs:
-        raise AssertionError("\n".join(str(i) for i in error_msgs))
+        raise ValidationError(report=ValidationReport.concat(
+            ValidationReport.from_error(e, func.__name__) for func, e in errors))
+
+    return df
+
+
+def group_check(df, by, func, **kwargs):
+    """Asserts that the check `func` passes within each group of `df`.
+
+    Every check in this module (deprecated names included) is evaluated for every group
+    at once; see `bulwark.groups`. Only `custom_check`, nested `group_check`s and
+    functions from elsewhere are called on each group in turn.
+    Repeats within groups are found exactly, even by `approx_unique`, and distinct values
+    counted exactly, even by `has_distinct_count`.
+
+    Args:
+        df (pd.DataFrame): Any pd.DataFrame.
+        by (str or list): Column(s) to group `df` by. Rows with a null group are ignored.
+        func (function): A check function, e.g. from this module.
+        **kwargs (dict): Keyword arguments passed through to `func`.
+
+    Returns:
+        Original `df`.
+
+    Examples:
+        The following check will fail, since customer 'b' has a duplicated order:
+
+        >>> import bulwark.checks as ck
+        >>> import pandas as pd
+        >>> df = pd.DataFrame({'customer': ['a', 'a', 'b', 'b'], 'order': [1, 2, 1, 1]})
+        >>> ck.group_check(df, 'customer', ck.unique, columns=['order'])
+        Traceback (most recent call last):
+            ...
+        AssertionError: unique failed for 1 group(s) of customer: ['b']
+
+    """
+    from bulwark import groups  # groups imports this module
+
+    codes, keys = groups.group_codes(df, by)
+    group_cols = [by] if isinstance(by, str) or not pd.api.types.is_list_like(by) else list(by)
+    bad = groups.failing_groups(df, codes, len(keys), group_cols, func, kwargs)
+    if bad.any():
+        msg = ("{} failed for {} group(s) of {}: {}"
+               .format(func.__name__, bad.sum(), by,
+                       keys[bad][:MAX_BAD_LOCATIONS].tolist()))
+        raise AssertionError(msg)
 
     return df
 
@@ -598,7 +970,13 @@ def custom_check(df, check_func, *args, **kwargs):
         check_func(df, *args, **kwargs)
     except AssertionError as e:
         msg = "{} is not true.".format(check_func.__name__)
-        e.args = (msg,)
-        raise
+        raise AssertionError(msg) from e
 
     return df
+
+
+# Time every check above while `bulwark.metrics` is recording
+for _name, _func in list(globals().items()):
+    if isfunction(_func) and _func.__module__ == __name__:
+        globals()[_name] = instrument(_func)
+del _name, _func
@@ -1,83 +1,338 @@
-"""Generates decorators for each check in `checks.py`."""
+"""Generates decorators for each check in `checks.py`.
+
+Decorator classes are only created when first accessed, and `bulwark.checks` (along with
+pandas) is only imported when a decorator first needs its check, so importing this module,
+creating decorators and decorating functions are cheap.
+
+"""
 import functools
 import sys
-from inspect import getfullargspec, getmembers, isfunction
 
-import bulwark.checks as ck
-from bulwark.generic import snake_to_camel
+# Names of the functions in bulwark.checks, which each get a decorator
+_CHECK_NAMES = (
+    "approx_unique", "custom_check", "group_check", "has_approx_unique_index", "has_columns",
+    "has_distinct_count", "has_dtypes", "has_no_infs", "has_no_nans", "has_no_neg_infs",
+    "has_no_nones", "has_no_x", "has_set_within_vals", "has_unique_index", "has_unique_key",
+    "has_vals_within_n_std", "has_vals_within_range", "has_vals_within_set", "is_monotonic",
+    "is_same_as", "is_shape", "multi_check", "none_missing", "one_to_many", "unique",
+    "unique_index", "within_n_std", "within_range", "within_set")
+# Decorator name -> check name. Same as bulwark.generic.snake_to_camel, without its imports
+_DECORATORS = {"".join(x.title() for x in name.split("_")): name for name in _CHECK_NAMES}
+
+
+class _CheckFunc(object):
+    """Looks up a function in `bulwark.checks` when it's first needed."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, obj, cls=None):
+        import bulwark.checks as ck
+        return getattr(ck, self.name)
 
 
 class BaseDecorator(object):
+    """Base class of the decorators generated for each check in `checks.py`.
+
+    Besides the check's own arguments, every decorator takes these keyword-only options:
+
+    - enabled (bool): Whether the check is run at all. Default is True.
+    - sample_every (int): Only check every Nth call, starting with the first.
+    - sample_calls (float): Only check a random fraction of calls, between 0 and 1.
+    - sample_rows (int or float): Only check a random sample of rows on each call;
+      either a number of rows (an int) or a fraction of them (a float in (0, 1]).
+      Rows keep their original order, but the check should hold for any subset of rows
+      (e.g. not `is_shape`).
+    - seed (int): Seed for `sample_calls` and `sample_rows`, for reproducible sampling.
+    - cache (bulwark.cache.ResultCache): Cache of results, so frames that were already
+      checked with the same parameters aren't checked again.
+    - executor (concurrent.futures.Executor or bool): For ``async def`` functions, run the
+      check in this executor (or the event loop's default one, if True), so checking large
+      frames doesn't block the event loop. Default is to check on the event loop.
+    - stream (bool): For generator functions, check the yielded chunks as if they were a
+      single pd.DataFrame, keeping the running state of cross-row checks (e.g. `unique`)
+      across chunks, as `bulwark.streaming.StreamValidator` does. Failures are then raised
+      once the generator is exhausted, and checks that can't be streamed, like
+      `custom_check`, raise a ValueError. Approximate checks like `approx_unique` keep
+      the hashes of the values they see, to count repeats across chunks exactly.
+      Default is to check each chunk on its own, raising as soon as one fails.
+    - background (bulwark.background.BackgroundValidator or bool): Return the decorated
+      function's pd.DataFrame right away, and check it in this validator's worker threads
+      (or the default one's, if True), which report failures instead of raising them.
+      Doesn't apply to generator functions.
+
+    Decorated ``async def`` functions are awaited, and their results checked.
+    Generator (and async generator) functions have each chunk they yield checked as it's
+    consumed, so only one chunk is held at a time. Calls are sampled per generator,
+    rows per chunk.
+
+    The check's arguments are bound, and sets of allowed values (e.g. for
+    `has_vals_within_set`) compiled, once, when the decorator is first used,
+    rather than on every call.
+
+    """
+
     def __init__(self, *args, **kwargs):
+        self._pop_options(kwargs)
+        self._args, self._kwargs = args, kwargs
+        self._params = None
+
+    @property
+    def check_func_params(self):
+        """Keyword arguments of the check, bound and compiled on first use.
+
+        Setting them replaces the check's arguments, which are compiled again on next use.
+
+        """
+        if self._params is None:
+            from inspect import getfullargspec, unwrap
+
+            params = dict(zip(getfullargspec(unwrap(self.check_func)).args[1:], self._args))
+            params.update(**self._kwargs)
+            self._params = self._compile_params(params)
+        return self._params
+
+    @check_func_params.setter
+    def check_func_params(self, params):
+        self._args, self._kwargs = (), dict(params)
+        self._params = None
+
+    def _compile_params(self, params):
+        from bulwark import engine
+        return engine.compile_params(self.check_func, params)
+
+    def _pop_options(self, kwargs):
         self.enabled = kwargs.pop("enabled", True)  # setter to enforce bool would be a lot safer
         # self.warn = False ? No - put at func level for all funcs and pass through
 
-        self.check_func_params = dict(
-            zip(getfullargspec(self.check_func).args[1:], args))
-        self.check_func_params.update(**kwargs)
+        self.sample_every = kwargs.pop("sample_every", None)
+        self.sample_calls = kwargs.pop("sample_calls", None)
+        self.sample_rows = kwargs.pop("sample_rows", None)
+        self.seed = kwargs.pop("seed", None)
+        self.cache = kwargs.pop("cache", None)
+        self.executor = kwargs.pop("executor", None)
+        self.stream = kwargs.pop("stream", False)
+        self.background = kwargs.pop("background", None)
+
+        if self.sample_every is not None and self.sample_every < 1:
+            raise ValueError("`sample_every` must be a positive integer.")
+        if self.sample_calls is not None and not 0 <= self.sample_calls <= 1:
+            raise ValueError("`sample_calls` must be between 0 and 1.")
+        if self.sample_rows is not None and self.sample_rows < 0:
+            raise ValueError("`sample_rows` must be positive.")
+        if isinstance(self.sample_rows, float) and not 0 < self.sample_rows <= 1:
+            raise ValueError("`sample_rows` must be a number of rows (an int) "
+                             "or a fraction of them, between 0 and 1.")
+
+        self._n_calls = 0
+        self._random = None
+
+    @property
+    def _rng(self):
+        if self._random is None:
+            import numpy as np
+            self._random = np.random.default_rng(self.seed)
+        return self._random
+
+    def _should_check(self):
+        """Whether the current call should be checked, given `enabled` and call sampling."""
+        if not self.enabled:
+            return False
+
+        n_calls, self._n_calls = self._n_calls, self._n_calls + 1
+        if self.sample_every is not None and n_calls % self.sample_every:
+            return False
+        if self.sample_calls is not None and self._rng.random() >= self.sample_calls:
+            return False
+        return True
+
+    def _sample(self, df):
+        """Returns the rows of `df` to check, given `sample_rows`."""
+        if self.sample_rows is None:
+            return df
+
+        n_rows = len(df)
+        if isinstance(self.sample_rows, float):
+            n_sample = int(round(self.sample_rows * n_rows))
+        else:
+            n_sample = int(self.sample_rows)
+        if n_sample >= n_rows:
+            return df
+
+        import numpy as np
+        return df.iloc[np.sort(self._rng.choice(n_rows, n_sample, replace=False))]
+
+    @property
+    def check_call(self):
+        """The (function, keyword arguments) that are called with the decorated function's df."""
+        return self.check_func, self.check_func_params
+
+    def run_check(self, df):
+        func, params = self.check_call
+        if self.cache is None:
+            func(df, **params)
+        else:
+            self.cache.call(func, df, params)
+
+    def validate(self, df):
+        """Checks `df`, subject to the decorator's options."""
+        if self._should_check():
+            self.check_sample(df)
+
+    def check_sample(self, df):
+        """Checks `df`, subject to row sampling only."""
+        self.run_check(self._sample(df))
+
+    @staticmethod
+    def _labelled(label, check, *args):
+        from bulwark import metrics
+
+        if metrics.is_enabled():
+            with metrics.label(label):
+                check(*args)
+        else:
+            check(*args)
+
+    def _submit(self, label, df):
+        """Hands `df` to the background validator, if this call is checked."""
+        if not self._should_check():
+            return
+        background = self.background
+        if background is True:
+            from bulwark.background import default_validator
+            background = default_validator()
+        background.submit(functools.partial(self._labelled, label, self.check_sample), df, label)
+
+    def _chunk_checks(self):
+        """Returns functions that check each chunk of a generator and, if needed, finalize it.
+
+        Both are None if this call of the generator isn't checked.
+
+        """
+        if not self._should_check():
+            return None, None
+        if self.stream:
+            import bulwark.checks as ck
+            from bulwark.streaming import StreamValidator
+
+            func, params = self.check_call
+            # The checks of a suite each keep their own state across chunks
+            checks = params["checks"] if func is ck.multi_check else {func: params}
+            # Nothing can confirm the values approximate checks flag once the generator is
+            # exhausted, so they count repeats exactly
+            validator = StreamValidator(checks, mergeable=True)
+            return validator.update, validator.finalize
+        return self.run_check, None
 
     def __call__(self, f):
+        from inspect import isasyncgenfunction, iscoroutinefunction, isgeneratorfunction
+
+        label = getattr(f, "__qualname__", None)
+
+        if isgeneratorfunction(f):
+            @functools.wraps(f)
+            def decorated_gen(*args, **kwargs):
+                check, finalize = self._chunk_checks()
+                for chunk in f(*args, **kwargs):
+                    if check is not None:
+                        self._labelled(label, check, self._sample(chunk))
+                    yield chunk
+                if finalize is not None:
+                    self._labelled(label, finalize)
+            return decorated_gen
+
+        if isasyncgenfunction(f):
+            @functools.wraps(f)
+            async def decorated_async_gen(*args, **kwargs):
+                check, finalize = self._chunk_checks()
+                async for chunk in f(*args, **kwargs):
+                    if check is not None:
+                        self._labelled(label, check, self._sample(chunk))
+                    yield chunk
+                if finalize is not None:
+                    self._labelled(label, finalize)
+            return decorated_async_gen
+
+        if iscoroutinefunction(f):
+            @functools.wraps(f)
+            async def decorated_async(*args, **kwargs):
+                df = await f(*args, **kwargs)
+                if self.background:
+                    self._submit(label, df)
+                elif self.executor is None or self.executor is False:
+                    self._labelled(label, self.validate, df)
+                elif self._should_check():
+                    import asyncio
+
+                    # Calls are sampled on the loop, so skipped calls don't wait for the executor
+                    executor = None if self.executor is True else self.executor
+                    # get_running_loop is new in Python 3.7
+                    loop = getattr(asyncio, "get_running_loop", asyncio.get_event_loop)()
+                    await loop.run_in_executor(
+                        executor, self._labelled, label, self.check_sample, df)
+                return df
+            return decorated_async
+
         @functools.wraps(f)
         def decorated(*args, **kwargs):
             df = f(*args, **kwargs)
-            if self.enabled:
-                self.check_func(df, **self.check_func_params)
+            if self.background:
+                self._submit(label, df)
+            else:
+                self._labelled(label, self.validate, df)
             return df
         return decorated
 
 
 def decorator_factory(decorator_name, func):
-    """Takes in a function and outputs a class that can be used as a decorator."""
+    """Takes in a function (or the name of one in `bulwark.checks`) and outputs a class
+    that can be used as a decorator."""
     class decorator_name(BaseDecorator):
-        check_func = staticmethod(func)
+        check_func = _CheckFunc(func) if isinstance(func, str) else staticmethod(func)
 
     return decorator_name
 
 
-# Automatically creates decorators for each function in bulwark.checks
-this_module = sys.modules[__name__]
-check_functions = [func[1]
-                   for func in getmembers(ck, isfunction)
-                   if func[1].__module__ == 'bulwark.checks']
-
-for func in check_functions:
-    decorator_name = snake_to_camel(func.__name__)
-    setattr(this_module, decorator_name, decorator_factory(decorator_name, func))
-
-
-class CustomCheck:
+class CustomCheck(BaseDecorator):
     """
     Notes:
-        - This code is purposefully located below the auto-generation of decorators,
-          so this overwrites the auto-generated CustomCheck.
-        - `CustomCheck`'s __init__ and __call__ diverge from `BaseDecorator`,
+        - `CustomCheck` is defined here, so it's used instead of an auto-generated one.
+        - `CustomCheck`'s __init__ and check_call diverge from `BaseDecorator`,
           since the check_func needs to be set by the user at creation time.
 
-    TODO: Work this into BaseDecorator?
-
     """
 
     def __init__(self, *args, **kwargs):
-        self.enabled = kwargs.pop("enabled", True)  # setter to enforce bool would be a lot safer
-        # self.warn = False ? No - put at func level for all funcs and pass through
+        self._pop_options(kwargs)
 
-        self.check_func = kwargs.get("check_func")
-        if self.check_func:
-            check_func_args = args
-        else:
-            self.check_func = args[0]
-            check_func_args = args[1:]
+        self.check_func = kwargs.pop("check_func", None)
+        if not self.check_func:
+            self.check_func, args = args[0], args[1:]
+        self._args, self._kwargs = args, kwargs
+        self._params = None
 
-        self.check_func_params = dict(
-            zip(getfullargspec(self.check_func).args[1:], check_func_args))
-        self.check_func_params.update(**kwargs)
+    def _compile_params(self, params):
+        return params
 
-    def __call__(self, f):
-        @functools.wraps(f)
-        def decorated(*args, **kwargs):
-            df = f(*args, **kwargs)
-            if self.enabled:
-                # differs from BaseDecorator
-                ck.custom_check(df, self.check_func, **self.check_func_params)
-            return df
-        return decorated
+    @property
+    def check_call(self):
+        import bulwark.checks as ck
+        return ck.custom_check, dict(check_func=self.check_func, **self.check_func_params)
+
+
+def __getattr__(name):
+    """Creates the decorator for a function in bulwark.checks when it's first accessed."""
+    if name not in _DECORATORS:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    decorator = globals()[name] = decorator_factory(name, _DECORATORS[name])
+    return decorator
+
+
+def __dir__():
+    return sorted(set(globals()).union(_DECORATORS))
+
+
+if sys.version_info < (3, 7):  # No module __getattr__, so create every decorator up front
+    for _name in _DECORATORS:
+        if _name not in globals():
+            __getattr__(_name)
@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+"""
+Planning and fused execution of check suites for `bulwark.checks.multi_check`.
+
+Rather than calling each check on the full pd.DataFrame in turn, the built-in checks
+are split into per-column tasks. Tasks touching the same column are evaluated together,
+sharing intermediates (null masks, min/max, uniques) that are computed at most once.
+
+The fused tasks only ever *prove* that a check passes. Whenever a task can't prove it
+(including when it raises), the original check function is re-run on the pd.DataFrame,
+so error messages and edge-case behavior are exactly those of the check itself.
+
+"""
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import bulwark.checks as ck
+from bulwark.generic import ValueSet
+
+_PLANNERS = {}
+
+
+class ColumnStats(object):
+    """Lazily computes and caches intermediates for a single column.
+
+    Args:
+        ser (pd.Series): The column to compute intermediates for.
+
+    """
+
+    def __init__(self, ser):
+        self.ser = ser
+        self._cache = {}
+
+    def _memo(self, name, compute):
+        if name not in self._cache:
+            self._cache[name] = compute()
+        return self._cache[name]
+
+    @property
+    def is_numeric(self):
+        return self._memo("is_numeric", lambda: pd.api.types.is_numeric_dtype(self.ser))
+
+    @property
+    def has_nulls(self):
+        return self._memo("has_nulls", lambda: bool(self.ser.isna().values.any()))
+
+    @property
+    def min(self):
+        return self._memo("min", self.ser.min)
+
+    @property
+    def max(self):
+        return self._memo("max", self.ser.max)
+
+    @property
+    def uniques(self):
+        return self._memo("uniques", lambda: pd.Index(self.ser.unique()))
+
+    @property
+    def is_unique(self):
+        return self._memo("is_unique", lambda: len(self.uniques) == len(self.ser))
+
+
+def _planner(check_func):
+    """Registers a function that splits calls of `check_func` into per-column tasks.
+
+    A planner takes the same arguments as `check_func` and returns a list of
+    (column, predicate) pairs, where each predicate takes a `ColumnStats` and
+    returns True only if that part of the check is proven to pass.
+
+    """
+    def register(planner):
+        _PLANNERS[check_func] = planner
+        return planner
+    return register
+
+
+def _columns(df, columns):
+    columns = df.columns if columns is None else columns
+    if not pd.api.types.is_list_like(columns):
+        raise TypeError("Only list-like `columns` are planned.")
+    return columns
+
+
+def _is_null_value(value):
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+def _no_values(values):
+    """Builds a predicate equivalent to ``not ser.isin(values).any()``."""
+    values = list(values)
+    if values and all(_is_null_value(v) for v in values):
+        return lambda st: not st.has_nulls
+    if values == [np.inf]:
+        return lambda st: st.is_numeric and st.max < np.inf
+    if values == [-np.inf]:
+        return lambda st: st.is_numeric and st.min > -np.inf
+    return lambda st: not st.uniques.isin(values).any()
+
+
+@_planner(ck.has_no_x)
+def _plan_has_no_x(df, values=None, columns=None, memory_budget=None):
+    predicate = _no_values(values if values is not None else [])
+    return [(col, predicate) for col in _columns(df, columns)]
+
+
+@_planner(ck.has_no_nans)
+def _plan_has_no_nans(df, columns=None):
+    return _plan_has_no_x(df, values=[np.nan], columns=columns)
+
+
+@_planner(ck.has_no_nones)
+def _plan_has_no_nones(df, columns=None):
+    return _plan_has_no_x(df, values=[None], columns=columns)
+
+
+@_planner(ck.has_no_infs)
+def _plan_has_no_infs(df, columns=None):
+    return _plan_has_no_x(df, values=[np.inf], columns=columns)
+
+
+@_planner(ck.has_no_neg_infs)
+def _plan_has_no_neg_infs(df, columns=None):
+    return _plan_has_no_x(df, values=[-np.inf], columns=columns)
+
+
+@_planner(ck.has_vals_within_range)
+def _plan_has_vals_within_range(df, items=None):
+    def within(lower, upper):
+        return lambda st: bool(st.min >= lower) and bool(st.max <= upper)
+
+    return [(col, within(lower, upper)) for col, (lower, upper) in items.items()]
+
+
+@_planner(ck.has_vals_within_set)
+def _plan_has_vals_within_set(df, items=None):
+    def within(vals):
+        vals = vals if isinstance(vals, ValueSet) else ValueSet(vals)
+        return lambda st: bool(vals.isin_mask(st.uniques).all())
+
+    return [(col, within(vals)) for col, vals in items.items()]
+
+
+@_planner(ck.has_set_within_vals)
+def _plan_has_set_within_vals(df, items):
+    def contains(vals):
+        # np.setdiff1d never matches nans, so leave those to the check itself
+        return lambda st: (not any(_is_null_value(v) for v in vals) and
+                           bool(pd.Index(vals).isin(st.uniques).all()))
+
+    return [(col, contains(vals)) for col, vals in items.items()]
+
+
+@_planner(ck.unique)
+def _plan_unique(df, columns=None):
+    return [(col, lambda st: st.is_unique) for col in _columns(df, columns)]
+
+
+def _compile_value_sets(items=None, **params):
+    if isinstance(items, dict):
+        items = {col: v if isinstance(v, ValueSet) else ValueSet(v) for col, v in items.items()}
+    return dict(params, items=items)
+
+
+_PARAM_COMPILERS = {ck.has_vals_within_set: _compile_value_sets,
+                    ck.within_set: _compile_value_sets}
+
+
+def compile_params(func, params):
+    """Prepares `params` for repeated calls of `func`, e.g. compiling sets of values.
+
+    Args:
+        func (function): A check function.
+        params (dict): Keyword arguments for `func`.
+
+    Returns:
+        Keyword arguments equivalent to `params`.
+
+    """
+    compile_func = _PARAM_COMPILERS.get(func)
+    return params if compile_func is None else compile_func(**params)
+
+
+def _items(checks):
+    return list(checks.items()) if isinstance(checks, dict) else list(checks)
+
+
+def plan(df, checks):
+    """Groups the per-column tasks of `checks` by the column they touch.
+
+    Args:
+        df (pd.DataFrame): Any pd.DataFrame.
+        checks (dict or list): Mapping of check functions to parameters for those check
+                               functions, or a list of (function, parameters) pairs.
+
+    Returns:
+        A tuple of (column_tasks, direct), where column_tasks maps each column to a list of
+        (check position, predicate) pairs, and direct lists the positions of checks that
+        have to be run as-is.
+
+    """
+    column_tasks = OrderedDict()
+    direct = []
+    fusable = df.columns.is_unique
+
+    for i, (func, params) in enumerate(_items(checks)):
+        planner = _PLANNERS.get(func)
+        if planner is None or not fusable:
+            direct.append(i)
+            continue
+        try:
+            tasks = planner(df, **params)
+        except Exception:
+            direct.append(i)
+            continue
+        for col, predicate in tasks:
+            column_tasks.setdefault(col, []).append((i, predicate))
+
+    return column_tasks, direct
+
+
+def _proven(predicate, stats):
+    try:
+        return bool(predicate(stats))
+    except Exception:
+        return False
+
+
+def _evaluate_column(df, col, tasks):
+    """Returns the positions of the checks that `tasks` can't prove pass on ``df[col]``."""
+    if col not in df.columns:
+        return {i for i, _ in tasks}
+
+    # Intermediates only live as long as the column is being evaluated
+    stats = ColumnStats(df[col])
+    unproven = set()
+    for i, predicate in tasks:
+        if i not in unproven and not _proven(predicate, stats):
+            unproven.add(i)
+    return unproven
+
+
+def run_check(df, func, params):
+    """Runs a single check, returning its AssertionError instead of raising it."""
+    try:
+        func(df, **params)
+    except AssertionError as e:
+        return e
+    return None
+
+
+def map_jobs(func, iterable, n_jobs=1):
+    """Maps `func` over `iterable` with up to `n_jobs` threads.
+
+    Most checks spend their time in numpy/pandas kernels that release the GIL,
+    so threads avoid the cost of copying `df` into other processes.
+
+    Args:
+        func (function): Function of a single argument.
+        iterable (iterable): Arguments to call `func` with.
+        n_jobs (int or None): Number of threads. None or 1 runs sequentially,
+                              -1 uses one thread per CPU.
+
+    Returns:
+        List of results, in the order of `iterable`, regardless of completion order.
+
+    """
+    if n_jobs is not None and n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs is None or n_jobs <= 1:
+        return [func(arg) for arg in iterable]
+
+    with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+        return list(pool.map(func, iterable))
+
+
+def run_fused(df, checks, n_jobs=1):
+    """Runs `checks` on `df`, evaluating planned checks in one pass per column.
+
+    Args:
+        df (pd.DataFrame): Any pd.DataFrame.
+        checks (dict or list): Mapping of check functions to parameters for those check
+                               functions, or a list of (function, parameters) pairs.
+        n_jobs (int or None): Number of threads to spread columns and checks across.
+                              See `map_jobs`.
+
+    Returns:
+        List with, for each of `checks` in order, the AssertionError it raised or None.
+
+    """
+    column_tasks, direct = plan(df, checks)
+    unproven = set(direct)
+
+    pending = [(col, tasks) for col, tasks in column_tasks.items()
+               if not all(i in unproven for i, _ in tasks)]
+    for col_unproven in map_jobs(lambda col_tasks: _evaluate_column(df, *col_tasks),
+                                 pending, n_jobs):
+        unproven.update(col_unproven)
+
+    to_run = [(func, params) for i, (func, params) in enumerate(_items(checks))
+              if i in unproven]
+    errors = iter(map_jobs(lambda check: run_check(df, *check), to_run, n_jobs))
+
+    return [next(errors) if i in unproven else None for i in range(len(checks))]
@@ -2,22 +2,481 @@
 """
 Module for useful generic functions.
 """
-from itertools import chain, cycle
-
 import numpy as np
 import pandas as pd
 
+from bulwark.report import SAMPLE_SIZE
+
+# Default number of bad cells reported by checks, so failures on large frames stay cheap
+MAX_BAD_LOCATIONS = 100
+
+# Default memory budget (in bytes) for the intermediates of checks that take a `memory_budget`
+MEMORY_BUDGET = 2 ** 28
+
+
+def _as_mask(mask):
+    if mask.dtype != bool:
+        mask = pd.Series(mask).fillna(False).astype(bool)
+    return np.asarray(mask)
+
+
+def _column_mask(df, i):
+    return _as_mask(df.iloc[:, i])
+
+
+def bad_locations(df, max_locations=None):
+    """Indicates bad cells in `df`.
+
+    Only the positions of bad cells are ever materialized, one column at a time,
+    so memory is proportional to the number of bad cells, not to the size of `df`.
+
+    Args:
+        df (pd.DataFrame): Boolean pd.DataFrame that is True where a cell is bad.
+        max_locations (int or None): Maximum number of bad cells to return.
+                                     None returns all of them.
+
+    Returns:
+        np.ndarray of (index, column) tuples of bad cells, column by column.
+
+    """
+    locs = []
+    for i, col in enumerate(df.columns):
+        remaining = None if max_locations is None else max_locations - len(locs)
+        if remaining is not None and remaining <= 0:
+            break
+        rows = np.flatnonzero(_column_mask(df, i))[:remaining]
+        locs.extend((idx, col) for idx in df.index[rows])
 
-def bad_locations(df):
-    """Indicates bad cells in `df`."""
-    columns = df.columns
-    all_locs = chain.from_iterable(zip(df.index, cycle([col])) for col in columns)
-    bad = pd.Series(list(all_locs))[np.asarray(df).ravel(order='F')]
-    msg = bad.values
+    msg = np.empty(len(locs), dtype=object)
+    msg[:] = locs
 
     return msg
 
 
+def memory_batches(n_items, bytes_per_item, memory_budget=None):
+    """Splits rows (or columns) into batches whose intermediates fit in a memory budget.
+
+    Args:
+        n_items (int): Number of rows or columns.
+        bytes_per_item (int): Bytes of intermediates per row or column.
+        memory_budget (int or None): Maximum bytes of intermediates per batch.
+                                     None uses `MEMORY_BUDGET`.
+
+    Returns:
+        List of slices of positions. Batches have at least one item, even over budget.
+
+    """
+    budget = MEMORY_BUDGET if memory_budget is None else memory_budget
+    size = max(int(budget // max(bytes_per_item, 1)), 1)
+    return [slice(start, min(start + size, n_items)) for start in range(0, n_items, size)]
+
+
+def column_positions(df, columns):
+    """Pairs `columns` with their positions in `df`, which may have duplicate column names.
+
+    Returns:
+        List of (column, position) tuples, in the order ``df[columns]`` selects them.
+
+    """
+    pairs = []
+    for col in columns:
+        loc = df.columns.get_loc(col)
+        if isinstance(loc, slice):
+            loc = range(len(df.columns))[loc]
+        elif isinstance(loc, np.ndarray):
+            loc = np.flatnonzero(loc)
+        else:
+            loc = [loc]
+        pairs.extend((col, int(i)) for i in loc)
+    return pairs
+
+
+def batched_violations(df, columns, bad_mask, batches, max_locations=None):
+    """Finds bad cells like `bad_locations`, computing masks one batch of rows at a time.
+
+    Only one batch's mask is materialized at a time, and only the bad cells to report
+    and the number of bad cells per column are kept.
+
+    Args:
+        df (pd.DataFrame): Any pd.DataFrame.
+        columns (list): (column, position) tuples, as returned by `column_positions`.
+        bad_mask (function): Takes a column and a pd.Series of some of its rows, and returns
+                             a boolean np.ndarray or pd.Series that is True for bad rows.
+        batches (list): Slices of row positions, as returned by `memory_batches`.
+        max_locations (int or None): Maximum number of bad cells to return.
+                                     None returns all of them.
+
+    Returns:
+        Tuple of (locations, violations), where locations is an np.ndarray of
+        (index, column) tuples of bad cells, column by column, and violations is a list of
+        (column, number of bad cells, np.ndarray of the first bad row positions) tuples
+        of the columns with bad cells, with up to `bulwark.report.SAMPLE_SIZE` positions.
+
+    """
+    locs = []
+    violations = []
+    for col, i in columns:
+        ser = df.iloc[:, i]
+        count = 0
+        sample = []
+        for rows in batches:
+            mask = _as_mask(bad_mask(col, ser.iloc[rows]))
+            n_bad = np.count_nonzero(mask)
+            count += n_bad
+            remaining = None if max_locations is None else max(max_locations - len(locs), 0)
+            if n_bad and (len(sample) < SAMPLE_SIZE or remaining != 0):
+                bad = rows.start + np.flatnonzero(mask)
+                sample.extend(bad[:SAMPLE_SIZE - len(sample)])
+                # Scalar lookups, since indexing a pd.RangeIndex with an array materializes it
+                locs.extend((df.index[pos], col) for pos in bad[:remaining])
+        if count:
+            violations.append((col, count, np.array(sample, dtype=np.int64)))
+
+    msg = np.empty(len(locs), dtype=object)
+    msg[:] = locs
+
+    return msg, violations
+
+
+def differing_rows(left, right, batches):
+    """Compares two pd.Series (or pd.Index) of the same length row by row, in batches of rows.
+
+    Values are the same if they're equal, or both null. Batches whose values are all equal
+    are skipped after a single vectorized comparison; nulls are only looked at in the others.
+
+    Args:
+        left (pd.Series or pd.Index): Any pd.Series or pd.Index.
+        right (pd.Series or pd.Index): A second one, of the same length and dtype.
+        batches (list): Slices of row positions, as returned by `memory_batches`.
+
+    Returns:
+        Tuple of (number of differing rows, np.ndarray of the first differing row positions),
+        with up to `bulwark.report.SAMPLE_SIZE` positions.
+
+    """
+    def rows_of(values, rows):
+        return values[rows] if isinstance(values, pd.Index) else values.iloc[rows]
+
+    count = 0
+    sample = []
+    for rows in batches:
+        a, b = rows_of(left, rows), rows_of(right, rows)
+        with np.errstate(invalid="ignore"):
+            equal = _as_mask(a.array == b.array)
+        if equal.all():
+            continue
+        candidates = np.flatnonzero(~equal)
+        a, b = a.take(candidates), b.take(candidates)
+        differ = candidates[~(np.asarray(a.isna()) & np.asarray(b.isna()))]
+        count += len(differ)
+        sample.extend(rows.start + differ[:SAMPLE_SIZE - len(sample)])
+    return count, np.array(sample, dtype=np.int64)
+
+
+def bad_location_counts(df):
+    """Counts bad cells in each column of `df`.
+
+    Args:
+        df (pd.DataFrame): Boolean pd.DataFrame that is True where a cell is bad.
+
+    Returns:
+        pd.Series of the number of bad cells per column, for columns with any bad cells.
+
+    """
+    counts = pd.Series([int(_column_mask(df, i).sum()) for i in range(df.shape[1])],
+                       index=df.columns)
+    return counts[counts > 0]
+
+
+def special_floats(values):
+    """Returns which of nan, inf and -inf `values` consists of, or None if it's anything else."""
+    special = {"nan": False, "inf": False, "-inf": False}
+    for v in values:
+        if not isinstance(v, float):
+            return None
+        if np.isnan(v):
+            special["nan"] = True
+        elif v == np.inf:
+            special["inf"] = True
+        elif v == -np.inf:
+            special["-inf"] = True
+        else:
+            return None
+    return special if values else None
+
+
+def _numpy_kind(ser):
+    return ser.dtype.kind if isinstance(ser.dtype, np.dtype) else None
+
+
+def isin_mask(ser, values, special=None):
+    """Equivalent to ``ser.isin(values)``, specialized for nan/inf `values` on numpy dtypes.
+
+    Args:
+        ser (pd.Series): Any pd.Series.
+        values (list): Values to look for.
+        special (dict): Result of ``special_floats(values)``, if already known.
+
+    Returns:
+        Boolean np.ndarray.
+
+    """
+    special = special_floats(values) if special is None else special
+    kind = _numpy_kind(ser)
+    if special is not None and kind in ("b", "i", "u"):
+        return np.zeros(len(ser), dtype=bool)
+    if special is not None and kind == "f":
+        arr = ser.to_numpy()
+        mask = np.isnan(arr) if special["nan"] else np.zeros(len(arr), dtype=bool)
+        if special["inf"]:
+            mask |= arr == np.inf
+        if special["-inf"]:
+            mask |= arr == -np.inf
+        return mask
+    return np.asarray(ser.isin(values))
+
+
+# Kinds of (column, values) that are looked up in the values' pd.Index like isin matches them.
+# Floats aren't looked up in integers, nor unsigned integers in floats, which would be rounded
+_LOOKUP_KINDS = {("i", "i"), ("i", "u"), ("u", "i"), ("u", "u"), ("i", "f"), ("f", "f")}
+
+
+class ValueSet(object):
+    """A set of values compiled once for repeated membership tests, e.g. by a decorator.
+
+    Categorical columns are tested on their categories alone, then mapped through the codes.
+    Numeric, object and other columns of the compiled values' dtype are looked up in their
+    hash table, which pd.Index builds once and keeps, rather than ``isin`` rebuilding one on
+    every call. Its lookups take any null for any other, so nulls are matched with ``isin``
+    on their own, which only matches None to None, nan to nan and so on, once per dtype
+    for dtypes with a single null. Columns whose values ``isin`` would convert (e.g. booleans
+    and integers, or datetimes and strings) still use ``isin``.
+
+    Args:
+        values (array-like): The values in the set.
+
+    """
+
+    def __init__(self, values):
+        self._raw = list(values) if isinstance(values, (set, frozenset)) else values
+        self.values = pd.Index(self._raw, tupleize_cols=False).unique()
+        self._nulls = {}
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        return "ValueSet({!r})".format(self.values.tolist())
+
+    def isin_mask(self, ser):
+        """Equivalent to ``ser.isin(values)``.
+
+        Args:
+            ser (pd.Series or pd.Index): Any pd.Series or pd.Index.
+
+        Returns:
+            Boolean np.ndarray.
+
+        """
+        if pd.api.types.is_categorical_dtype(ser.dtype):
+            cat = ser.array
+            codes = cat.categories.get_indexer(self.values)
+            allowed = np.zeros(len(cat.categories) + 1, dtype=bool)
+            allowed[codes[codes >= 0]] = True
+            # Code -1 (null) picks the last entry, whether nulls are in the set
+            allowed[-1] = self.values.hasnans
+            return allowed[cat.codes]
+        kinds = (getattr(ser.dtype, "kind", None), self.values.dtype.kind)
+        if not (ser.dtype == self.values.dtype or
+                (isinstance(ser.dtype, np.dtype) and kinds in _LOOKUP_KINDS)):
+            # E.g. booleans, which isin takes for 0 and 1, or strings parsed as datetimes
+            return np.asarray(ser.isin(self._raw))
+        mask = self.values.get_indexer(ser) >= 0
+        nulls = np.asarray(pd.isna(ser), dtype=bool)
+        if nulls.any():
+            if ser.dtype == object:
+                mask[nulls] = pd.Index(ser)[nulls].isin(self.values[self.values.isna()])
+            else:
+                mask[nulls] = self._null_in_set(ser[nulls][:1])
+        return mask
+
+    def _null_in_set(self, null):
+        """Whether the null of a (non-object) dtype is in the set, looked up once per dtype."""
+        if null.dtype not in self._nulls:
+            self._nulls[null.dtype] = bool(pd.Index(null).isin(self._raw)[0])
+        return self._nulls[null.dtype]
+
+
+def observed_values(ser):
+    """Equivalent to ``ser.unique()``, from the codes of categorical `ser` where possible.
+
+    Returns:
+        np.ndarray of the distinct values in `ser`.
+
+    """
+    if not pd.api.types.is_categorical_dtype(ser.dtype):
+        return np.asarray(ser.unique())
+    cat = ser.array
+    # Shifted by one, so nulls (code -1) are counted too
+    present = np.flatnonzero(np.bincount(cat.codes + 1, minlength=len(cat.categories) + 1)) - 1
+    return np.asarray(pd.Categorical.from_codes(present, dtype=cat.dtype))
+
+
+def isin_any(ser, values, special=None):
+    """Equivalent to ``ser.isin(values).any()``, without building a mask where possible.
+
+    Integer and boolean columns can't hold nan or inf, float columns are reduced with
+    min/max, and columns without nulls can't hold None or nan.
+
+    Args:
+        ser (pd.Series): Any pd.Series.
+        values (list): Values to look for.
+        special (dict): Result of ``special_floats(values)``, if already known.
+
+    Returns:
+        bool
+
+    """
+    special = special_floats(values) if special is None else special
+    kind = _numpy_kind(ser)
+    if special is not None and kind in ("b", "i", "u"):
+        return False
+    if special is not None and kind == "f":
+        if not len(ser):
+            return False
+        arr = ser.to_numpy()
+        low, high = arr.min(), arr.max()  # both are nan if there's any nan
+        if np.isnan(low):
+            return special["nan"] or bool(isin_mask(ser, values, special).any())
+        return bool((special["inf"] and high == np.inf) or
+                    (special["-inf"] and low == -np.inf))
+    if values and all(v is None or (isinstance(v, float) and np.isnan(v)) for v in values):
+        if not ser.hasnans:
+            return False
+    return bool(ser.isin(values).any())
+
+
+def comparable(ser):
+    """Values of `ser` as an np.ndarray that can be compared without upcasting.
+
+    Nullable dtypes (e.g. Int64 and boolean) become floats where that's exact, and objects
+    otherwise, with NaN for NA, which can't be compared.
+
+    """
+    if pd.api.types.is_datetime64tz_dtype(ser.dtype):
+        return ser.to_numpy(dtype="datetime64[ns]")
+    if pd.api.types.is_extension_array_dtype(ser.dtype) and ser.dtype.kind in "biuf":
+        exact = (ser.dtype.kind in "bf" or ser.dtype.itemsize < 8 or not ser.notna().any() or
+                 (-2 ** 53 <= ser.min() and ser.max() <= 2 ** 53))
+        return ser.to_numpy(dtype=np.float64 if exact else object, na_value=np.nan)
+    return ser.to_numpy()
+
+
+def monotonic_pairs(prev, curr, strict=False):
+    """Compares adjacent values, without materializing their differences.
+
+    Args:
+        prev (np.ndarray): The first value of each pair.
+        curr (np.ndarray): The second value of each pair.
+        strict (bool): Whether two equal values in a row break monotonicity.
+
+    Returns:
+        Tuple of boolean np.ndarrays (incr, decr), which are True where a pair is
+        (strictly) increasing or decreasing, or where either value is null.
+
+    """
+    if strict:
+        incr, decr = curr > prev, curr < prev
+    else:
+        incr, decr = curr >= prev, curr <= prev
+    if prev.dtype.kind not in ("b", "i", "u"):
+        nulls = pd.isna(prev) | pd.isna(curr)
+        incr |= nulls
+        decr |= nulls
+    return incr, decr
+
+
+def monotonic_violations(ser, increasing=None, strict=False, groups=None):
+    """Indicates the rows of `ser` that break its monotonicity with the row before them.
+
+    Args:
+        ser (pd.Series): Any pd.Series.
+        increasing (bool, None): None requires either increasing or decreasing monotonicity.
+        strict (bool): Whether two equal values in a row break monotonicity.
+        groups (np.ndarray): Integer group codes, one per row, with -1 for rows to ignore.
+                             If given, monotonicity is only required within each group,
+                             which are found with a single stable sort.
+
+    Returns:
+        Boolean np.ndarray that is True where a row is bad.
+
+    """
+    values = comparable(ser)
+    bad = np.zeros(len(values), dtype=bool)
+    if len(values) < 2:
+        return bad
+
+    positions = np.arange(len(values))
+    if groups is not None:
+        if np.any(groups[1:] < groups[:-1]):
+            order = np.argsort(groups, kind="mergesort")
+            positions, values, groups = order, values[order], groups[order]
+        # rows without a group are sorted first, so just skip over them
+        n_ignored = np.count_nonzero(groups < 0)
+        positions, values, groups = (positions[n_ignored:], values[n_ignored:],
+                                     groups[n_ignored:])
+        if len(values) < 2:
+            return bad
+
+    incr, decr = monotonic_pairs(values[:-1], values[1:], strict)
+    if groups is not None:
+        pair_groups = groups[1:]
+        within = pair_groups == groups[:-1]
+        incr |= ~within
+        decr |= ~within
+
+    if increasing is True:
+        pair_bad = ~incr
+    elif increasing is False:
+        pair_bad = ~decr
+    elif groups is None:
+        pair_bad = ~incr | ~decr
+        if incr.all() or decr.all():
+            pair_bad[:] = False
+    else:
+        # only groups that are neither increasing nor decreasing are bad
+        pair_bad = ~incr | ~decr
+        n_groups = groups.max() + 1
+        incr_bad = np.bincount(pair_groups[~incr], minlength=n_groups) > 0
+        decr_bad = np.bincount(pair_groups[~decr], minlength=n_groups) > 0
+        pair_bad &= (incr_bad & decr_bad)[pair_groups]
+
+    bad[positions[1:]] = pair_bad
+    return bad
+
+
+def hash_rows(df, columns):
+    """Hashes the values of `columns` in each row of `df` into a single uint64.
+
+    Args:
+        df (pd.DataFrame): Any pd.DataFrame.
+        columns (list): Columns to hash.
+
+    Returns:
+        np.ndarray of uint64, one per row.
+
+    """
+    hashes = np.zeros(len(df), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for col in columns:
+            hashes *= np.uint64(1000003)
+            hashes ^= pd.util.hash_pandas_object(df[col], index=False).to_numpy()
+    return hashes
+
+
 def snake_to_camel(snake_str):
     components = snake_str.split('_')
     return ''.join(x.title() for x in components)
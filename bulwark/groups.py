@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+Group-level formulations of the checks in `bulwark.checks`, for `bulwark.checks.group_check`.
+
+Each formulation evaluates a check for every group at once on the full pd.DataFrame,
+using integer group codes, rather than looping over ``df.groupby(...)`` in Python.
+Checks without a formulation (`custom_check`, nested `group_check`s and functions from
+elsewhere) fall back to one call per group.
+
+"""
+import numpy as np
+import pandas as pd
+
+import bulwark.checks as ck
+from bulwark.generic import (ValueSet, hash_rows, isin_mask, monotonic_violations,
+                             special_floats)
+
+_FORMULATIONS = {}
+
+# Checks whose result doesn't depend on the rows, so they're just run once on the whole frame
+_ROW_INVARIANT = (ck.has_columns, ck.has_dtypes)
+_UNGROUPABLE = (ck.is_same_as,)
+
+
+def _formulation(*check_funcs):
+    """Registers a function computing which groups fail any of `check_funcs`.
+
+    A formulation takes the pd.DataFrame, its group codes (-1 for rows without a group),
+    the number of groups, the list of columns the groups are keyed by and the check's
+    parameters, and returns a boolean np.ndarray that is True for each failing group.
+    Checks of cross-row properties leave the key columns out of their default columns,
+    since e.g. a key column is never unique or spread out within a group.
+
+    """
+    def register(formulation):
+        for check_func in check_funcs:
+            _FORMULATIONS[check_func] = formulation
+        return formulation
+    return register
+
+
+def group_codes(df, by):
+    """Factorizes the groups of `df`.
+
+    Args:
+        df (pd.DataFrame): Any pd.DataFrame.
+        by (str or list): Column(s) to group by.
+
+    Returns:
+        Tuple of (codes, keys), where codes is an np.ndarray with each row's group number
+        (-1 for rows with a null group), and keys is the pd.Index of each group's key.
+
+    """
+    grouped = df.groupby(by, sort=False)
+    codes = grouped.ngroup().fillna(-1).to_numpy(dtype=np.intp)
+    keys = grouped.size().index
+    return codes, keys
+
+
+def _bad_rows_to_groups(bad_rows, codes, n_groups):
+    bad_codes = codes[np.asarray(bad_rows) & (codes >= 0)]
+    return np.bincount(bad_codes, minlength=n_groups) > 0
+
+
+@_formulation(ck.has_no_x)
+def _has_no_x(df, codes, n_groups, group_cols, values=None, columns=None, memory_budget=None):
+    values = list(values) if values is not None else []
+    columns = df.columns if columns is None else columns
+    special = special_floats(values)
+
+    bad_rows = np.zeros(len(df), dtype=bool)
+    for col in columns:
+        bad_rows |= isin_mask(df[col], values, special)
+    return _bad_rows_to_groups(bad_rows, codes, n_groups)
+
+
+def _has_no_special(values):
+    def formulation(df, codes, n_groups, group_cols, columns=None):
+        return _has_no_x(df, codes, n_groups, group_cols, values=values, columns=columns)
+    return formulation
+
+
+_formulation(ck.has_no_nans, ck.none_missing)(_has_no_special([np.nan]))
+_formulation(ck.has_no_nones)(_has_no_special([None]))
+_formulation(ck.has_no_infs)(_has_no_special([np.inf]))
+_formulation(ck.has_no_neg_infs)(_has_no_special([-np.inf]))
+
+
+@_formulation(ck.has_vals_within_range, ck.within_range)
+def _has_vals_within_range(df, codes, n_groups, group_cols, items=None):
+    bad_rows = np.zeros(len(df), dtype=bool)
+    for col, (lower, upper) in items.items():
+        bad_rows |= np.asarray((lower > df[col]) | (upper < df[col]))
+    return _bad_rows_to_groups(bad_rows, codes, n_groups)
+
+
+@_formulation(ck.has_vals_within_set, ck.within_set)
+def _has_vals_within_set(df, codes, n_groups, group_cols, items=None):
+    bad_rows = np.zeros(len(df), dtype=bool)
+    for col, v in items.items():
+        v = v if isinstance(v, ValueSet) else ValueSet(v)
+        bad_rows |= ~v.isin_mask(df[col])
+    return _bad_rows_to_groups(bad_rows, codes, n_groups)
+
+
+@_formulation(ck.has_set_within_vals)
+def _has_set_within_vals(df, codes, n_groups, group_cols, items):
+    bad = np.zeros(n_groups, dtype=bool)
+    for col, vals in items.items():
+        vals = pd.Index(vals).unique()
+        found = pd.DataFrame({"group": codes, "value": df[col].to_numpy()})
+        found = found[found["value"].isin(vals) & (codes >= 0)].drop_duplicates()
+        bad |= np.bincount(found["group"].to_numpy(), minlength=n_groups) < len(vals)
+    return bad
+
+
+@_formulation(ck.unique)
+def _unique(df, codes, n_groups, group_cols, columns=None):
+    columns = df.columns.drop(group_cols) if columns is None else columns
+    bad_rows = np.zeros(len(df), dtype=bool)
+    for col in columns:
+        pairs = pd.DataFrame({"group": codes, "value": df[col].to_numpy()})
+        bad_rows |= pairs.duplicated().to_numpy()
+    return _bad_rows_to_groups(bad_rows, codes, n_groups)
+
+
+@_formulation(ck.approx_unique)
+def _approx_unique(df, codes, n_groups, group_cols, columns=None, error_rate=0.001,
+                   capacity=None):
+    # Groups are usually small enough for their repeats to be found exactly
+    return _unique(df, codes, n_groups, group_cols, columns)
+
+
+@_formulation(ck.has_distinct_count)
+def _has_distinct_count(df, codes, n_groups, group_cols, items, error_rate=0.01):
+    bad = np.zeros(n_groups, dtype=bool)
+    for col, (lower, upper) in items.items():
+        pairs = pd.DataFrame({"group": codes, "value": df[col].to_numpy()}).drop_duplicates()
+        pairs = pairs[pairs["value"].notna() & (pairs["group"] >= 0)]
+        n_distinct = np.bincount(pairs["group"].to_numpy(), minlength=n_groups)
+        if lower is not None:
+            bad |= n_distinct < lower
+        if upper is not None:
+            bad |= n_distinct > upper
+    return bad
+
+
+@_formulation(ck.has_unique_key)
+def _has_unique_key(df, codes, n_groups, group_cols, columns):
+    hashed = pd.DataFrame({"group": codes, "key": hash_rows(df, columns)})
+    candidates = np.flatnonzero(hashed.duplicated(keep=False).to_numpy())
+    exact = pd.DataFrame({col: df[col].to_numpy()[candidates] for col in columns})
+    exact.insert(0, "__group__", codes[candidates])
+    bad_rows = np.zeros(len(df), dtype=bool)
+    bad_rows[candidates] = exact.duplicated().to_numpy()
+    return _bad_rows_to_groups(bad_rows, codes, n_groups)
+
+
+@_formulation(ck.has_unique_index, ck.unique_index)
+def _has_unique_index(df, codes, n_groups, group_cols):
+    pairs = pd.DataFrame({"group": codes, "value": df.index.to_numpy()})
+    return _bad_rows_to_groups(pairs.duplicated().to_numpy(), codes, n_groups)
+
+
+@_formulation(ck.has_vals_within_n_std, ck.within_n_std)
+def _has_vals_within_n_std(df, codes, n_groups, group_cols, n=3, memory_budget=None):
+    sub = df.drop(columns=group_cols).select_dtypes(include=["number", "bool"])
+    grouped = sub.groupby(codes)
+    means = grouped.transform("mean")
+    stds = grouped.transform("std")
+    outliers = ~(np.abs(sub - means) < n * stds).to_numpy().all(axis=1)
+    return _bad_rows_to_groups(outliers, codes, n_groups)
+
+
+@_formulation(ck.is_monotonic)
+def _is_monotonic(df, codes, n_groups, group_cols, items=None, increasing=None, strict=False):
+    if items is None:
+        items = {col: (increasing, strict) for col in df if col not in group_cols}
+
+    bad_rows = np.zeros(len(df), dtype=bool)
+    for col, (increasing, strict) in items.items():
+        bad_rows |= monotonic_violations(df[col], increasing, strict, codes)
+    return _bad_rows_to_groups(bad_rows, codes, n_groups)
+
+
+@_formulation(ck.has_approx_unique_index)
+def _has_approx_unique_index(df, codes, n_groups, group_cols, error_rate=0.001, capacity=None):
+    return _has_unique_index(df, codes, n_groups, group_cols)
+
+
+@_formulation(ck.one_to_many)
+def _one_to_many(df, codes, n_groups, group_cols, unitcol, manycol):
+    triples = pd.DataFrame({"group": codes, "many": df[manycol].to_numpy(),
+                            "unit": df[unitcol].to_numpy()}).drop_duplicates()
+    bad_rows = (triples.duplicated(["group", "many"], keep=False) & triples["many"].notna())
+    return _bad_rows_to_groups(bad_rows.to_numpy(), triples["group"].to_numpy(), n_groups)
+
+
+@_formulation(ck.is_shape)
+def _is_shape(df, codes, n_groups, group_cols, shape):
+    n_rows = np.bincount(codes[codes >= 0], minlength=n_groups)
+    bad = np.zeros(n_groups, dtype=bool)
+    if shape[0] not in (None, -1):
+        bad |= n_rows != shape[0]
+    if shape[1] not in (None, -1) and df.shape[1] != shape[1]:
+        bad[:] = True
+    return bad
+
+
+@_formulation(ck.multi_check)
+def _multi_check(df, codes, n_groups, group_cols, checks, warn=False, **kwargs):
+    bad = np.zeros(n_groups, dtype=bool)
+    for func, params in checks.items():
+        bad |= failing_groups(df, codes, n_groups, group_cols, func, params)
+    return bad
+
+
+def _per_group(df, codes, n_groups, func, params):
+    """Fallback that calls `func` on each group in turn."""
+    bad = np.zeros(n_groups, dtype=bool)
+    for code, positions in pd.Series(np.arange(len(df))).groupby(codes):
+        if code < 0:
+            continue
+        try:
+            func(df.iloc[positions.to_numpy()], **params)
+        except AssertionError:
+            bad[code] = True
+    return bad
+
+
+def failing_groups(df, codes, n_groups, group_cols, func, params):
+    """Evaluates `func` within each group of `df`.
+
+    Args:
+        df (pd.DataFrame): Any pd.DataFrame.
+        codes (np.ndarray): Group code of each row, as returned by `group_codes`.
+        n_groups (int): Number of groups.
+        group_cols (list): Column(s) the groups are keyed by.
+        func (function): A check function.
+        params (dict): Keyword arguments for `func`.
+
+    Returns:
+        Boolean np.ndarray that is True for each group that fails `func`.
+
+    """
+    if func in _UNGROUPABLE:
+        raise ValueError("{} can't be checked per group.".format(func.__name__))
+    if func in _ROW_INVARIANT:
+        func(df, **params)
+        return np.zeros(n_groups, dtype=bool)
+
+    formulation = _FORMULATIONS.get(func)
+    if formulation is None:
+        return _per_group(df, codes, n_groups, func, params)
+    return formulation(df, codes, n_groups, group_cols, **params)
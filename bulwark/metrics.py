@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Opt-in timing of checks, to find the ones that take up pipeline time.
+
+While recording is enabled, every call of a function in `bulwark.checks` (including those made
+by decorators, `multi_check` and `group_check`) is timed and added to `registry`,
+along with the number of rows and cells it checked and whether it passed.
+A callback can forward each record elsewhere, e.g. to a metrics system.
+
+Calls a check makes to other checks (e.g. `has_no_nans` to `has_no_x`) aren't recorded
+separately, except for those of `multi_check` and `group_check`. Checks that `multi_check`
+proves in its fused pass aren't called at all, so their time is part of `multi_check`'s;
+pass ``fused=False`` to time each of them.
+
+Examples:
+    >>> import bulwark.checks as ck
+    >>> import pandas as pd
+    >>> from bulwark import metrics
+    >>> with metrics.recording():
+    ...     _ = ck.has_no_nans(pd.DataFrame({'a': [1, 2, 3]}))
+    >>> [(s["check"], s["calls"], s["rows"]) for s in metrics.registry.slowest()]
+    [('has_no_nans', 1, 3)]
+
+"""
+import functools
+import threading
+import time
+import warnings
+from collections import OrderedDict, deque, namedtuple
+from contextlib import contextmanager
+
+_enabled = False
+_callback = None
+_local = threading.local()
+
+# Checks whose calls to other checks are recorded too
+_SUITES = ("multi_check", "group_check")
+
+
+class CheckRecord(namedtuple("CheckRecord", "check seconds rows cells passed label")):
+    """A single, timed call of a check.
+
+    Attributes:
+        check (str): Name of the check, e.g. ``custom_check:my_check`` for custom checks.
+        seconds (float): Wall time.
+        rows (int): Number of rows checked.
+        cells (int): Number of cells checked.
+        passed (bool): Whether the check passed.
+        label (str or None): Where the check was called from, e.g. a decorated function.
+
+    """
+
+    __slots__ = ()
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else float("inf")
+
+
+class Registry(object):
+    """Aggregated timings of checks, per check, and the most recent records.
+
+    Args:
+        max_records (int): Number of recent records to keep.
+
+    """
+
+    def __init__(self, max_records=1000):
+        self.records = deque(maxlen=max_records)
+        self._stats = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self.records.append(record)
+            stats = self._stats.setdefault(record.check, {
+                "check": record.check, "calls": 0, "failures": 0, "seconds": 0.,
+                "max_seconds": 0., "rows": 0, "cells": 0})
+            stats["calls"] += 1
+            stats["failures"] += not record.passed
+            stats["seconds"] += record.seconds
+            stats["max_seconds"] = max(stats["max_seconds"], record.seconds)
+            stats["rows"] += record.rows
+            stats["cells"] += record.cells
+
+    def stats(self):
+        """Returns a dict of each check's aggregated timings, throughput and failures."""
+        with self._lock:
+            stats = {check: dict(s) for check, s in self._stats.items()}
+        for s in stats.values():
+            s["mean_seconds"] = s["seconds"] / s["calls"]
+            s["rows_per_second"] = s["rows"] / s["seconds"] if s["seconds"] else float("inf")
+        return stats
+
+    def slowest(self, n=10, by="seconds"):
+        """Returns the aggregated timings of the `n` checks with the highest `by`.
+
+        Args:
+            n (int): Number of checks.
+            by (str): Statistic to sort by, e.g. "seconds" (total), "mean_seconds"
+                      or "max_seconds".
+
+        Returns:
+            List of dicts, as in `stats`.
+
+        """
+        return sorted(self.stats().values(), key=lambda s: s[by], reverse=True)[:n]
+
+    def summary(self, n=10, by="seconds"):
+        """Formats `slowest` as a table."""
+        lines = ["{:<40} {:>7} {:>8} {:>11} {:>11} {:>13}".format(
+            "check", "calls", "failed", "total (s)", "mean (s)", "rows/s")]
+        for s in self.slowest(n, by):
+            lines.append("{:<40} {:>7} {:>8} {:>11.4f} {:>11.6f} {:>13.4g}".format(
+                s["check"][:40], s["calls"], s["failures"], s["seconds"], s["mean_seconds"],
+                s["rows_per_second"]))
+        return "\n".join(lines)
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+            self._stats.clear()
+
+
+registry = Registry()
+
+
+def enable(callback=None):
+    """Starts recording checks, also passing each `CheckRecord` to `callback` if given."""
+    global _enabled, _callback
+    _enabled, _callback = True, callback
+
+
+def disable():
+    """Stops recording checks."""
+    global _enabled, _callback
+    _enabled, _callback = False, None
+
+
+def is_enabled():
+    return _enabled
+
+
+@contextmanager
+def recording(callback=None):
+    """Records checks within a ``with`` block. See `enable`."""
+    previous = _enabled, _callback
+    enable(callback)
+    try:
+        yield registry
+    finally:
+        if previous[0]:
+            enable(previous[1])
+        else:
+            disable()
+
+
+@contextmanager
+def label(name):
+    """Labels the records of checks called within a ``with`` block with `name`."""
+    previous = getattr(_local, "label", None)
+    _local.label = name
+    try:
+        yield
+    finally:
+        _local.label = previous
+
+
+def _record_name(name, args, kwargs):
+    """Names custom and group checks after the function they run."""
+    param = {"custom_check": "check_func", "group_check": "func"}.get(name)
+    if param is None:
+        return name
+    func = kwargs.get(param, args[1] if name == "group_check" and len(args) > 1 else
+                      args[0] if name == "custom_check" and args else None)
+    return "{}:{}".format(name, getattr(func, "__name__", func))
+
+
+def _size(df):
+    shape = getattr(df, "shape", None) or (0,)
+    rows = int(shape[0] or 0)
+    cells = rows * int(shape[1] or 0) if len(shape) > 1 else rows
+    return rows, cells
+
+
+def instrument(func):
+    """Wraps a check function so its calls are recorded while recording is enabled."""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def instrumented(df, *args, **kwargs):
+        if not _enabled:
+            return func(df, *args, **kwargs)
+        parent = getattr(_local, "check", None)
+        if parent is not None and parent not in _SUITES:
+            return func(df, *args, **kwargs)
+
+        _local.check = name
+        passed = False
+        start = time.perf_counter()
+        try:
+            result = func(df, *args, **kwargs)
+            passed = True
+            return result
+        finally:
+            seconds = time.perf_counter() - start
+            _local.check = parent
+            rows, cells = _size(df)
+            record = CheckRecord(_record_name(name, args, kwargs), seconds, rows, cells,
+                                 passed, getattr(_local, "label", None))
+            registry.add(record)
+            callback = _callback
+            if callback is not None:
+                try:
+                    callback(record)
+                except Exception as e:
+                    warnings.warn("bulwark.metrics callback failed: {!r}".format(e))
+
+    return instrumented
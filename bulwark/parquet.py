@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""
+Validation of Parquet files, using their metadata to avoid reading data where possible.
+
+A Parquet footer holds the schema, the number of rows and, for each column of each row group,
+statistics such as min, max and null count. These are enough to prove many checks:
+
+- `has_columns`, `has_dtypes` and `is_shape` are answered from the schema and row count,
+  with null counts telling whether integer and boolean columns load as float64 or object,
+- `has_no_x` (and its wrappers) from null counts, min/max and the column types, and
+- `has_vals_within_range` from min/max.
+
+Only the column chunks whose statistics can't prove a check are read, and the check is then
+run on them one row group at a time. Other checks are run on every row group in turn,
+as by `bulwark.streaming.StreamValidator`.
+
+Requires pyarrow.
+
+"""
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+import bulwark.checks as ck
+from bulwark.streaming import StreamValidator
+
+_PROVERS = {}
+
+# Checks answered from the schema and row count alone
+_SCHEMA_CHECKS = (ck.has_columns, ck.has_dtypes, ck.is_shape)
+
+
+def _prover(*check_funcs):
+    """Registers a function that finds which column chunks prove `check_funcs` pass.
+
+    A prover takes the pd.DataFrame's columns and the check's parameters, and returns a list
+    of (column, predicate) pairs. Each predicate takes a column chunk's pyarrow statistics
+    (or None) and its pyarrow type, and returns True only if the chunk passes the check.
+
+    """
+    def register(prover):
+        for check_func in check_funcs:
+            _PROVERS[check_func] = prover
+        return prover
+    return register
+
+
+def _is_null_value(value):
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+def _is_number(value):
+    return isinstance(value, (int, float, np.number)) and not isinstance(value, (bool, np.bool_))
+
+
+def _no_values(values):
+    """Builds a predicate that holds for column chunks without any of `values`."""
+    import pyarrow.types as pat
+
+    values = list(values)
+
+    def predicate(stats, arrow_type):
+        if pat.is_dictionary(arrow_type):
+            arrow_type = arrow_type.value_type
+        floating = pat.is_floating(arrow_type)
+        numeric = floating or pat.is_integer(arrow_type)
+        for v in values:
+            if _is_null_value(v):
+                # Parquet doesn't count NaNs as nulls, so float chunks have to be read
+                proven = (not floating and stats is not None and stats.has_null_count and
+                          stats.null_count == 0)
+            elif isinstance(v, float) and np.isinf(v) and not floating:
+                proven = True
+            elif _is_number(v) and numeric:
+                proven = (stats is not None and stats.has_min_max and
+                          not stats.min <= v <= stats.max)
+            else:
+                proven = False
+            if not proven:
+                return False
+        return True
+
+    return predicate
+
+
+def _columns(df, columns):
+    columns = df.columns if columns is None else columns
+    return columns if pd.api.types.is_list_like(columns) else [columns]
+
+
+@_prover(ck.has_no_x)
+def _prove_has_no_x(df, values=None, columns=None, memory_budget=None):
+    predicate = _no_values(values if values is not None else [])
+    return [(col, predicate) for col in _columns(df, columns)]
+
+
+def _prove_no_special(values):
+    def prover(df, columns=None):
+        return _prove_has_no_x(df, values=values, columns=columns)
+    return prover
+
+
+_prover(ck.has_no_nans)(_prove_no_special([np.nan]))
+_prover(ck.has_no_nones)(_prove_no_special([None]))
+_prover(ck.has_no_infs)(_prove_no_special([np.inf]))
+_prover(ck.has_no_neg_infs)(_prove_no_special([-np.inf]))
+
+
+@_prover(ck.has_vals_within_range)
+def _prove_has_vals_within_range(df, items=None):
+    def within(lower, upper):
+        def predicate(stats, arrow_type):
+            if stats is None or not stats.has_min_max:
+                return False
+            return bool(stats.min >= lower) and bool(stats.max <= upper)
+        return predicate
+
+    return [(col, within(lower, upper)) for col, (lower, upper) in items.items()]
+
+
+class ParquetValidator(object):
+    """Validates a Parquet file, reading only the data its metadata can't vouch for.
+
+    Args:
+        path (str or file-like): The Parquet file.
+        checks (dict): Mapping of check functions to parameters for those check functions,
+                       as for `bulwark.checks.multi_check`.
+        warn (bool): Indicates whether an error should be raised
+                     or only a warning notification should be displayed.
+                     Default is to error.
+
+    """
+
+    def __init__(self, path, checks, warn=False):
+        import pyarrow.parquet as pq
+
+        self.file = pq.ParquetFile(path)
+        self.checks = checks
+        self.warn = warn
+
+        schema = self.file.schema_arrow
+        self.empty = schema.empty_table().to_pandas()
+        pandas_metadata = schema.pandas_metadata or {}
+        index_fields = [idx for idx in pandas_metadata.get("index_columns", [])
+                        if isinstance(idx, str)]
+        self._range = next((idx for idx in pandas_metadata.get("index_columns", [])
+                            if isinstance(idx, dict) and idx.get("kind") == "range"), None)
+        self.index_fields = [name for name in index_fields if name in schema.names]
+        names = [name for name in schema.names if name not in index_fields]
+        # pd.DataFrame column -> field name, which is a str even for e.g. int column names
+        self.fields = dict(zip(self.empty.columns, names))
+        self.types = {col: schema.field(name).type for col, name in self.fields.items()}
+
+        metadata = self.file.metadata
+        self.chunks = []  # row group -> field name -> list of column chunk metadata
+        for i in range(metadata.num_row_groups):
+            row_group = metadata.row_group(i)
+            chunks = {}
+            for j in range(row_group.num_columns):
+                chunk = row_group.column(j)
+                path = chunk.path_in_schema
+                field = path if path in schema.names else path.split(".")[0]
+                chunks.setdefault(field, []).append(chunk)
+            self.chunks.append(chunks)
+        self.bytes_read = 0
+
+    def _stats(self, row_group, col):
+        chunks = self.chunks[row_group].get(self.fields[col], [])
+        if len(chunks) != 1 or not chunks[0].is_stats_set:
+            return None
+        return chunks[0].statistics
+
+    def _size(self, row_group, fields):
+        return sum(chunk.total_compressed_size for field in fields
+                   for chunk in self.chunks[row_group].get(field, []))
+
+    def _read(self, row_group, columns, offset):
+        fields = [self.fields[col] for col in columns]
+        self.bytes_read += self._size(row_group, fields + self.index_fields)
+        df = self.file.read_row_group(row_group, columns=fields,
+                                      use_pandas_metadata=True).to_pandas()
+        if isinstance(df.index, pd.RangeIndex):
+            # Row groups don't know where they start in a stored RangeIndex
+            start, step = (self._range["start"], self._range["step"]) if self._range else (0, 1)
+            df.index = pd.RangeIndex(start + offset * step, start + (offset + len(df)) * step,
+                                     step, name=df.index.name)
+        return df
+
+    def _has_nulls(self, col):
+        """Whether `col` holds any nulls, or None if its statistics don't say."""
+        n_nulls = 0
+        for i in range(len(self.chunks)):
+            stats = self._stats(i, col)
+            if stats is None or not stats.has_null_count:
+                return None
+            n_nulls += stats.null_count
+        return n_nulls > 0
+
+    def _loaded(self):
+        """An empty pd.DataFrame with the dtypes `to_pandas` gives the whole file.
+
+        Integer columns with nulls load as float64 and boolean ones as object, which the
+        schema alone doesn't tell. Null counts do, and columns without them are read.
+
+        """
+        dtypes = {}
+        for col, dtype in self.empty.dtypes.items():
+            if not isinstance(dtype, np.dtype) or dtype.kind not in "biu":
+                continue
+            has_nulls = self._has_nulls(col)
+            if has_nulls is None:
+                field = self.fields[col]
+                self.bytes_read += sum(self._size(i, [field]) for i in range(len(self.chunks)))
+                dtypes[col] = self.file.read(columns=[field]).to_pandas()[field].dtype
+            elif has_nulls:
+                dtypes[col] = np.dtype(float) if dtype.kind in "iu" else np.dtype(object)
+        return self.empty.astype(dtypes) if dtypes else self.empty
+
+    def _schema_errors(self, func, params):
+        if func is ck.is_shape:
+            df = SimpleNamespace(shape=(self.file.metadata.num_rows, len(self.empty.columns)))
+        elif func is ck.has_dtypes:
+            df = self._loaded()
+        else:
+            df = self.empty
+        try:
+            func(df, **params)
+        except AssertionError as e:
+            return [str(e)]
+        return []
+
+    def _unproven(self, func, params):
+        """Returns, for each row group, the columns whose statistics don't prove `func`."""
+        try:
+            tasks = _PROVERS[func](self.empty, **params)
+        except Exception:
+            return None
+        if any(col not in self.fields for col, _ in tasks):
+            return None
+
+        unproven = []
+        for i in range(len(self.chunks)):
+            cols = []
+            for col, predicate in tasks:
+                try:
+                    proven = predicate(self._stats(i, col), self.types[col])
+                except Exception:
+                    proven = False
+                if not proven and col not in cols:
+                    cols.append(col)
+            unproven.append(cols)
+        return unproven
+
+    def validate(self):
+        """Runs the checks, raising (or printing, if `warn`) any failures.
+
+        Returns:
+            Dict with the number of row groups, how many were read, and the bytes
+            (compressed, as stored) of all column chunks, those read and those avoided.
+
+        """
+        error_msgs = []
+        stream_checks = {}
+        partial = []  # (func, params, unproven columns per row group)
+        for func, params in self.checks.items():
+            if func in _SCHEMA_CHECKS:
+                error_msgs.extend(self._schema_errors(func, params))
+                continue
+            unproven = self._unproven(func, params) if func in _PROVERS else None
+            if unproven is None:
+                stream_checks[func] = params
+            elif any(unproven):
+                partial.append((func, params, unproven))
+
+        validator = StreamValidator(stream_checks, label="Row group")
+        n_read = offset = 0
+        for i in range(len(self.chunks)):
+            n_rows = self.file.metadata.row_group(i).num_rows
+            columns = [col for col in self.empty.columns
+                       if stream_checks or any(col in unproven[i] for _, _, unproven in partial)]
+            if columns:
+                df = self._read(i, columns, offset)
+                n_read += 1
+                if stream_checks:
+                    validator.update(df)
+                for func, params, unproven in partial:
+                    if unproven[i]:
+                        error_msgs.extend("Row group {}: {}".format(i, e) for e in
+                                          self._check_columns(df, func, params, unproven[i]))
+            offset += n_rows
+
+        try:
+            validator.finalize()
+        except AssertionError as e:
+            error_msgs.append(str(e))
+
+        n_bytes = sum(self._size(i, chunks) for i, chunks in enumerate(self.chunks))
+        report = {"row_groups": len(self.chunks), "row_groups_read": n_read,
+                  "bytes": n_bytes, "bytes_read": self.bytes_read,
+                  "bytes_avoided": n_bytes - self.bytes_read}
+
+        if self.warn and error_msgs:
+            print(error_msgs)
+        elif error_msgs:
+            raise AssertionError("\n".join(error_msgs))
+        return report
+
+    @staticmethod
+    def _check_columns(df, func, params, columns):
+        """Runs `func` on just `columns` of `df`."""
+        params = dict(params)
+        if func is ck.has_vals_within_range:
+            params["items"] = {col: v for col, v in params["items"].items() if col in columns}
+        else:
+            params["columns"] = columns
+        try:
+            func(df, **params)
+        except AssertionError as e:
+            return [str(e)]
+        return []
+
+
+def parquet_check(path, checks, warn=False):
+    """Validates a Parquet file, reading only the data its metadata can't vouch for.
+
+    Args:
+        path (str or file-like): The Parquet file.
+        checks (dict): Mapping of check functions to parameters for those check functions.
+        warn (bool): Indicates whether an error should be raised
+                     or only a warning notification should be displayed.
+                     Default is to error.
+
+    Returns:
+        Dict of the row groups and bytes read and avoided. See `ParquetValidator.validate`.
+
+    """
+    return ParquetValidator(path, checks, warn=warn).validate()
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Compact, structured reports of failed checks, attached to the errors checks raise.
+
+A `ValidationReport` holds, for each violation, the name of the check, the column,
+the number of failing rows and a small sample of their positions and index labels,
+as np.ndarrays.
+Its message is formatted from those samples alone, so failures on large frames, and
+suites like `bulwark.checks.multi_check` combining many of them, stay cheap to raise.
+
+Examples:
+    >>> import bulwark.checks as ck
+    >>> import pandas as pd
+    >>> df = pd.DataFrame({'a': [1, 5, 9], 'b': ['x', 'y', 'z']})
+    >>> try:
+    ...     ck.multi_check(df, {ck.has_vals_within_range: {'items': {'a': (0, 4)}},
+    ...                         ck.has_vals_within_set: {'items': {'b': ['x']}}})
+    ... except AssertionError as e:
+    ...     report = e.report
+    >>> [(v.check, v.column, v.count, v.positions.tolist()) for v in report]
+    [('has_vals_within_range', 'a', 2, [1, 2]), ('has_vals_within_set', 'b', 2, [1, 2])]
+    >>> print(report)
+    has_vals_within_range: 2 row(s) of column 'a' failed, e.g. at index [1, 2]
+    has_vals_within_set: 2 row(s) of column 'b' failed, e.g. at index [1, 2]
+
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Number of failing row positions kept per violation
+SAMPLE_SIZE = 10
+
+
+class Violation(namedtuple("Violation", "check column count positions labels message")):
+    """A single entry of a `ValidationReport`.
+
+    Attributes:
+        check (str): Name of the check.
+        column: Column that failed, or None.
+        count (int): Number of failing rows, or -1 if unknown.
+        positions (np.ndarray): Sample of up to `SAMPLE_SIZE` failing row positions.
+        labels (np.ndarray): Index labels of the sampled rows.
+        message: The check's own message (or, for failures that aren't structured, e.g. of
+                 custom checks, the error), which is formatted in its place, or None.
+
+    """
+
+    __slots__ = ()
+
+    def __str__(self):
+        if self.message is not None:
+            return str(self.message)
+        return "{}: {} row(s) of column {!r} failed, e.g. at index {}".format(
+            self.check, self.count, self.column, self.labels.tolist())
+
+
+class ValidationReport(object):
+    """Violations of one or more checks, stored as arrays and formatted lazily.
+
+    Use `from_violations` or `concat` to build one.
+
+    Attributes:
+        checks (np.ndarray): Name of the check of each violation.
+        columns (np.ndarray): Column of each violation.
+        counts (np.ndarray): Number of failing rows of each violation.
+        positions (np.ndarray): Sampled failing row positions of all violations, concatenated.
+        labels (np.ndarray): Index labels of `positions`.
+        offsets (np.ndarray): Where each violation's positions start in `positions`,
+                              followed by their total length.
+        messages (np.ndarray): Unstructured failures, or None for each violation.
+
+    """
+
+    def __init__(self, checks, columns, counts, positions, labels, offsets, messages):
+        self.checks = checks
+        self.columns = columns
+        self.counts = counts
+        self.positions = positions
+        self.labels = labels
+        self.offsets = offsets
+        self.messages = messages
+
+    @classmethod
+    def from_violations(cls, violations):
+        """Builds a report from `Violation`s, keeping at most `SAMPLE_SIZE` positions each."""
+        violations = list(violations)
+        positions = [np.asarray(v.positions, dtype=np.int64)[:SAMPLE_SIZE] for v in violations]
+        offsets = np.zeros(len(violations) + 1, dtype=np.int64)
+        np.cumsum([len(p) for p in positions], out=offsets[1:])
+        return cls(_objects(v.check for v in violations),
+                   _objects(v.column for v in violations),
+                   np.array([v.count for v in violations], dtype=np.int64),
+                   np.concatenate(positions) if positions else np.empty(0, dtype=np.int64),
+                   _objects(label for v in violations for label in list(v.labels)[:SAMPLE_SIZE]),
+                   offsets,
+                   _objects(v.message for v in violations))
+
+    @classmethod
+    def from_columns(cls, check, index, violations, message=None):
+        """Builds a report of `check` failing in some columns.
+
+        Args:
+            check (str): Name of the check.
+            index (pd.Index): Index of the checked pd.DataFrame.
+            violations (list): (column, number of failing rows, failing row positions) tuples.
+            message (str): The check's own message, formatted in place of the violations'.
+
+        """
+        # Scalar lookups, since indexing a pd.RangeIndex with an array materializes it
+        return cls.from_violations(
+            Violation(check, col, count, positions,
+                      [index[pos] for pos in positions[:SAMPLE_SIZE]], message)
+            for col, count, positions in violations)
+
+    @classmethod
+    def from_error(cls, error, check=None):
+        """The report attached to `error`, or one holding `error` as an unstructured failure."""
+        report = getattr(error, "report", None)
+        if report is not None:
+            return report
+        return cls.from_violations([Violation(check, None, -1, (), (), error)])
+
+    @classmethod
+    def concat(cls, reports):
+        """Combines `reports` into one, in order."""
+        reports = list(reports)
+        if not reports:
+            return cls.from_violations([])
+        offsets = [np.zeros(1, dtype=np.int64)]
+        for r in reports:
+            offsets.append(r.offsets[1:] + offsets[-1][-1])
+        return cls(np.concatenate([r.checks for r in reports]),
+                   np.concatenate([r.columns for r in reports]),
+                   np.concatenate([r.counts for r in reports]),
+                   np.concatenate([r.positions for r in reports]),
+                   np.concatenate([r.labels for r in reports]),
+                   np.concatenate(offsets),
+                   np.concatenate([r.messages for r in reports]))
+
+    def __len__(self):
+        return len(self.checks)
+
+    def __getitem__(self, i):
+        if not -len(self) <= i < len(self):
+            raise IndexError("ValidationReport index out of range")
+        i %= len(self)
+        rows = slice(self.offsets[i], self.offsets[i + 1])
+        return Violation(self.checks[i], self.columns[i], int(self.counts[i]),
+                         self.positions[rows], self.labels[rows], self.messages[i])
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __str__(self):
+        return "\n".join(str(v) for v in self)
+
+    def __repr__(self):
+        return "<ValidationReport: {} violation(s) of {}>".format(
+            len(self), sorted(set(self.checks.tolist()), key=str))
+
+    def to_dict(self):
+        """The report as a list of dicts, e.g. to serialize as JSON."""
+        return [{"check": v.check, "column": v.column, "count": v.count,
+                 "positions": v.positions.tolist(), "labels": v.labels.tolist(),
+                 "message": None if v.message is None else str(v.message)} for v in self]
+
+
+def _objects(values):
+    values = list(values)
+    arr = np.empty(len(values), dtype=object)
+    arr[:] = values
+    return arr
+
+
+class ValidationError(AssertionError):
+    """An AssertionError carrying a `ValidationReport`, which its message is formatted from.
+
+    The message is only formatted when the error is printed, or its arguments are read,
+    so errors that are caught (e.g. by `bulwark.checks.multi_check`) stay cheap to raise.
+
+    Args:
+        *args: The error's arguments. Defaults to the report's message.
+        report (ValidationReport): Report of the failures.
+
+    """
+
+    def __init__(self, *args, report=None):
+        super(ValidationError, self).__init__(*args)
+        self.report = report
+
+    @property
+    def args(self):
+        args = BaseException.args.__get__(self)
+        if not args and self.report is not None:
+            args = self.args = (str(self.report),)
+        return args
+
+    @args.setter
+    def args(self, args):
+        BaseException.args.__set__(self, args)
+
+    def __str__(self):
+        if self.report is None:
+            return super(ValidationError, self).__str__()
+        return str(self.report)
+
+
+def _first_positions(bad, n):
+    """The positions of the first `n` True values of `bad`, scanning it in blocks."""
+    found = []
+    for start in range(0, len(bad), 1 << 16):
+        found.extend(start + np.flatnonzero(bad[start:start + (1 << 16)])[:n - len(found)])
+        if len(found) >= n:
+            break
+    return np.array(found, dtype=np.int64)
+
+
+def violation_error(check, column, bad, values, message):
+    """Builds the ValidationError of a check failing on the rows where `bad` is True.
+
+    Args:
+        check (str): Name of the check.
+        column: The failing column.
+        bad (array-like): Boolean mask of failing rows. Nulls count as passing.
+        values (pd.Series): The checked column.
+        message (str): The error's first argument. The second is a sample of up to
+                       `SAMPLE_SIZE` failing values of `values`, rather than all of them.
+
+    """
+    bad = np.asarray(bad)
+    if bad.dtype != bool:
+        bad = np.asarray(pd.Series(bad).fillna(False), dtype=bool)
+    positions = _first_positions(bad, SAMPLE_SIZE)
+    report = ValidationReport.from_columns(
+        check, values.index, [(column, int(np.count_nonzero(bad)), positions)])
+    return ValidationError(message, values.iloc[positions], report=report)
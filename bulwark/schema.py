@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+Declarative suites of checks, which can be stored as JSON or YAML and reused across services.
+
+A schema is a list of checks, each a mapping with the name of a function in `bulwark.checks`
+under ``check`` and its parameters::
+
+    {"checks": [{"check": "has_columns", "columns": ["id", "amount"]},
+                {"check": "has_no_nans", "columns": ["id"]},
+                {"check": "has_vals_within_range", "items": {"amount": [0, 1000]}},
+                {"check": "group_check", "by": "id", "func": "is_monotonic"}]}
+
+Other functions (e.g. for `custom_check`'s ``check_func``) are named by their import path,
+like ``"mypackage.checks.my_check"``.
+
+A `Schema` is compiled once: functions are resolved, parameters validated and value sets
+hashed. Bounds are converted to the dtypes of the columns they're compared with,
+once per distinct set of dtypes seen, so applying a schema repeatedly costs little more
+than running its checks.
+
+"""
+import importlib
+import json
+from collections import OrderedDict
+from inspect import getfullargspec, unwrap
+
+import numpy as np
+import pandas as pd
+
+import bulwark.checks as ck
+from bulwark import engine
+from bulwark.generic import ValueSet
+from bulwark.report import ValidationError, ValidationReport
+
+# Parameters that name check functions, rather than holding values
+_FUNC_PARAMS = {ck.group_check: "func", ck.custom_check: "check_func"}
+_UNSERIALIZABLE = (ck.is_same_as, ck.multi_check)
+
+
+def _resolve(name):
+    """Looks up a function by its name in `bulwark.checks`, or by its import path."""
+    if callable(name):
+        return name
+    func = getattr(ck, name, None)
+    if getattr(func, "__module__", None) == ck.__name__:
+        return func
+    module, _, attr = name.rpartition(".")
+    if not module:
+        raise ValueError("Unknown check: {!r}".format(name))
+    return getattr(importlib.import_module(module), attr)
+
+
+def _name(func):
+    if getattr(ck, func.__name__, None) is func:
+        return func.__name__
+    name = "{}.{}".format(func.__module__, func.__qualname__)
+    try:
+        importable = "<" not in name and _resolve(name) is func
+    except (ImportError, AttributeError):
+        importable = False
+    if not importable:
+        raise ValueError("{!r} can't be serialized, since it can't be imported by its name. "
+                         "Define it at the top level of a module instead.".format(func))
+    return name
+
+
+def _export(value):
+    """Converts a parameter to JSON and YAML types, e.g. sets to sorted lists."""
+    if callable(value):
+        return _name(value)
+    if isinstance(value, dict):
+        return {k: _export(v) for k, v in value.items()}
+    if isinstance(value, (set, frozenset)):
+        try:
+            value = sorted(value)
+        except TypeError:  # Values that can't be compared, e.g. None and strings
+            value = sorted(value, key=repr)
+    if isinstance(value, (list, tuple, set, frozenset, ValueSet, np.ndarray, pd.Index)):
+        return [_export(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _coerce_bound(bound, dtype):
+    """Converts a bound to `dtype`, where that doesn't change its meaning."""
+    if pd.api.types.is_datetime64_any_dtype(dtype) and isinstance(bound, str):
+        return pd.Timestamp(bound, tz=getattr(dtype, "tz", None))
+    if pd.api.types.is_integer_dtype(dtype) and isinstance(bound, float) and bound.is_integer():
+        return int(bound)
+    return bound
+
+
+class Schema(object):
+    """A compiled suite of checks.
+
+    Args:
+        checks (list or dict): List of mappings with a check function (or its name) under
+                               ``check`` and its parameters, or a mapping of check functions
+                               (or their names) to their parameters.
+
+    Examples:
+        >>> import pandas as pd
+        >>> from bulwark.schema import Schema
+        >>> schema = Schema.from_json('''
+        ...     {"checks": [{"check": "has_no_nans"},
+        ...                 {"check": "has_vals_within_range", "items": {"a": [0, 2]}}]}''')
+        >>> schema.validate(pd.DataFrame({'a': [1, 2, 3]}))
+        Traceback (most recent call last):
+            ...
+        bulwark.report.ValidationError: has_vals_within_range: 1 row(s) of column 'a' failed, \
+e.g. at index [2]
+
+    """
+
+    max_plans = 8
+
+    def __init__(self, checks):
+        if isinstance(checks, dict):
+            checks = [dict(params, check=func) for func, params in checks.items()]
+
+        self.spec = []
+        self.checks = []
+        for entry in checks:
+            params = dict(entry)
+            func = _resolve(params.pop("check"))
+            if func in _UNSERIALIZABLE:
+                raise ValueError("{} can't be part of a Schema.".format(func.__name__))
+            self._check_params(func, params)
+            self.spec.append(dict(check=_name(func), **params))
+
+            if func in _FUNC_PARAMS:
+                params[_FUNC_PARAMS[func]] = _resolve(params[_FUNC_PARAMS[func]])
+            if func is ck.is_shape:
+                params["shape"] = tuple(params["shape"])
+            self.checks.append((func, engine.compile_params(func, params)))
+
+        self._plans = OrderedDict()
+
+    @staticmethod
+    def _check_params(func, params):
+        spec = getfullargspec(unwrap(func))
+        if spec.varkw is not None:
+            return
+        unknown = set(params).difference(spec.args[1:] + spec.kwonlyargs)
+        if unknown:
+            raise ValueError("Unknown parameters for {}: {}"
+                             .format(func.__name__, sorted(unknown)))
+
+    @classmethod
+    def from_dict(cls, spec):
+        """Builds a Schema from a mapping with a list of checks under ``checks``."""
+        return cls(spec["checks"])
+
+    @classmethod
+    def from_json(cls, text):
+        """Builds a Schema from a JSON document. See `from_dict`."""
+        return cls.from_dict(json.loads(text))
+
+    @classmethod
+    def from_yaml(cls, text):
+        """Builds a Schema from a YAML document. See `from_dict`. Requires PyYAML."""
+        import yaml
+        return cls.from_dict(yaml.safe_load(text))
+
+    def to_dict(self):
+        """The Schema as a mapping, which `from_dict` turns back into an equivalent Schema.
+
+        Sets and tuples are exported as lists, and functions by their import path.
+        Functions that can't be imported by it, like lambdas, raise a ValueError.
+
+        """
+        return {"checks": [_export(entry) for entry in self.spec]}
+
+    def to_json(self, **kwargs):
+        """The Schema as a JSON document. `kwargs` are passed to ``json.dumps``."""
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_yaml(self, **kwargs):
+        """The Schema as a YAML document. `kwargs` are passed to ``yaml.safe_dump``."""
+        import yaml
+        return yaml.safe_dump(self.to_dict(), **kwargs)
+
+    def plan(self, df):
+        """The checks to run on `df`, with bounds converted to the dtypes of `df`'s columns.
+
+        Plans are cached by `df`'s dtypes, keeping the `max_plans` most recently used.
+
+        Returns:
+            List of (check function, parameters) pairs.
+
+        """
+        key = tuple(zip(df.columns, df.dtypes))
+        try:
+            self._plans.move_to_end(key)
+            return self._plans[key]
+        except (KeyError, TypeError):
+            pass
+
+        dtypes = dict(key) if df.columns.is_unique else {}
+        checks = []
+        for func, params in self.checks:
+            if func is ck.has_vals_within_range and isinstance(params.get("items"), dict):
+                params = dict(params, items={
+                    col: tuple(_coerce_bound(b, dtypes[col]) if col in dtypes else b
+                               for b in bounds)
+                    for col, bounds in params["items"].items()})
+            checks.append((func, params))
+
+        try:
+            self._plans[key] = checks
+        except TypeError:  # Unhashable column names
+            return checks
+        while len(self._plans) > self.max_plans:
+            self._plans.popitem(last=False)
+        return checks
+
+    def validate(self, df, warn=False, n_jobs=1):
+        """Asserts that all of the Schema's checks pass, like `bulwark.checks.multi_check`.
+
+        Args:
+            df (pd.DataFrame): Any pd.DataFrame.
+            warn (bool): Indicates whether an error should be raised
+                         or only a warning notification should be displayed.
+                         Default is to error.
+            n_jobs (int or None): Number of threads to run checks and columns across.
+
+        Returns:
+            Original `df`.
+
+        """
+        checks = self.plan(df)
+        results = engine.run_fused(df, checks, n_jobs=n_jobs)
+        errors = [(func, e) for (func, _), e in zip(checks, results) if e is not None]
+        error_msgs = [e for _, e in errors]
+
+        if warn and error_msgs:
+            print(error_msgs)
+        elif error_msgs:
+            raise ValidationError(report=ValidationReport.concat(
+                ValidationReport.from_error(e, func.__name__) for func, e in errors))
+        return df
@@ -0,0 +1,419 @@
+# -*- coding: utf-8 -*-
+"""
+Probabilistic sketches of the values in a column, for checks on data too large to hold
+every distinct value in memory.
+
+- A `BloomFilter` flags values that were probably seen before, in 1.5 (at 1% false positives)
+  to 3 (at 0.1%) bytes per value. It never misses a repeat, so the few values it flags
+  can then be counted exactly to rule out false positives.
+- A `HyperLogLog` estimates the number of distinct values, within about ``error_rate``,
+  in ``(1.04 / error_rate) ** 2`` bytes regardless of how many values it has seen.
+
+Both can be merged with sketches of the same size built elsewhere, e.g. from other chunks
+or in other processes, and are picklable.
+Values are hashed with ``pd.util.hash_array`` (see `hash_values`), and nulls are ignored.
+
+Examples:
+    >>> import pandas as pd
+    >>> from bulwark.sketches import BloomFilter, HyperLogLog
+    >>> bloom = BloomFilter(capacity=1000)
+    >>> bloom.add(pd.Series([1, 2, 3])).tolist()
+    [False, False, False]
+    >>> bloom.add(pd.Series([3, 4, 4])).tolist()
+    [True, False, True]
+    >>> hll = HyperLogLog()
+    >>> hll.add(pd.Series(range(1000)))
+    >>> round(hll.count(), -2)
+    1000.0
+
+"""
+import math
+import numbers
+
+import numpy as np
+import pandas as pd
+
+from bulwark.generic import memory_batches
+
+# Capacity of Bloom filters that can't be sized from the data, e.g. when streaming
+DEFAULT_CAPACITY = 10 ** 7
+
+
+def _hash_numbers(values):
+    """Hashes a numeric np.ndarray, so that equal numbers hash the same whatever their dtype.
+
+    Integers are hashed as int64s (or uint64s, which hash the same where they overlap),
+    and so are floats with an integral value in their range. Other floats are hashed as
+    float64s.
+
+    """
+    if values.dtype.kind == "u":
+        return pd.util.hash_array(values.astype(np.uint64))
+    if values.dtype.kind in "bi":
+        return pd.util.hash_array(values.astype(np.int64))
+    values = values.astype(np.float64)
+    hashes = pd.util.hash_array(values)
+    integral = (np.floor(values) == values) & (np.abs(values) < 2. ** 63)
+    if integral.any():
+        hashes[integral] = pd.util.hash_array(values[integral].astype(np.int64))
+    return hashes
+
+
+def _number(value):
+    """`value` as an int64, uint64 or float64 scalar, or None if it isn't a real number."""
+    if not isinstance(value, numbers.Real):
+        return None
+    if isinstance(value, numbers.Integral) and -2 ** 63 <= value < 2 ** 64:
+        return np.int64(value) if value < 2 ** 63 else np.uint64(value)
+    try:
+        return np.float64(value)
+    except OverflowError:
+        return None
+
+
+def _hash_objects(values):
+    """Hashes an object np.ndarray, with numbers hashed as by `_hash_numbers`.
+
+    Other objects than strings, e.g. tuples, are hashed by their string representation.
+
+    """
+    hashes = np.empty(len(values), dtype=np.uint64)
+    as_numbers = [_number(v) for v in values]
+    numeric = np.array([v is not None for v in as_numbers], dtype=bool)
+    if numeric.any():
+        nums = [v for v in as_numbers if v is not None]
+        kinds = np.array([v.dtype.kind for v in nums])
+        num_hashes = np.empty(len(nums), dtype=np.uint64)
+        for kind, dtype in (("i", np.int64), ("u", np.uint64), ("f", np.float64)):
+            of_kind = kinds == kind
+            if of_kind.any():
+                num_hashes[of_kind] = _hash_numbers(
+                    np.array([v for v, k in zip(nums, kinds) if k == kind], dtype=dtype))
+        hashes[numeric] = num_hashes
+    if not numeric.all():
+        others = values[~numeric]
+        if pd.api.types.infer_dtype(others, skipna=False) != "string":
+            others = np.array([str(v) for v in others], dtype=object)
+        hashes[~numeric] = pd.util.hash_array(others, categorize=False)
+    return hashes
+
+
+def hash_values(values):
+    """Hashes the non-null `values` into uint64s.
+
+    Equal numbers hash the same whatever their type or dtype, e.g. 1, 1.0 and np.int8(1).
+    Strings, datetimes and timedeltas hash the same if they're equal and of the same type.
+    Other objects, like tuples, are hashed by their string representation, so equal ones
+    with different representations, like ``(1, 2)`` and ``(1.0, 2)``, hash differently.
+
+    Args:
+        values (pd.Series or pd.Index): Any values.
+
+    Returns:
+        Tuple of (np.ndarray of uint64 hashes, boolean np.ndarray that is True where
+        `values` isn't null).
+
+    """
+    if isinstance(values, pd.MultiIndex):
+        values = values.to_flat_index()
+    notnull = ~np.asarray(pd.isna(values), dtype=bool)
+    if pd.api.types.is_categorical_dtype(values.dtype):
+        # Each category is hashed once
+        categories, _ = hash_values(pd.Index(values.array.categories))
+        return categories[np.asarray(values.array.codes)[notnull]], notnull
+
+    arr = np.asarray(values)
+    if not notnull.all():
+        arr = arr[notnull]
+    if arr.dtype.kind in "biuf":
+        return _hash_numbers(arr), notnull
+    if arr.dtype == object and pd.api.types.infer_dtype(arr, skipna=False) != "string":
+        return _hash_objects(arr), notnull
+    return pd.util.hash_array(arr, categorize=False), notnull
+
+
+def _bit_length(values):
+    """Number of bits needed to represent each of the uint64 `values`."""
+    high, low = values >> np.uint64(32), values & np.uint64(0xFFFFFFFF)
+    # Exact, since 32-bit integers are represented exactly as floats
+    return np.where(high > 0, 32 + np.frexp(high.astype(np.float64))[1],
+                    np.frexp(low.astype(np.float64))[1])
+
+
+def _false_positive_rate(bits_per_value, n_hashes):
+    """False positive rate of a full `BloomFilter` with 64-bit blocks.
+
+    The number of values per block is Poisson distributed, and each sets `n_hashes`
+    of its block's 64 bits, at random.
+
+    """
+    load = 64 / bits_per_value
+    rate = 0
+    for n_values in range(int(load + 10 * math.sqrt(load) + 10)):
+        weight = math.exp(n_values * math.log(load) - load - math.lgamma(n_values + 1))
+        rate += weight * (1 - (63 / 64) ** (n_hashes * n_values)) ** n_hashes
+    return rate
+
+
+class BloomFilter(object):
+    """A set of hashes that can tell if a value was probably added before.
+
+    It's blocked: all bits of a value are in a single 64-bit word, so each lookup
+    is a single memory access. This takes somewhat more bits than a classic Bloom filter
+    for the same false positive rate, e.g. 3 instead of 1.8 bytes per value at 0.1%.
+
+    Args:
+        capacity (int): Number of distinct values the filter is sized for. Beyond it,
+                        the false positive rate rises, but repeats are still never missed.
+        error_rate (float): False positive rate once `capacity` values were added.
+
+    Attributes:
+        n_hashes (int): Number of bits set per value, up to 10.
+        words (np.ndarray): The filter, as uint64 words.
+        n_new (int): Number of values added that weren't flagged as repeats.
+
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        if not 0 < error_rate < 1:
+            raise ValueError("`error_rate` must be between 0 and 1.")
+        bits_per_value = 1.
+        while True:
+            rates = [_false_positive_rate(bits_per_value, k) for k in range(1, 11)]
+            if min(rates) <= error_rate or bits_per_value > 1024:
+                break
+            bits_per_value *= 1.05
+        self.n_hashes = int(np.argmin(rates)) + 1
+        n_words = int(math.ceil(max(int(capacity), 1) * bits_per_value / 64))
+        self.words = np.zeros(n_words, dtype=np.uint64)
+        self.n_new = 0
+
+    def _blocks(self, hashes):
+        """The word and bit mask of each hash."""
+        words = (hashes % np.uint64(len(self.words))).astype(np.intp)
+        bits = (hashes ^ (hashes >> np.uint64(29))) * np.uint64(0x9E3779B97F4A7C15)
+        masks = np.zeros(len(hashes), dtype=np.uint64)
+        for i in range(self.n_hashes):
+            masks |= np.uint64(1) << ((bits >> np.uint64(6 * i)) & np.uint64(63))
+        return words, masks
+
+    def contains(self, values):
+        """Whether each of `values` was probably added before. Nulls never were.
+
+        Args:
+            values (pd.Series or pd.Index): Any values.
+
+        Returns:
+            Boolean np.ndarray, aligned with `values`.
+
+        """
+        hashes, notnull = hash_values(values)
+        found = np.zeros(len(notnull), dtype=bool)
+        found[notnull] = self.contains_hashes(hashes)
+        return found
+
+    def contains_hashes(self, hashes):
+        """Like `contains`, for values already hashed with `hash_values`."""
+        words, masks = self._blocks(hashes)
+        return self.words[words] & masks == masks
+
+    def add(self, values):
+        """Adds `values` to the filter, flagging the ones that were probably added before.
+
+        Values repeated within `values` are flagged after their first occurrence.
+
+        Args:
+            values (pd.Series or pd.Index): Any values. Nulls are skipped.
+
+        Returns:
+            Boolean np.ndarray, aligned with `values`, that is True for probable repeats.
+
+        """
+        hashes, notnull = hash_values(values)
+        flagged = np.zeros(len(notnull), dtype=bool)
+        flagged[notnull] = self.add_hashes(hashes)
+        return flagged
+
+    def add_hashes(self, hashes):
+        """Like `add`, for values already hashed with `hash_values`."""
+        words, masks = self._blocks(hashes)
+        repeats = self.words[words] & masks == masks
+
+        # Sorting finds repeated hashes without a hash table of the whole batch
+        ordered = np.sort(hashes)
+        repeated = ordered[1:][ordered[1:] == ordered[:-1]]
+        if len(repeated):
+            candidates = np.flatnonzero(pd.Series(hashes).isin(repeated).to_numpy())
+            repeats[candidates] |= pd.Series(hashes[candidates]).duplicated().to_numpy()
+        del ordered
+
+        np.bitwise_or.at(self.words, words, masks)
+        self.n_new += len(hashes) - int(np.count_nonzero(repeats))
+        return repeats
+
+    def merge(self, other):
+        """Adds every value of another filter of the same size.
+
+        Values added to both aren't flagged, so to find repeats across them, the values
+        of either have to be looked up in the other (see `contains`) before merging.
+
+        Args:
+            other (BloomFilter): Values added elsewhere, e.g. in another partition.
+
+        Returns:
+            This filter.
+
+        """
+        if (len(self.words), self.n_hashes) != (len(other.words), other.n_hashes):
+            raise ValueError("Only BloomFilters of the same size can be merged.")
+        self.words |= other.words
+        self.n_new += other.n_new
+        return self
+
+    def count(self):
+        """Estimated number of distinct values added, from the number of words in use."""
+        n_used = int(np.count_nonzero(self.words))
+        if n_used >= len(self.words):
+            return math.inf
+        return -len(self.words) * math.log1p(-n_used / len(self.words))
+
+    def bounds(self, z=4):
+        """Bounds on the number of distinct values added.
+
+        Args:
+            z (float): Number of standard errors of `count` to allow on either side.
+
+        Returns:
+            Tuple of (lower bound, upper bound).
+
+        """
+        count = self.count()
+        if math.isinf(count):
+            return 0, math.inf
+        load = count / len(self.words)
+        std = math.sqrt(len(self.words) * (math.expm1(load) - load))
+        return max(count - z * std, 0), count + z * std
+
+
+class HyperLogLog(object):
+    """An estimate of the number of distinct values seen.
+
+    Args:
+        error_rate (float): Relative standard error of the estimate. Sets the number of
+                            registers, a power of 2 between 16 and 2**18.
+
+    Attributes:
+        precision (int): log2 of the number of registers.
+        registers (np.ndarray): One uint8 per register.
+
+    """
+
+    def __init__(self, error_rate=0.01):
+        if not 0 < error_rate < 1:
+            raise ValueError("`error_rate` must be between 0 and 1.")
+        self.precision = min(max(int(math.ceil(2 * math.log2(1.04 / error_rate))), 4), 18)
+        self.registers = np.zeros(1 << self.precision, dtype=np.uint8)
+
+    @property
+    def error_rate(self):
+        """Relative standard error of `count`."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add(self, values):
+        """Adds `values`. Nulls are skipped.
+
+        Args:
+            values (pd.Series or pd.Index): Any values.
+
+        """
+        hashes, _ = hash_values(values)
+        width = 64 - self.precision
+        buckets = (hashes >> np.uint64(width)).astype(np.intp)
+        rest = hashes & np.uint64((1 << width) - 1)
+        # Position of the first set bit of the remaining bits
+        ranks = (width + 1 - _bit_length(rest)).astype(np.uint8)
+        np.maximum.at(self.registers, buckets, ranks)
+
+    def merge(self, other):
+        """Adds every value of another HyperLogLog with the same precision.
+
+        Args:
+            other (HyperLogLog): Values seen elsewhere, e.g. in another partition.
+
+        Returns:
+            This HyperLogLog.
+
+        """
+        if self.precision != other.precision:
+            raise ValueError("Only HyperLogLogs of the same precision can be merged.")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        """Estimated number of distinct values added."""
+        m = len(self.registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        n_empty = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and n_empty:
+            # Linear counting is more accurate for few values
+            return m * math.log(m / n_empty)
+        return float(estimate)
+
+    def bounds(self, z=4):
+        """Bounds on the number of distinct values added.
+
+        Args:
+            z (float): Number of standard errors of `count` to allow on either side.
+
+        Returns:
+            Tuple of (lower bound, upper bound).
+
+        """
+        count = self.count()
+        return max(count * (1 - z * self.error_rate), 0), count * (1 + z * self.error_rate)
+
+
+def _rows(values, rows):
+    return values[rows] if isinstance(values, pd.Index) else values.iloc[rows]
+
+
+def duplicated_values(values, error_rate=0.001, capacity=None):
+    """Finds the values that occur more than once, without a hash table of every value.
+
+    Values are added to a `BloomFilter` one batch of rows at a time, and the values it flags
+    as probable repeats are then counted exactly, in a second pass. Only equal values that
+    hash differently (see `hash_values`), like ``(1, 2)`` and ``(1.0, 2)``, can be missed.
+
+    Args:
+        values (pd.Series or pd.Index): Any values. A pd.MultiIndex is treated as tuples.
+        error_rate (float): The filter's false positive rate. Only affects how many values
+                            are counted exactly, not the result.
+        capacity (int): Number of distinct values to size the filter for.
+                        Default is ``len(values)``.
+
+    Returns:
+        pd.Index of the values that occur more than once, with a null if several are null.
+
+    """
+    if isinstance(values, pd.MultiIndex):
+        values = values.to_flat_index()
+    bloom = BloomFilter(len(values) if capacity is None else capacity, error_rate)
+    flagged = []
+    n_nulls = 0
+    # Hashes, a few masks and the bit positions being set
+    for rows in memory_batches(len(values), 40):
+        batch = _rows(values, rows)
+        repeats = bloom.add(batch)
+        n_nulls += int(np.count_nonzero(pd.isna(batch)))
+        if repeats.any():
+            flagged.append(pd.Index(batch[repeats]))
+
+    dups = pd.Index([])
+    if flagged:
+        candidates = flagged[0].append(flagged[1:]).unique()
+        matches = pd.Index(values[np.asarray(values.isin(candidates), dtype=bool)])
+        dups = matches[matches.duplicated()].unique()
+    if n_nulls > 1:
+        dups = dups.insert(len(dups), np.nan)
+    return dups
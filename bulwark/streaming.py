@@ -0,0 +1,951 @@
+# -*- coding: utf-8 -*-
+"""
+Validation of pd.DataFrames that arrive as an iterator of chunks.
+
+E.g. the result of ``pd.read_csv(path, chunksize=...)``, which can't be checked with
+`bulwark.checks` directly, since cross-row properties break at chunk boundaries.
+
+Checks that only look at one row at a time are run on each chunk on their own.
+Checks on cross-row properties keep a running state across chunks instead:
+
+- `unique` and `has_unique_index` keep the (sorted, unique) values seen so far,
+- `has_unique_key` keeps the 64-bit hashes of the keys seen so far,
+- `approx_unique` and `has_approx_unique_index` keep a Bloom filter and counts of the values
+  it flags as probably repeated, and only fail values seen twice. The others are warned
+  about, and `StreamValidator.confirm` can count them exactly in a second pass,
+- `has_distinct_count` keeps a HyperLogLog,
+- `is_monotonic` carries the last value of each column (in each group, with ``by``) over
+  to the next chunk,
+- `has_set_within_vals` keeps the values that haven't been seen yet,
+- `has_vals_within_n_std` keeps a running count, mean, variance, min and max,
+- `one_to_many` keeps the first ``unitcol`` value seen for each ``manycol`` value,
+- `is_shape` keeps a running row count,
+- `group_check` keeps a validator for each group (or, for checks of single rows,
+  the failing groups), and
+- `multi_check` keeps a validator of its own.
+
+Other checks, e.g. `custom_check` and `is_same_as`, can't be validated chunk-by-chunk,
+so `StreamValidator` rejects them.
+
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+import bulwark.checks as ck
+from bulwark import engine
+from bulwark.generic import MAX_BAD_LOCATIONS, comparable, hash_rows, monotonic_pairs
+from bulwark.groups import group_codes
+from bulwark.sketches import DEFAULT_CAPACITY, BloomFilter, HyperLogLog, hash_values
+
+_STATES = {}
+
+
+def _state(*check_funcs):
+    """Registers a class that validates any of `check_funcs` across chunks."""
+    def register(cls):
+        for check_func in check_funcs:
+            _STATES[check_func] = cls
+        return cls
+    return register
+
+
+class SeenValues(object):
+    """Set of the values seen in a stream, kept as a few sorted runs of unique keys.
+
+    Runs are merged whenever the newest one is at least as large as the one before it,
+    so there are at most log2(n) runs and each lookup is a binary search per run.
+    Numeric and datetime values are stored as-is, so the set is exact for them. Other values
+    are stored as 64-bit hashes (see ``pd.util.hash_array``), so two distinct values may
+    collide and be taken for a repeat, though with n values that's only expected
+    ~n**2 / 2**65 times.
+
+    """
+
+    def __init__(self):
+        self._runs = []
+        self._n_nulls = 0
+        self.hashed = False
+
+    def _keys(self, values):
+        arr = np.asarray(values)
+        if arr.dtype.kind in "biufmM":
+            return arr
+        self.hashed = True
+        return pd.util.hash_array(arr.astype(object))
+
+    def _seen(self, uniq):
+        """Returns the keys of `uniq` (sorted, unique keys) that are already in the set."""
+        seen = []
+        for run in self._runs:
+            pos = np.searchsorted(run, uniq).clip(max=len(run) - 1)
+            seen.append(uniq[run[pos] == uniq])
+        return seen
+
+    def _push(self, *runs):
+        self._runs.extend(run for run in runs if len(run))
+        self._runs.sort(key=len, reverse=True)
+        while len(self._runs) > 1 and len(self._runs[-2]) <= len(self._runs[-1]):
+            newest = self._runs.pop()
+            self._runs[-1] = np.union1d(self._runs[-1], newest)
+
+    def add(self, values):
+        """Adds `values` to the set.
+
+        Args:
+            values (pd.Series or pd.Index): Values to add.
+
+        Returns:
+            pd.Index of the `values` that were already seen, or are duplicated within `values`.
+
+        """
+        values = pd.Index(values)
+        nulls = values.isna()
+        n_nulls_before = self._n_nulls
+        self._n_nulls += int(nulls.sum())
+        values = values[~nulls]
+
+        keys = self._keys(values)
+        uniq, counts = np.unique(keys, return_counts=True)
+        dup_keys = [uniq[counts > 1]] + self._seen(uniq)
+        self._push(uniq)
+
+        dups = values[np.isin(keys, np.concatenate(dup_keys))].unique()
+        if self._n_nulls > 1 and n_nulls_before < self._n_nulls:
+            dups = dups.insert(len(dups), np.nan)
+        return dups
+
+    def merge(self, other):
+        """Adds every value of another `SeenValues` to the set.
+
+        Args:
+            other (SeenValues): Values seen elsewhere, e.g. in another partition.
+
+        Returns:
+            pd.Index of the keys in both sets, which are values unless `hashed`.
+
+        """
+        dup_keys = [np.empty(0, dtype=run.dtype) for run in self._runs[:1] + other._runs[:1]]
+        for run in other._runs:
+            dup_keys.extend(self._seen(run))
+        self._push(*other._runs)
+        self.hashed = self.hashed or other.hashed
+
+        dups = pd.Index(np.unique(np.concatenate(dup_keys)) if dup_keys else [])
+        if self._n_nulls and other._n_nulls:
+            dups = dups.insert(len(dups), np.nan)
+        self._n_nulls += other._n_nulls
+        return dups
+
+
+@_state(ck.unique)
+class _Unique(object):
+    def __init__(self, columns=None):
+        self.columns = columns
+        self.seen = {}
+        self.bad = []
+
+    def update(self, chunk):
+        columns = chunk.columns if self.columns is None else self.columns
+        for col in columns:
+            seen = self.seen.setdefault(col, SeenValues())
+            if len(seen.add(chunk[col])) and col not in self.bad:
+                self.bad.append(col)
+
+    def merge(self, other):
+        for col, seen in other.seen.items():
+            if col not in self.seen:
+                self.seen[col] = seen
+            elif len(self.seen[col].merge(seen)) and col not in self.bad:
+                self.bad.append(col)
+        self.bad.extend(col for col in other.bad if col not in self.bad)
+
+    def finalize(self):
+        return ["Column {!r} contains non-unique values".format(col) for col in self.bad]
+
+
+@_state(ck.has_unique_index, ck.unique_index)
+class _UniqueIndex(object):
+    def __init__(self):
+        self.seen = SeenValues()
+        self.dups = []
+        # Repeats found by merging hashed sets, whose values aren't known
+        self.n_hashed_dups = 0
+
+    def update(self, chunk):
+        self.dups.extend(self.seen.add(chunk.index).tolist())
+
+    def merge(self, other):
+        self.dups.extend(other.dups)
+        self.n_hashed_dups += other.n_hashed_dups
+        dups = self.seen.merge(other.seen)
+        if self.seen.hashed:
+            self.n_hashed_dups += len(dups)
+        else:
+            self.dups.extend(dups.tolist())
+
+    def finalize(self):
+        if self.n_hashed_dups:
+            return ["Index contains non-unique values: {} and {} more across chunks"
+                    .format(self.dups, self.n_hashed_dups)]
+        if self.dups:
+            return ["Index contains non-unique values: {}".format(self.dups)]
+        return []
+
+
+@_state(ck.has_unique_key)
+class _UniqueKey(object):
+    """Keys are only kept as row hashes, so a repeat across chunks may be a hash collision.
+
+    With n keys that's expected ~n**2 / 2**65 times, e.g. once in ~10**7 streams of 10**6 rows.
+
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.seen = SeenValues()
+        self.n_dups = 0
+
+    def update(self, chunk):
+        self.n_dups += len(self.seen.add(hash_rows(chunk, self.columns)))
+
+    def merge(self, other):
+        self.n_dups += other.n_dups + len(self.seen.merge(other.seen))
+
+    def finalize(self):
+        if self.n_dups:
+            return ["{} duplicated key(s) in {}".format(self.n_dups, self.columns)]
+        return []
+
+
+@_state(ck.approx_unique)
+class _ApproxUnique(object):
+    """Flags probable repeats with a Bloom filter per column, without keeping every value.
+
+    Values the filter flags are candidates, whose occurrences are counted exactly from
+    then on. Only candidates seen at least twice fail the check. The others may have been
+    seen once before being flagged, or be false positives, so they're only warned about,
+    until `StreamValidator.confirm` counts them in a second pass. If the distinct hashes of
+    the values seen are kept (see `keep_hashes`), candidates are found with them instead,
+    so they're counted exactly from their first occurrence.
+
+    Repeats across merged validators are found by looking up the distinct hashes of the
+    following validator's values in the preceding one's filter, if it kept them
+    (see `keep_hashes`). Otherwise, they're only estimated, as the shortfall of the merged
+    filter's estimated number of distinct values from the number of values no side flagged.
+
+    """
+
+    # Whether to keep the distinct hashes of the values seen, to count repeats exactly
+    keep_hashes = False
+
+    def __init__(self, columns=None, error_rate=0.001, capacity=None):
+        self.columns = columns
+        self.error_rate = error_rate
+        self.capacity = DEFAULT_CAPACITY if capacity is None else capacity
+        self.filters = {}
+        self.n_nulls = {}
+        # Candidates' hashes -> number of occurrences seen, and a value, where one was seen
+        self.counts = {}
+        self.values = {}
+        self.hashes = {}
+        # Keys of filters merged without hashes, whose repeats across them are estimated
+        self.estimated = set()
+        # Total counts of the candidates, from `StreamValidator.confirm`
+        self.confirmed = None
+
+    def _values(self, chunk):
+        columns = chunk.columns if self.columns is None else self.columns
+        return [(col, chunk[col]) for col in columns]
+
+    def _name(self, key):
+        return "Column {!r}".format(key)
+
+    def _add_candidates(self, key, counts, values):
+        """Adds occurrences of (possibly new) candidates.
+
+        Args:
+            key: The column.
+            counts (pd.Series): Number of occurrences seen, by hash.
+            values (pd.Series): Values seen, by hash, which may repeat.
+
+        """
+        self.counts[key] = self.counts[key].add(counts, fill_value=0).astype(np.int64)
+        self._remember(key, values)
+
+    def _remember(self, key, values):
+        """Keeps one of `values` (by hash) for each hash that doesn't have one yet."""
+        known = self.values[key]
+        self.values[key] = pd.concat(
+            [known, values[~values.index.duplicated() & ~values.index.isin(known.index)]])
+
+    def _init(self, key):
+        self.filters[key] = BloomFilter(self.capacity, self.error_rate)
+        self.n_nulls[key] = 0
+        self.counts[key] = pd.Series([], dtype=np.int64, index=pd.Index([], dtype=np.uint64))
+        self.values[key] = pd.Series([], dtype=object, index=pd.Index([], dtype=np.uint64))
+        self.hashes[key] = np.array([], dtype=np.uint64)
+
+    def _seen(self, values, candidates):
+        """The occurrences of `candidates` (hashes) in `values`, as (counts, values) by hash."""
+        hashes, notnull = hash_values(values)
+        found = candidates.get_indexer(hashes) >= 0
+        return (pd.Series(hashes[found]).value_counts(),
+                pd.Series(np.asarray(values)[notnull][found], index=hashes[found], dtype=object))
+
+    def update(self, chunk):
+        for key, values in self._values(chunk):
+            if key not in self.filters:
+                self._init(key)
+            hashes, notnull = hash_values(values)
+            self.n_nulls[key] += len(notnull) - len(hashes)
+            repeats = self.filters[key].add_hashes(hashes)
+            candidates = self.counts[key].index
+            if self.keep_hashes:
+                # Repeats are known exactly: values seen in earlier chunks, or twice in this one
+                known = self.hashes[key]
+                pos = np.searchsorted(known, hashes).clip(max=max(len(known) - 1, 0))
+                seen = (known[pos] == hashes) if len(known) else np.zeros(len(hashes), bool)
+                repeats = seen | pd.Index(hashes).duplicated()
+                # Values seen once before becoming candidates
+                before = pd.Index(np.unique(hashes[seen])).difference(candidates)
+                self._add_candidates(key, pd.Series(1, index=before, dtype=np.int64),
+                                     self.values[key][:0])
+                self.hashes[key] = np.union1d(known, hashes)
+            if repeats.any():
+                candidates = candidates.union(pd.Index(np.unique(hashes[repeats])))
+            if len(candidates):
+                self._add_candidates(key, *self._seen(values, candidates))
+
+    def merge(self, other):
+        for key, bloom in other.filters.items():
+            if key not in self.filters:
+                self._init(key)
+            counts = other.counts[key]
+            if other.keep_hashes:
+                # Values of `other` that were probably seen here too become candidates,
+                # each seen at least once by `other`
+                hashes = other.hashes[key]
+                cross = pd.Index(hashes[self.filters[key].contains_hashes(hashes)])
+                counts = counts.reindex(counts.index.union(cross), fill_value=1)
+            elif self.filters[key].n_new:
+                self.estimated.add(key)
+            self._add_candidates(key, counts, other.values[key])
+            self.filters[key].merge(bloom)
+            self.n_nulls[key] += other.n_nulls[key]
+            if self.keep_hashes:
+                self.hashes[key] = np.union1d(self.hashes[key], other.hashes[key])
+        self.estimated.update(other.estimated)
+
+    def confirm(self, chunk):
+        if self.confirmed is None:
+            self.confirmed = {key: counts * 0 for key, counts in self.counts.items()}
+        for key, values in self._values(chunk):
+            confirmed = self.confirmed.get(key)
+            if confirmed is not None and len(confirmed):
+                counts, seen = self._seen(values, confirmed.index)
+                self.confirmed[key] = confirmed.add(counts, fill_value=0).astype(np.int64)
+                self._remember(key, seen)
+
+    def _repeated(self, key):
+        counts = self.counts[key] if self.confirmed is None else self.confirmed[key]
+        return counts.index[counts > 1]
+
+    def unconfirmed(self):
+        """Messages about values that may be repeated, but weren't seen twice."""
+        msgs = []
+        for key, bloom in self.filters.items():
+            possible = self.counts[key].index[self.counts[key] == 1]
+            if self.confirmed is None and len(possible):
+                examples = self.values[key].reindex(possible[:MAX_BAD_LOCATIONS]).dropna()
+                msgs.append("{} may contain non-unique values: {} value(s) were probably seen "
+                            "before they were counted{}".format(
+                                self._name(key), len(possible),
+                                ", e.g. {}".format(examples.tolist()) if len(examples) else ""))
+            if key in self.estimated and bloom.n_new > bloom.bounds()[1]:
+                msgs.append("{} may contain about {} value(s) repeated across merged chunks"
+                            .format(self._name(key), int(round(bloom.n_new - bloom.count()))))
+        return msgs
+
+    def finalize(self):
+        msgs = []
+        for key in self.filters:
+            dups = self.values[key].reindex(self._repeated(key))
+            try:
+                dups = sorted(dups)
+            except TypeError:  # Values that can't be compared, e.g. None and strings
+                dups = dups.tolist()
+            if self.n_nulls[key] > 1:
+                dups.append(np.nan)
+            if dups:
+                msgs.append("{} contains non-unique values: {}".format(
+                    self._name(key), dups[:MAX_BAD_LOCATIONS]))
+        return msgs
+
+
+@_state(ck.has_approx_unique_index)
+class _ApproxUniqueIndex(_ApproxUnique):
+    def __init__(self, error_rate=0.001, capacity=None):
+        super(_ApproxUniqueIndex, self).__init__(None, error_rate, capacity)
+
+    def _values(self, chunk):
+        index = chunk.index
+        return [(None, index.to_flat_index() if isinstance(index, pd.MultiIndex) else index)]
+
+    def _name(self, key):
+        return "Index"
+
+
+@_state(ck.has_distinct_count)
+class _DistinctCount(object):
+    """Only fails columns whose estimated number of distinct values is clearly out of bounds.
+
+    Counting them exactly would take a hash table of every distinct value, so columns whose
+    estimates are close to their bounds pass.
+
+    """
+
+    def __init__(self, items, error_rate=0.01):
+        self.items = items
+        self.sketches = {col: HyperLogLog(error_rate) for col in items}
+
+    def update(self, chunk):
+        for col, sketch in self.sketches.items():
+            sketch.add(chunk[col])
+
+    def merge(self, other):
+        for col, sketch in self.sketches.items():
+            sketch.merge(other.sketches[col])
+
+    def finalize(self):
+        msgs = []
+        for col, (lower, upper) in self.items.items():
+            low, high = self.sketches[col].bounds()
+            if (lower is not None and high < lower) or (upper is not None and low > upper):
+                msgs.append("Column {!r} has about {:.0f} distinct value(s), outside {}"
+                            .format(col, self.sketches[col].count(), (lower, upper)))
+        return msgs
+
+
+@_state(ck.is_monotonic)
+class _Monotonic(object):
+    def __init__(self, items=None, increasing=None, strict=False, by=None):
+        self.items = items
+        self.increasing = increasing
+        self.strict = strict
+        if by is not None and (isinstance(by, str) or not pd.api.types.is_list_like(by)):
+            by = [by]
+        self.by = by
+        # column -> (group keys, first value, last value, still increasing, still decreasing),
+        # with one entry per group for each of the last four
+        self.state = {}
+
+    def _items(self, columns):
+        if self.items is None:
+            return {col: (self.increasing, self.strict) for col in columns
+                    if self.by is None or col not in self.by}
+        return self.items
+
+    def _append(self, col, strict, keys, first, last, incr, decr):
+        """Extends the state of `col` with that of values that follow it, group by group."""
+        if col not in self.state:
+            self.state[col] = (keys, first, last, incr, decr)
+            return
+        prev_keys, prev_first, prev_last, prev_incr, prev_decr = self.state[col]
+        pos = prev_keys.get_indexer(keys)
+        known = pos >= 0
+        pair_incr, pair_decr = monotonic_pairs(prev_last[pos[known]], first[known], strict)
+        prev_incr[pos[known]] &= incr[known] & pair_incr
+        prev_decr[pos[known]] &= decr[known] & pair_decr
+        new = ~known
+        dtype = np.result_type(prev_last, last)
+        prev_last = np.concatenate([prev_last, last[new]]).astype(dtype, copy=False)
+        prev_last[pos[known]] = last[known]
+        self.state[col] = (prev_keys.append(keys[new]), np.concatenate([prev_first, first[new]]),
+                           prev_last, np.concatenate([prev_incr, incr[new]]),
+                           np.concatenate([prev_decr, decr[new]]))
+
+    def update(self, chunk):
+        if self.by is None:
+            codes, keys = np.zeros(len(chunk), dtype=np.intp), pd.Index([0])
+        else:
+            codes, keys = group_codes(chunk, self.by)
+        # Rows sorted by group, keeping their order within each group, without null groups
+        order = np.argsort(codes, kind="mergesort")
+        order = order[codes[order] >= 0]
+        codes = codes[order]
+        if not len(codes):
+            return
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        ends = np.r_[starts[1:], len(codes)] - 1
+        keys = keys[codes[starts]]
+        within = codes[1:] == codes[:-1]
+        # Group number of each pair of adjacent rows, if they're in the same group
+        pair_groups = np.cumsum(~within)
+        n_groups = len(starts)
+
+        for col, (increasing, strict) in self._items(chunk).items():
+            values = comparable(chunk[col])[order]
+            incr, decr = monotonic_pairs(values[:-1], values[1:], strict)
+            incr_bad = np.bincount(pair_groups[within & ~incr], minlength=n_groups) > 0
+            decr_bad = np.bincount(pair_groups[within & ~decr], minlength=n_groups) > 0
+            self._append(col, strict, keys, values[starts], values[ends], ~incr_bad, ~decr_bad)
+
+    def merge(self, other):
+        for col, (increasing, strict) in self._items(other.state).items():
+            if col in other.state:
+                self._append(col, strict, *[part.copy() for part in other.state[col]])
+
+    def finalize(self):
+        msg = []
+        for col, (increasing, strict) in self._items(self.state).items():
+            if col not in self.state:
+                continue
+            _, _, _, incr, decr = self.state[col]
+            ok = {True: incr, False: decr, None: incr | decr}[increasing]
+            if not ok.all():
+                if self.by is None:
+                    msg.append("Column {!r} is not monotonic".format(col))
+                else:
+                    msg.append("Column {!r} is not monotonic in {} group(s)"
+                               .format(col, int(np.count_nonzero(~ok))))
+        return msg
+
+
+@_state(ck.has_set_within_vals)
+class _SetWithinVals(object):
+    def __init__(self, items):
+        self.missing = {col: pd.Index(vals).unique() for col, vals in items.items()}
+
+    def update(self, chunk):
+        for col, missing in self.missing.items():
+            if len(missing):
+                self.missing[col] = missing[~missing.isin(chunk[col].unique())]
+
+    def merge(self, other):
+        for col, missing in self.missing.items():
+            self.missing[col] = missing[missing.isin(other.missing[col])]
+
+    def finalize(self):
+        bad_cols_vals = {col: missing.tolist() for col, missing in self.missing.items()
+                         if len(missing)}
+        if bad_cols_vals:
+            return ["The following column: value pairs are missing: {}".format(bad_cols_vals)]
+        return []
+
+
+@_state(ck.has_vals_within_n_std, ck.within_n_std)
+class _WithinNStd(object):
+    """Running moments, combined with Chan et al.'s pairwise update.
+
+    Every value is within ``n`` standard deviations of the mean iff the min and max are,
+    so the final verdict only needs the moments and the extremes of each column.
+
+    """
+
+    def __init__(self, n=3, memory_budget=None):
+        # Memory is already bounded by the size of the chunks
+        self.n = n
+        self.count = self.mean = self.m2 = self.min = self.max = self.n_nulls = None
+
+    def _combine(self, count, mean, m2, min, max, n_nulls):
+        if self.count is None:
+            self.count, self.mean, self.m2 = count, mean, m2
+            self.min, self.max, self.n_nulls = min, max, n_nulls
+            return
+
+        total = self.count + count
+        delta = mean - self.mean
+        weight = (count / total).fillna(0)
+        self.m2 = self.m2 + m2 + (delta ** 2 * self.count * weight).fillna(0)
+        self.mean = self.mean + delta * weight
+        self.count = total
+        self.min = np.fmin(self.min, min)
+        self.max = np.fmax(self.max, max)
+        self.n_nulls = self.n_nulls + n_nulls
+
+    def update(self, chunk):
+        sub = chunk.select_dtypes(include=["number", "bool"]).astype(float)
+        count = sub.count()
+        self._combine(count, sub.mean().fillna(0), (sub.var(ddof=0) * count).fillna(0),
+                      sub.min(), sub.max(), sub.isna().sum())
+
+    def merge(self, other):
+        if other.count is not None:
+            self._combine(other.count, other.mean, other.m2, other.min, other.max,
+                          other.n_nulls)
+
+    def finalize(self):
+        if self.count is None:
+            return []
+        bound = self.n * np.sqrt(self.m2 / (self.count - 1))
+        inliers = ((self.max - self.mean < bound) & (self.mean - self.min < bound) &
+                   (self.n_nulls == 0))
+        if not inliers.all():
+            return ["Columns with values outside {} standard deviations: {}"
+                    .format(self.n, inliers.index[~inliers].tolist())]
+        return []
+
+
+@_state(ck.one_to_many)
+class _OneToMany(object):
+    def __init__(self, unitcol, manycol):
+        self.unitcol = unitcol
+        self.manycol = manycol
+        self.units = pd.Series(dtype=object)
+        self.bad = []
+
+    def update(self, chunk):
+        pairs = chunk[[self.manycol, self.unitcol]].drop_duplicates()
+        # Like one_to_many, null manycol values are ignored, and null units are values
+        pairs = pairs[pairs[self.manycol].notna()]
+        known = pairs[self.manycol].map(self.units)
+        units = pairs[self.unitcol]
+        same = (known == units) | (known.isna() & units.isna())
+        conflicts = (pairs[self.manycol].duplicated(keep=False) |
+                     (pairs[self.manycol].isin(self.units.index) & ~same))
+        for many in pairs.loc[conflicts, self.manycol].unique():
+            if many not in self.bad:
+                self.bad.append(many)
+
+        new = pairs[~pairs[self.manycol].isin(self.units.index)]
+        new = new.drop_duplicates(self.manycol)
+        self.units = pd.concat([self.units, new.set_index(self.manycol)[self.unitcol]])
+
+    def merge(self, other):
+        self.bad.extend(many for many in other.bad if many not in self.bad)
+        self.update(other.units.rename(self.unitcol).rename_axis(self.manycol).reset_index())
+
+    def finalize(self):
+        return ["{} in {} has multiple values for {}".format(many, self.manycol, self.unitcol)
+                for many in self.bad]
+
+
+@_state(ck.is_shape)
+class _Shape(object):
+    def __init__(self, shape):
+        self.shape = shape
+        self.n_rows = 0
+        self.n_cols = None
+
+    def update(self, chunk):
+        self._append(*chunk.shape)
+
+    def _append(self, n_rows, n_cols):
+        self.n_rows += n_rows
+        if self.n_cols is None or n_cols != self.shape[1]:
+            self.n_cols = n_cols
+
+    def merge(self, other):
+        if other.n_cols is not None:
+            self._append(other.n_rows, other.n_cols)
+
+    def finalize(self):
+        actual = (self.n_rows, self.n_cols)
+        if all(dim in (None, -1) or dim == n for dim, n in zip(self.shape, actual)):
+            return []
+        return ["Expected shape: {}\n"
+                "\t\tActual shape:   {}".format(self.shape, actual)]
+
+
+@_state(ck.group_check)
+class _GroupCheck(object):
+    """Validates each group with a `StreamValidator` of its own.
+
+    Checks of single rows are evaluated for all the groups of a chunk at once instead,
+    with `bulwark.groups`.
+
+    """
+
+    # Whether the validators of the groups keep what they need to be merged exactly
+    keep_hashes = False
+
+    def __init__(self, by, func, **kwargs):
+        self.by = by
+        self.func = func
+        self.params = kwargs
+        self.group_cols = ([by] if isinstance(by, str) or not pd.api.types.is_list_like(by)
+                           else list(by))
+        # Group key -> its validator (None for checks of single rows), in order of appearance
+        self.groups = {}
+        self.bad = set()
+        self._new()  # Rejects checks that can't be streamed up front
+
+    def _new(self):
+        if self.func in _LOCAL:
+            return None
+        return StreamValidator({self.func: self.params}, mergeable=self.keep_hashes)
+
+    def _split(self, chunk):
+        """Yields the key and rows of each group of `chunk`."""
+        codes, keys = group_codes(chunk, self.by)
+        order = np.argsort(codes, kind="mergesort")
+        order = order[codes[order] >= 0]
+        codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else []
+        for start, end in zip(starts, np.r_[starts[1:], len(codes)]):
+            yield keys[codes[start]], chunk.iloc[order[start:end]]
+
+    def update(self, chunk):
+        if self.func in _LOCAL:
+            from bulwark import groups  # groups imports the checks, like this module
+
+            codes, keys = group_codes(chunk, self.by)
+            for key in keys:
+                self.groups.setdefault(key, None)
+            bad = groups.failing_groups(chunk, codes, len(keys), self.group_cols, self.func,
+                                        self.params)
+            self.bad.update(keys[bad])
+            return
+        for key, rows in self._split(chunk):
+            if key not in self.groups:
+                self.groups[key] = self._new()
+            self.groups[key].update(rows)
+
+    def merge(self, other):
+        for key, validator in other.groups.items():
+            if self.groups.get(key) is not None:
+                self.groups[key].merge(validator)
+            else:
+                self.groups[key] = validator
+        self.bad.update(other.bad)
+
+    def confirm(self, chunk):
+        if self.func not in _LOCAL:
+            for key, rows in self._split(chunk):
+                if key in self.groups:
+                    self.groups[key]._confirm(rows)
+
+    def unconfirmed(self):
+        return ["Group {!r}: {}".format(key, msg) for key, validator in self.groups.items()
+                if validator is not None for msg in validator.unconfirmed()]
+
+    def finalize(self):
+        bad = [key for key, validator in self.groups.items()
+               if key in self.bad or (validator is not None and validator._errors())]
+        if bad:
+            return ["{} failed for {} group(s) of {}: {}"
+                    .format(self.func.__name__, len(bad), self.by, bad[:MAX_BAD_LOCATIONS])]
+        return []
+
+
+@_state(ck.multi_check)
+class _MultiCheck(object):
+    """Validates a nested suite of checks with a `StreamValidator` of its own."""
+
+    def __init__(self, checks, warn=False, fused=True, n_jobs=1, cache=None):
+        # Chunks are small enough to be checked sequentially and without a cache
+        self.warn = warn
+        self.validator = StreamValidator(checks)
+
+    @property
+    def keep_hashes(self):
+        return any(getattr(state, "keep_hashes", False) for state in self.validator._states)
+
+    @keep_hashes.setter
+    def keep_hashes(self, keep):
+        for state in self.validator._states:
+            if hasattr(state, "keep_hashes"):
+                state.keep_hashes = keep
+
+    def update(self, chunk):
+        self.validator.update(chunk)
+
+    def merge(self, other):
+        self.validator.merge(other.validator)
+
+    def confirm(self, chunk):
+        self.validator._confirm(chunk)
+
+    def unconfirmed(self):
+        return self.validator.unconfirmed()
+
+    def finalize(self):
+        error_msgs = self.validator._errors()
+        if self.warn and error_msgs:
+            print(error_msgs)
+            return []
+        return error_msgs
+
+
+# Checks that only look at one row at a time (or none), so they can be run on each chunk
+_LOCAL = (ck.has_columns, ck.has_dtypes, ck.has_no_x, ck.none_missing, ck.has_no_nans,
+          ck.has_no_nones, ck.has_no_infs, ck.has_no_neg_infs, ck.within_set,
+          ck.has_vals_within_set, ck.within_range, ck.has_vals_within_range)
+
+
+class StreamValidator(object):
+    """Validates a stream of pd.DataFrame chunks as if they were a single pd.DataFrame.
+
+    Args:
+        checks (dict): Mapping of check functions to parameters for those check functions,
+                       as for `bulwark.checks.multi_check`.
+        warn (bool): Indicates whether an error should be raised
+                     or only a warning notification should be displayed.
+                     Default is to error.
+        label (str): What chunks are called in error messages.
+        mergeable (bool): Whether approximate checks keep what they need to count repeats
+                          exactly, across chunks and after a validator of preceding chunks,
+                          e.g. the distinct hashes of the values `approx_unique` sees,
+                          in 8 bytes per value. Default is to keep their memory bounded,
+                          so values seen before they're flagged are only warned about,
+                          and repeats across merged validators are only estimated.
+
+    Examples:
+        >>> import bulwark.checks as ck
+        >>> import pandas as pd
+        >>> from bulwark.streaming import StreamValidator
+        >>> chunks = [pd.DataFrame({'a': [1, 2]}), pd.DataFrame({'a': [2, 3]})]
+        >>> validator = StreamValidator({ck.has_no_nans: {}, ck.unique: {}})
+        >>> for chunk in validator.validate(chunks):
+        ...     pass
+        Traceback (most recent call last):
+            ...
+        AssertionError: Column 'a' contains non-unique values
+
+    """
+
+    def __init__(self, checks, warn=False, label="Chunk", mergeable=False):
+        self.warn = warn
+        self.label = label
+        self.n_chunks = 0
+        self._local_checks = {}
+        self._states = []
+        self._chunk_errors = []
+
+        for func, params in checks.items():
+            if func in _STATES:
+                state = _STATES[func](**params)
+                if mergeable and hasattr(state, "keep_hashes"):
+                    state.keep_hashes = True
+                self._states.append(state)
+            elif func in _LOCAL:
+                self._local_checks[func] = params
+            else:
+                raise ValueError("{} can't be validated chunk-by-chunk."
+                                 .format(getattr(func, "__name__", func)))
+
+    def update(self, chunk):
+        """Validates a single chunk and updates the running state of cross-row checks.
+
+        Args:
+            chunk (pd.DataFrame): The next chunk of the stream.
+
+        Returns:
+            Original `chunk`.
+
+        """
+        for e in engine.run_fused(chunk, self._local_checks):
+            if e is not None:
+                self._chunk_errors.append((self.n_chunks, e))
+        for state in self._states:
+            state.update(chunk)
+        self.n_chunks += 1
+        return chunk
+
+    def merge(self, other):
+        """Appends the chunks seen by another validator with the same checks.
+
+        This lets chunks (e.g. partitions) be validated separately, even in other processes,
+        and be combined afterwards, as if they'd been validated by a single validator in order.
+
+        Args:
+            other (StreamValidator): Validator of the chunks following this one's.
+
+        Returns:
+            This validator.
+
+        """
+        self._chunk_errors.extend((self.n_chunks + n, e) for n, e in other._chunk_errors)
+        for state, other_state in zip(self._states, other._states):
+            state.merge(other_state)
+        self.n_chunks += other.n_chunks
+        return self
+
+    def unconfirmed(self):
+        """Messages about values approximate checks flagged, but couldn't count exactly.
+
+        E.g. values `approx_unique` flagged as probably seen in an earlier chunk.
+        They don't fail the checks, but `finalize` warns about them. `confirm` counts them.
+
+        """
+        return [msg for state in self._states if hasattr(state, "unconfirmed")
+                for msg in state.unconfirmed()]
+
+    def _errors(self):
+        """Messages of the checks that failed over the chunks seen so far."""
+        error_msgs = ["{} {}: {}".format(self.label, n, e) for n, e in self._chunk_errors]
+        for state in self._states:
+            error_msgs.extend(state.finalize())
+        return error_msgs
+
+    def finalize(self):
+        """Asserts that all checks passed over every chunk seen so far.
+
+        Values approximate checks couldn't count exactly are warned about (see `unconfirmed`).
+
+        """
+        error_msgs = self._errors()
+        for msg in self.unconfirmed():
+            warnings.warn(msg)
+
+        if self.warn and error_msgs:
+            print(error_msgs)
+        elif error_msgs:
+            raise AssertionError("\n".join(error_msgs))
+
+    def confirm(self, chunks):
+        """Counts the values flagged by approximate checks exactly, then finalizes.
+
+        Sketch-based checks like `bulwark.checks.approx_unique` don't keep the values
+        they've seen, so they only flag values that were probably seen before, and can only
+        fail those they then see again. In a second pass over the same chunks, they count
+        just the flagged values, so that their results are exact.
+
+        Args:
+            chunks (iterable): The chunks that were validated, in any order.
+
+        """
+        for chunk in chunks:
+            self._confirm(chunk)
+        self.finalize()
+
+    def _confirm(self, chunk):
+        for state in self._states:
+            if hasattr(state, "confirm"):
+                state.confirm(chunk)
+
+    def validate(self, chunks):
+        """Yields each of `chunks` after validating it, finalizing once they're exhausted.
+
+        Args:
+            chunks (iterable): pd.DataFrame chunks, e.g. from ``pd.read_csv(..., chunksize=n)``.
+
+        Yields:
+            Original chunks.
+
+        """
+        for chunk in chunks:
+            yield self.update(chunk)
+        self.finalize()
+
+
+def stream_check(chunks, checks, warn=False):
+    """Validates an iterable of pd.DataFrame chunks as if they were a single pd.DataFrame.
+
+    Args:
+        chunks (iterable): pd.DataFrame chunks, e.g. from ``pd.read_csv(..., chunksize=n)``.
+        checks (dict): Mapping of check functions to parameters for those check functions.
+        warn (bool): Indicates whether an error should be raised
+                     or only a warning notification should be displayed.
+                     Default is to error.
+
+    Returns:
+        Number of chunks validated.
+
+    """
+    validator = StreamValidator(checks, warn=warn)
+    for _ in validator.validate(chunks):
+        pass
+    return validator.n_chunks
@@ -61,6 +61,7 @@ setup(
     # Deprecated: setup_requires, tests_require, test_suite
     # Each extra exists for purpose k, and requires install of v.
     extras_require={'docs': docs_requires,
+                    'parquet': ['pyarrow'],
                     'test': tests_requires,
                     'dev': dev_requires},
     cmdclass=cmdclass,
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+import bulwark.checks as ck
+import bulwark.decorators as dc
+from bulwark.background import BackgroundValidator, default_validator
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"a": [1, np.nan]})
+
+
+def test_reports_failures(df):
+    failures = []
+    validator = BackgroundValidator(n_workers=2, callback=lambda e, label: failures.append(
+        (isinstance(e, AssertionError), label)))
+    validator.submit(ck.has_no_nans, df, "nans")
+    validator.submit(ck.has_no_nans, df.dropna(), "no nans")
+    assert validator.flush(timeout=10)
+    assert failures == [(True, "nans")]
+    assert (validator.n_checked, validator.n_failed, validator.n_dropped) == (2, 1, 0)
+
+    validator.shutdown()
+    with pytest.raises(RuntimeError):
+        validator.submit(ck.has_no_nans, df)
+
+
+def test_logs_failures(df, caplog):
+    validator = BackgroundValidator()
+    with caplog.at_level(logging.WARNING, logger="bulwark.background"):
+        validator.submit(ck.has_no_nans, df, "load")
+        validator.flush()
+    assert "Background check of load failed" in caplog.text
+    validator.shutdown()
+
+
+@pytest.mark.parametrize("on_full", ["drop", "block"])
+def test_full_queue(df, on_full):
+    started, release = threading.Event(), threading.Event()
+
+    def occupy(df):
+        started.set()
+        release.wait()
+
+    validator = BackgroundValidator(max_queue=1, on_full=on_full)
+    validator.submit(occupy, df)
+    started.wait()
+    assert validator.submit(ck.has_no_nans, df.dropna())
+
+    if on_full == "drop":
+        assert not validator.submit(ck.has_no_nans, df.dropna())
+        assert validator.n_dropped == 1
+    else:
+        submitted = threading.Thread(target=validator.submit, args=(ck.has_no_nans, df.dropna()))
+        submitted.start()
+        submitted.join(timeout=.1)
+        assert submitted.is_alive()  # Waits for a free slot
+
+    assert not validator.flush(timeout=.01)
+    release.set()
+    assert validator.flush(timeout=10)
+    assert validator.n_checked == (2 if on_full == "drop" else 3)
+    validator.shutdown()
+
+
+def test_decorator_background(df):
+    failures = []
+    validator = BackgroundValidator(callback=lambda e, label: failures.append(label))
+    decorated = dc.HasNoNans(background=validator, sample_every=2)(lambda: df)
+    for _ in range(3):
+        tm.assert_frame_equal(df, decorated())
+    validator.flush()
+    assert failures == ["test_decorator_background.<locals>.<lambda>"] * 2
+    validator.shutdown()
+
+    tm.assert_frame_equal(df, dc.HasNoNans(background=True)(lambda: df)())
+    assert default_validator().flush(timeout=10)
+    assert default_validator().n_failed == 1
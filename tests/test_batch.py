@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import bulwark.checks as ck
+from bulwark.batch import SharedFrame, batch_check, shared_memory
+
+
+@pytest.fixture
+def partitions():
+    return [pd.DataFrame({"a": np.arange(i * 5, i * 5 + 5),
+                          "b": pd.Categorical(list("xyzxy")),
+                          "c": list("pqrst"),
+                          "t": pd.date_range("2020-01-01", periods=5) + pd.Timedelta(days=i * 5)},
+                         index=np.arange(i * 5, i * 5 + 5))
+            for i in range(4)]
+
+
+CHECKS = {ck.has_no_nans: {},
+          ck.unique: {"columns": ["a"]},
+          ck.has_unique_index: {},
+          ck.is_monotonic: {"items": {"a": (True, True), "t": (True, True)}},
+          ck.has_set_within_vals: {"items": {"b": ["x", "z"]}},
+          ck.one_to_many: {"unitcol": "c", "manycol": "a"},
+          ck.is_shape: {"shape": (20, 4)}}
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_batch_check_passes(partitions, n_jobs):
+    assert batch_check(partitions, CHECKS, n_jobs=n_jobs) == 4
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_batch_check_across_partitions(partitions, n_jobs):
+    partitions[2] = partitions[2].assign(a=[0, 11, 12, 13, 14])
+    partitions[3].loc[16, "a"] = np.nan
+    with pytest.raises(AssertionError) as e:
+        batch_check(partitions, CHECKS, n_jobs=n_jobs)
+    msg = str(e.value)
+    assert msg.startswith("Partition 3: ")
+    assert "Column 'a' contains non-unique values" in msg
+    assert "Column 'a' is not monotonic" in msg
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_batch_check_monotonic_by(partitions, n_jobs):
+    checks = {ck.is_monotonic: {"items": {"a": (True, True)}, "by": "b"}}
+    assert batch_check(partitions, checks, n_jobs=n_jobs) == 4
+    partitions[3].loc[15, "a"] = 12
+    with pytest.raises(AssertionError, match="not monotonic in 1 group"):
+        batch_check(partitions, checks, n_jobs=n_jobs)
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_batch_check_group_check(partitions, n_jobs):
+    checks = {ck.group_check: {"by": "b", "func": ck.unique, "columns": ["c"]}}
+    with pytest.raises(AssertionError) as expected:
+        ck.multi_check(pd.concat(partitions), checks)
+    with pytest.raises(AssertionError) as e:
+        batch_check(partitions, checks, n_jobs=n_jobs)
+    assert str(e.value) == str(expected.value)
+    checks = {ck.multi_check: {"checks": {ck.unique: {"columns": ["c"]}}}}
+    with pytest.raises(AssertionError, match="Column 'c' contains non-unique values"):
+        batch_check(partitions, checks, n_jobs=n_jobs)
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_batch_check_approx_unique_across_partitions(n_jobs):
+    partitions = [pd.DataFrame({"a": np.arange(i * 1000, i * 1000 + 1000)}) for i in range(4)]
+    checks = {ck.approx_unique: {"capacity": 10000}}
+    assert batch_check(partitions, checks, n_jobs=n_jobs) == 4
+    partitions[3].loc[3, "a"] = 5
+    with pytest.raises(AssertionError, match=r"Column 'a' contains non-unique values: \[5\]"):
+        batch_check(partitions, checks, n_jobs=n_jobs)
+
+
+def test_batch_check_paths(partitions, tmp_path):
+    paths = []
+    for i, df in enumerate(partitions):
+        paths.append(tmp_path / "part-{}.pkl".format(i))
+        df.to_pickle(paths[-1])
+    assert batch_check(paths, CHECKS, n_jobs=2) == 4
+
+    pd.concat(partitions[:2]).to_pickle(paths[3])
+    with pytest.raises(AssertionError, match="Index contains non-unique values"):
+        batch_check(paths, CHECKS, n_jobs=2)
+
+
+@pytest.mark.skipif(shared_memory is None, reason="needs multiprocessing.shared_memory")
+def test_shared_frame_round_trip(partitions):
+    df = partitions[1].assign(d=[1.5, np.nan, 2, 3, 4])
+    df.columns = ["a", "b", "a", "t", "d"]
+    shared = SharedFrame(df)
+    try:
+        pd.testing.assert_frame_equal(shared.to_frame(), df)
+    finally:
+        shared.unlink()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import bulwark.checks as ck
+import bulwark.decorators as dc
+from bulwark.cache import ResultCache, fingerprint
+
+
+def test_fingerprint():
+    df = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+    assert fingerprint(df) == fingerprint(df.copy())
+    assert fingerprint(df) != fingerprint(df.assign(a=[1, 2, 4]))
+    assert fingerprint(df) != fingerprint(df.astype({"a": float}))
+    assert fingerprint(df) != fingerprint(df.set_index("b"))
+    assert fingerprint(df, sample=2) == fingerprint(df.assign(a=[1, 5, 3]), sample=2)
+
+
+def test_result_cache_lru():
+    cache = ResultCache(maxsize=2)
+    df = pd.DataFrame({"a": [1, 2, np.nan]})
+    for _ in range(2):
+        cache.call(ck.is_shape, df, {"shape": (3, 1)})
+        with pytest.raises(AssertionError):
+            cache.call(ck.has_no_nans, df, {})
+    assert cache.info() == {"hits": 2, "misses": 2, "evictions": 0, "size": 2, "maxsize": 2}
+
+    cache.call(ck.is_shape, df, {"shape": (-1, 1)})
+    assert cache.info()["evictions"] == 1
+    cache.call(ck.has_no_nans, df, {"columns": []})
+    with pytest.raises(AssertionError):
+        cache.call(ck.has_no_nans, df, {})
+    assert cache.info()["misses"] == 5
+
+
+def test_multi_check_cache():
+    cache = ResultCache()
+    df = pd.DataFrame({"a": [1, 2, 2]})
+    checks = {ck.has_no_nans: {}, ck.unique: {"columns": ["a"]}}
+    for _ in range(3):
+        with pytest.raises(AssertionError, match="non-unique"):
+            ck.multi_check(df, checks, cache=cache)
+    assert (cache.hits, cache.misses) == (4, 2)
+
+
+def test_decorator_cache():
+    cache = ResultCache()
+    calls = []
+
+    def f(df):
+        calls.append(df)
+
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    decorated = dc.CustomCheck(f, cache=cache)(lambda df: df)
+    for _ in range(3):
+        decorated(df)
+    decorated(df + 1)
+    assert len(calls) == 2
+    assert dc.IsSameAs(df, cache=cache)(lambda df: df)(df) is df
+    assert cache.info()["size"] == 3
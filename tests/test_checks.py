@@ -1,4 +1,10 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import pandas as pd
 import pandas.testing as tm
@@ -6,6 +12,8 @@ import pytest
 
 import bulwark.checks as ck
 import bulwark.decorators as dc
+from bulwark.generic import ValueSet
+from bulwark.report import ValidationError
 
 
 def _add_n(df, n=1):
@@ -177,6 +185,64 @@ def test_unique():
         dc.Unique()(_noop)(df)
 
 
+def test_approx_unique():
+    df = pd.DataFrame({'a': np.arange(1000), 'b': np.arange(1000).astype(str)})
+    tm.assert_frame_equal(df, ck.approx_unique(df, error_rate=0.5))
+    result = dc.ApproxUnique(['a'])(_noop)(df)
+    tm.assert_frame_equal(result, df)
+
+    df.loc[999, 'b'] = '3'
+    with pytest.raises(AssertionError, match=r"Column 'b' contains non-unique values: \['3'\]"):
+        ck.approx_unique(df, capacity=10)
+    with pytest.raises(AssertionError):
+        dc.ApproxUnique()(_noop)(df)
+
+
+def test_has_approx_unique_index():
+    df = pd.DataFrame({'a': [1, 2, 3]}, index=['a', 'b', 'c'])
+    tm.assert_frame_equal(df, ck.has_approx_unique_index(df))
+    result = dc.HasApproxUniqueIndex()(_add_n)(df)
+    tm.assert_frame_equal(result, df + 1)
+
+    with pytest.raises(AssertionError, match=r"Index contains non-unique values: \['a'\]"):
+        ck.has_approx_unique_index(df.reindex(['a', 'a', 'b']))
+    with pytest.raises(AssertionError):
+        ck.has_approx_unique_index(df.set_index(pd.MultiIndex.from_tuples([(1, 2)] * 3)))
+
+
+def test_has_distinct_count():
+    df = pd.DataFrame({'a': np.arange(10000) % 5000, 'b': [np.nan, 1.] * 5000})
+    items = {'a': (4000, 6000), 'b': (None, 1)}
+    tm.assert_frame_equal(df, ck.has_distinct_count(df, items))
+    tm.assert_frame_equal(df, ck.has_distinct_count(df, {'a': (5000, 5000)}))
+    result = dc.HasDistinctCount(items)(_noop)(df)
+    tm.assert_frame_equal(result, df)
+
+    with pytest.raises(AssertionError, match=r"Column 'a' has 5000 distinct value\(s\)"):
+        ck.has_distinct_count(df, {'a': (None, 4999)})
+    with pytest.raises(AssertionError):
+        dc.HasDistinctCount({'b': (2, None)})(_noop)(df)
+
+
+def test_has_unique_key():
+    df = pd.DataFrame({'a': [1, 1, 2, np.nan], 'b': ['x', 'y', 'x', 'x']})
+    tm.assert_frame_equal(df, ck.has_unique_key(df, ['a', 'b']))
+    result = dc.HasUniqueKey(['a', 'b'])(_noop)(df)
+    tm.assert_frame_equal(result, df)
+
+    df = pd.DataFrame({'a': [1, np.nan, 2, np.nan, 1], 'b': ['x', 'y', 'x', 'y', 'x']})
+    with pytest.raises(AssertionError, match=r"2 duplicated key\(s\) in \['a', 'b'\]"):
+        ck.has_unique_key(df, ['a', 'b'])
+    with pytest.raises(AssertionError):
+        dc.HasUniqueKey(['a', 'b'])(_noop)(df)
+
+
+def test_has_unique_key_hash_collision(monkeypatch):
+    df = pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z']})
+    monkeypatch.setattr(ck, 'hash_rows', lambda df, columns: np.zeros(len(df), dtype=np.uint64))
+    tm.assert_frame_equal(df, ck.has_unique_key(df, ['a', 'b']))
+
+
 def test_has_unique_index():
     df = pd.DataFrame([1, 2, 3], index=['a', 'b', 'c'])
     tm.assert_frame_equal(df, ck.has_unique_index(df))
@@ -352,6 +418,34 @@ def test_has_vals_within_set():
         dc.HasValsWithinSet(items=items)(_noop)(df)
 
 
+def test_has_vals_within_set_categorical():
+    df = pd.DataFrame({'A': pd.Categorical(['a', 'b', None, 'b'], categories=['a', 'b', 'c'])})
+    tm.assert_frame_equal(df, ck.has_vals_within_set(df, {'A': ['a', 'b', None]}))
+    with pytest.raises(AssertionError) as e:
+        ck.has_vals_within_set(df, {'A': ['a', 'c']})
+    tm.assert_series_equal(e.value.args[1], df.loc[[1, 2, 3], 'A'])
+
+    items = {'A': ['b', 'c']}
+    tm.assert_frame_equal(df, ck.has_set_within_vals(df, {'A': ['b']}))
+    with pytest.raises(AssertionError, match=r"\{'A': \['c'\]\}"):
+        ck.has_set_within_vals(df, items)
+
+
+def test_has_vals_within_set_decorator_compiles_values():
+    decorator = dc.HasValsWithinSet({'A': [1, 2]})
+    assert isinstance(decorator.check_func_params['items']['A'], ValueSet)
+    df = pd.DataFrame({'A': [1, 2, 1]})
+    tm.assert_frame_equal(df, decorator(_noop)(df))
+    with pytest.raises(AssertionError):
+        decorator(_noop)(df.replace(2, 3))
+
+    decorator.check_func_params = {'items': {'A': [1, 3]}}
+    assert isinstance(decorator.check_func_params['items']['A'], ValueSet)
+    tm.assert_frame_equal(df.replace(2, 3), decorator(_noop)(df.replace(2, 3)))
+    with pytest.raises(AssertionError):
+        decorator(_noop)(df)
+
+
 def test_has_vals_within_range():
     df = pd.DataFrame({'A': [-1, 0, 1]})
     items = {'A': (-1, 1)}
@@ -440,6 +534,17 @@ def test_one_to_many_raises():
         ck.one_to_many(df, 'units', 'parameter')
 
 
+def test_one_to_many_reports_all_violations():
+    df = pd.DataFrame({
+        'parameter': ['Cu', 'Cu', 'Pb', 'Pb', 'Zn', np.nan, np.nan],
+        'units': ['ug/L', 'mg/L', 'ug/L', 'mg/L', 'ug/L', 'ug/L', 'mg/L'],
+    })
+    with pytest.raises(AssertionError) as e:
+        ck.one_to_many(df, 'units', 'parameter')
+    assert str(e.value) == ("parameter has 2 value(s) with multiple units values: "
+                            "{'Cu': ['ug/L', 'mg/L'], 'Pb': ['ug/L', 'mg/L']}")
+
+
 def test_is_same_as():
     df = pd.DataFrame({'A': [1, 2, 3], 'B': [1, 2, 3]})
     df_equal = pd.DataFrame({'A': [1, 2, 3], 'B': [1, 2, 3]})
@@ -478,6 +583,46 @@ def test_is_same_as_with_kwargs():
     tm.assert_frame_equal(df, result)
 
 
+def test_is_same_as_fast():
+    n = 1000
+    df = pd.DataFrame({'a': np.arange(n, dtype=float), 'b': np.arange(n) % 7,
+                       'c': pd.Categorical(np.arange(n) % 3), 'd': [1, '1'] * (n // 2),
+                       'e': pd.array([1, None] * (n // 2), dtype='Int64')},
+                      index=np.arange(n) * 2)
+    df.loc[[0, 10], 'a'] = [np.nan, 0.]
+    other = df.copy()
+    other.loc[10, 'a'] = -0.
+    result = ck.is_same_as(df, other, fast=True, memory_budget=100)
+    tm.assert_frame_equal(df, result)
+    result = dc.IsSameAs(other, fast=True)(_noop)(df)
+    tm.assert_frame_equal(df, result)
+
+    other.iloc[3:n:100, 1] = -1
+    other.iloc[-1, 3] = 1
+    other.iloc[:2, 4] = [None, 1]
+    with pytest.raises(ValidationError) as e:
+        ck.is_same_as(df, other, fast=True, memory_budget=100)
+    assert [(v.column, v.count, v.labels.tolist()) for v in e.value.report] == [
+        ('b', 10, list(range(6, 2 * n, 200))), ('d', 1, [2 * n - 2]), ('e', 2, [0, 2])]
+    assert e.value.args == ("DataFrames are not equal",)
+
+    with pytest.raises(ValidationError) as e:
+        ck.is_same_as(df, df.set_axis(np.arange(n), axis=0), fast=True)
+    violation, = e.value.report
+    assert (violation.column, violation.count, violation.positions.tolist()) == (
+        None, n - 1, list(range(1, 11)))
+    assert str(violation).startswith("Indexes differ in 999 row(s)")
+
+    with pytest.raises(ValidationError, match="Dtypes of column 'b' differ: int64 != float64"):
+        ck.is_same_as(df, df.astype({'b': float}), fast=True)
+    with pytest.raises(ValidationError, match=r"only in df: \['e'\], only in df_to_compare: \['f'"):
+        ck.is_same_as(df, df.rename(columns={'e': 'f'}), fast=True)
+    with pytest.raises(ValidationError, match=r"Shapes differ: \(1000, 5\) != \(999, 5\)"):
+        ck.is_same_as(df, df.iloc[1:], fast=True)
+    with pytest.raises(TypeError):
+        ck.is_same_as(df, df, fast=True, check_dtype=False)
+
+
 def test_multi_check():
     df = pd.DataFrame({"a": [1, 2, 3], "b": [4, 5, 6]})
     result = ck.multi_check(df,
@@ -543,3 +688,259 @@ def test_custom_check():
 
     with pytest.raises(AssertionError):
         dc.CustomCheck(f, 4)(_noop)(df)
+
+
+def test_decorator_sample_every():
+    df = pd.DataFrame({"a": [1, np.nan]})
+    decorated = dc.HasNoNans(sample_every=3)(_noop)
+    with pytest.raises(AssertionError):
+        decorated(df)
+    decorated(df)
+    decorated(df)
+    with pytest.raises(AssertionError):
+        decorated(df)
+
+
+def test_decorator_sample_calls():
+    df = pd.DataFrame({"a": [1, np.nan]})
+    tm.assert_frame_equal(df, dc.HasNoNans(sample_calls=0)(_noop)(df))
+    with pytest.raises(AssertionError):
+        dc.HasNoNans(sample_calls=1)(_noop)(df)
+    with pytest.raises(ValueError):
+        dc.HasNoNans(sample_calls=2)
+
+
+def test_decorator_sample_rows():
+    df = pd.DataFrame({"a": np.arange(100)})
+    checked = []
+
+    def f(df):
+        checked.append(df)
+
+    decorated = dc.CustomCheck(f, sample_rows=10, seed=0)(_noop)
+    tm.assert_frame_equal(df, decorated(df))
+    assert len(checked[0]) == 10
+    assert checked[0].index.is_monotonic_increasing
+
+    decorated = dc.CustomCheck(f, sample_rows=.5, seed=0)(_noop)
+    decorated(df)
+    assert len(checked[1]) == 50
+
+    dc.CustomCheck(f, sample_rows=10, seed=0)(_noop)(df)
+    tm.assert_frame_equal(checked[0], checked[2])
+
+    # every monotonic frame has monotonic samples
+    dc.IsMonotonic(strict=True, sample_rows=.1)(_noop)(df)
+
+    # Ints are numbers of rows, floats fractions of them
+    dc.CustomCheck(f, sample_rows=1)(_noop)(df)
+    assert len(checked[3]) == 1
+    dc.CustomCheck(f, sample_rows=1.)(_noop)(df)
+    assert len(checked[4]) == 100
+    for sample_rows in [1.5, 0., -.5]:
+        with pytest.raises(ValueError):
+            dc.CustomCheck(f, sample_rows=sample_rows)
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def _async_noop(df):
+    await asyncio.sleep(0)
+    return df
+
+
+def test_decorator_async():
+    df = pd.DataFrame({"a": [1, np.nan]})
+    decorated = dc.HasNoNans(columns=["a"])(_async_noop)
+    assert asyncio.iscoroutinefunction(decorated)
+    with pytest.raises(AssertionError):
+        _run(decorated(df))
+    tm.assert_frame_equal(df, _run(dc.HasNoNans(enabled=False)(_async_noop)(df)))
+
+    checked = []
+    decorated = dc.CustomCheck(lambda df: checked.append(df), sample_every=2)(_async_noop)
+    for _ in range(3):
+        _run(decorated(df))
+    assert len(checked) == 2
+
+
+@pytest.mark.parametrize("own_executor", [False, True])
+def test_decorator_async_executor(own_executor):
+    df = pd.DataFrame({"a": [1, np.nan]})
+    executor = ThreadPoolExecutor(1) if own_executor else True
+    threads = []
+
+    def f(df):
+        threads.append(threading.current_thread())
+
+    tm.assert_frame_equal(df, _run(dc.CustomCheck(f, executor=executor)(_async_noop)(df)))
+    assert threads[0] is not threading.current_thread()
+
+    with pytest.raises(AssertionError):
+        _run(dc.HasNoNans(executor=executor)(_async_noop)(df))
+    if own_executor:
+        executor.shutdown()
+
+
+def test_decorator_generator():
+    chunks = [pd.DataFrame({"a": [1, 2]}), pd.DataFrame({"a": [2, np.nan]})]
+
+    def gen():
+        yield from chunks
+
+    yielded = []
+    with pytest.raises(AssertionError):
+        for chunk in dc.HasNoNans()(gen)():
+            yielded.append(chunk)
+    assert len(yielded) == 1
+
+    assert len(list(dc.Unique()(gen)())) == 2
+    with pytest.raises(AssertionError, match="Chunk 1: .*\n.*non-unique"):
+        list(dc.MultiCheck({ck.unique: {}, ck.has_no_nans: {}}, stream=True)(gen)())
+    decorated = dc.Unique(stream=True, sample_every=2)(gen)
+    with pytest.raises(AssertionError):
+        list(decorated())
+    assert len(list(decorated())) == 2
+    assert len(list(dc.Unique(stream=True, enabled=False)(gen)())) == 2
+
+    def groups():
+        yield from [pd.DataFrame({"g": [1], "a": [2]}), pd.DataFrame({"g": [1], "a": [2]})]
+
+    with pytest.raises(AssertionError, match="unique failed for 1 group"):
+        list(dc.GroupCheck("g", ck.unique, stream=True)(groups)())
+    with pytest.raises(ValueError, match="can't be validated chunk-by-chunk"):
+        list(dc.CustomCheck(lambda df: True, stream=True)(gen)())
+    # A repeat across chunks fails, although nothing can confirm it in a second pass
+    with pytest.raises(AssertionError, match=r"Column 'a' contains non-unique values: \[2"):
+        list(dc.ApproxUnique(stream=True)(gen)())
+
+
+def test_decorator_async_generator():
+    async def gen():
+        for a in ([1, 2], [2, 3]):
+            await asyncio.sleep(0)
+            yield pd.DataFrame({"a": a})
+
+    async def consume(agen):
+        return [chunk async for chunk in agen]
+
+    assert len(_run(consume(dc.IsMonotonic(strict=True)(gen)()))) == 2
+    with pytest.raises(AssertionError, match="not monotonic"):
+        _run(consume(dc.IsMonotonic(strict=True, stream=True)(gen)()))
+
+
+def test_decorators_cover_checks():
+    check_names = {name for name, func in vars(ck).items()
+                   if callable(func) and getattr(func, "__module__", None) == ck.__name__}
+    assert set(dc._CHECK_NAMES) == check_names
+    for name in dc._DECORATORS:
+        assert getattr(dc, name) is getattr(dc, name)
+        assert name in dir(dc)
+    with pytest.raises(AttributeError):
+        dc.NotACheck
+
+
+def test_decorators_import_lazily():
+    code = ("import sys, bulwark.decorators as dc\n"
+            "dc.HasNoNans(columns=['a'])(lambda df: df)\n"
+            "assert 'pandas' not in sys.modules and 'bulwark.checks' not in sys.modules")
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_has_no_x_mixed_dtypes():
+    df = pd.DataFrame({"i": [1, 2, 3], "f": [1., 2., np.inf], "o": ["a", None, "c"]})
+    tm.assert_frame_equal(df, ck.has_no_nans(df))
+    tm.assert_frame_equal(df, ck.has_no_neg_infs(df))
+    tm.assert_frame_equal(df, ck.has_no_x(df, values=[4, "b"]))
+
+    with pytest.raises(AssertionError) as e:
+        ck.has_no_infs(df)
+    assert e.value.args == ((2, "f"),)
+    with pytest.raises(AssertionError) as e:
+        ck.has_no_nones(df)
+    assert e.value.args == ((1, "o"),)
+    with pytest.raises(AssertionError) as e:
+        ck.has_no_x(df, values=[3, "c"], columns=["i", "o"])
+    assert e.value.args == ((2, "i"), (2, "o"))
+
+
+def test_monotonic_native_dtypes():
+    big = 2 ** 62
+    df = pd.DataFrame({"i": [big, big + 1, big + 2],
+                       "t": pd.date_range("2020-01-01", periods=3, tz="US/Eastern"),
+                       "f": [1., np.nan, 3.]})
+    tm.assert_frame_equal(df, ck.is_monotonic(df, increasing=True, strict=True))
+
+    df.loc[2, "i"] = big + 1
+    df.loc[1, "t"] = pd.NaT
+    with pytest.raises(AssertionError) as e:
+        ck.is_monotonic(df, increasing=True, strict=True)
+    assert e.value.args[0].tolist() == [(2, "i")]
+
+
+@pytest.mark.parametrize("good,bad", [
+    ([1, pd.NA, 2, 3], [1, pd.NA, 3, 2]),
+    ([2 ** 62, pd.NA, 2 ** 62 + 1, 2 ** 62 + 2], [2 ** 62, pd.NA, 2 ** 62 + 2, 2 ** 62 + 1]),
+])
+def test_monotonic_nullable_ints(good, bad):
+    df = pd.DataFrame({"a": pd.array(good, dtype="Int64")})
+    tm.assert_frame_equal(df, ck.is_monotonic(df, increasing=True, strict=True))
+    df = pd.DataFrame({"a": pd.array(bad, dtype="Int64")})
+    with pytest.raises(AssertionError) as e:
+        ck.is_monotonic(df, increasing=True, strict=True)
+    assert e.value.args[0].tolist() == [(3, "a")]
+
+
+def test_monotonic_nullable_bools():
+    df = pd.DataFrame({"a": pd.array([False, pd.NA, True, True], dtype="boolean"),
+                       "b": pd.array([pd.NA, pd.NA, pd.NA, pd.NA], dtype="boolean")})
+    tm.assert_frame_equal(df, ck.is_monotonic(df, increasing=True))
+    with pytest.raises(AssertionError) as e:
+        ck.is_monotonic(df, increasing=True, strict=True)
+    assert e.value.args[0].tolist() == [(3, "a")]
+
+
+def test_monotonic_by():
+    df = pd.DataFrame({"sensor": ["a", "b", "a", "b", None, "a"],
+                       "up": [1, 9, 2, 10, 0, 3],
+                       "down": [3, 9, 2, 8, 100, 1]})
+    tm.assert_frame_equal(df, ck.is_monotonic(df, by="sensor"))
+    tm.assert_frame_equal(df, dc.IsMonotonic(items={"up": (True, True)}, by=["sensor"])(_noop)(df))
+
+    with pytest.raises(AssertionError) as e:
+        ck.is_monotonic(df, increasing=True, by="sensor")
+    assert e.value.args[0].tolist() == [(2, "down"), (3, "down"), (5, "down")]
+
+    with pytest.raises(AssertionError):
+        ck.is_monotonic(df, items={"up": (None, False)})
+
+
+@pytest.mark.parametrize("memory_budget", [1, 7, None])
+def test_memory_budget(memory_budget):
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame(rng.randn(50, 3), columns=list("abc"), index=np.arange(50) * 2)
+    df["d"] = list("xyz") * 16 + ["x", None]
+    df.iloc[[3, 30], 0] = np.nan
+    df.iloc[[4, 45], 2] = 100.
+
+    for check, kwargs in [(ck.has_no_x, {"values": [np.nan, None, 100.]}),
+                          (ck.has_no_x, {"values": [None], "columns": ["d", "d"]}),
+                          (ck.has_vals_within_n_std, {"n": 2})]:
+        with pytest.raises(AssertionError) as expected:
+            check(df, **kwargs)
+        with pytest.raises(AssertionError) as e:
+            check(df, memory_budget=memory_budget, **kwargs)
+        assert str(e.value) == str(expected.value)
+
+    df = df.rename(columns={"b": "a"})
+    with pytest.raises(AssertionError) as e:
+        ck.has_no_nans(df, columns=["a"])
+    assert e.value.args == ((6, "a"), (60, "a"))
+    tm.assert_frame_equal(df, ck.has_no_x(df, values=[None], columns=["a"],
+                                          memory_budget=memory_budget))
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import bulwark.checks as ck
+from bulwark import engine
+
+
+def _suite():
+    return {ck.has_no_nans: {},
+            ck.has_no_infs: {"columns": ["a", "b"]},
+            ck.has_vals_within_range: {"items": {"a": (0, 10), "b": (-1, 1)}},
+            ck.has_vals_within_set: {"items": {"c": ["x", "y"]}},
+            ck.has_set_within_vals: {"items": {"c": ["x"]}},
+            ck.unique: {"columns": ["a"]},
+            ck.is_shape: {"shape": (-1, 3)}}
+
+
+def test_plan_groups_tasks_by_column():
+    df = pd.DataFrame({"a": [1, 2, 3], "b": [.1, .2, .3], "c": ["x", "y", "x"]})
+    column_tasks, direct = engine.plan(df, _suite())
+
+    assert list(column_tasks) == ["a", "b", "c"]
+    assert [i for i, _ in column_tasks["a"]] == [0, 1, 2, 5]
+    assert direct == [6]
+
+
+def test_run_fused_passes():
+    df = pd.DataFrame({"a": [1, 2, 3], "b": [.1, .2, .3], "c": ["x", "y", "x"]})
+    assert engine.run_fused(df, _suite()) == [None] * len(_suite())
+    pd.testing.assert_frame_equal(df, ck.multi_check(df, _suite()))
+
+
+@pytest.mark.parametrize("df", [
+    pd.DataFrame({"a": [1, 2, 2], "b": [.1, .2, .3], "c": ["x", "y", "x"]}),
+    pd.DataFrame({"a": [1, 2, 3], "b": [.1, np.inf, .3], "c": ["x", "y", "x"]}),
+    pd.DataFrame({"a": [1, 2, 3], "b": [.1, np.nan, .3], "c": ["x", "y", "z"]}),
+    pd.DataFrame({"a": [1, 2, 11], "b": [.1, .2, .3], "c": ["y", "y", "y"]}),
+])
+def test_run_fused_matches_unfused(df):
+    fused = [e for e in engine.run_fused(df, _suite()) if e is not None]
+    assert fused
+    with pytest.raises(AssertionError) as unfused:
+        ck.multi_check(df, _suite(), fused=False)
+    assert "\n".join(str(e) for e in fused) == str(unfused.value)
+
+
+def test_run_fused_missing_column():
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    with pytest.raises(KeyError):
+        ck.multi_check(df, {ck.has_no_nans: {"columns": ["z"]}})
+
+
+@pytest.mark.parametrize("fused", [True, False])
+def test_multi_check_n_jobs_is_deterministic(fused):
+    df = pd.DataFrame({"a": [1, 2, 2], "b": [.1, np.nan, .3], "c": ["x", "y", "z"]})
+    with pytest.raises(AssertionError) as sequential:
+        ck.multi_check(df, _suite(), fused=fused)
+    for _ in range(5):
+        with pytest.raises(AssertionError) as threaded:
+            ck.multi_check(df, _suite(), fused=fused, n_jobs=4)
+        assert str(threaded.value) == str(sequential.value)
+
+
+def test_map_jobs_keeps_order():
+    assert engine.map_jobs(lambda x: x * 2, range(20), n_jobs=-1) == list(range(0, 40, 2))
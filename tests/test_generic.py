@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from bulwark.generic import (ValueSet, bad_location_counts, bad_locations, batched_violations,
+                             column_positions, isin_any, isin_mask, memory_batches,
+                             observed_values)
+
+
+def test_bad_locations():
+    mask = pd.DataFrame({"a": [False, True, True], "b": [True, False, np.nan]},
+                        index=["x", "y", "z"])
+    assert bad_locations(mask).tolist() == [("y", "a"), ("z", "a"), ("x", "b")]
+    assert bad_locations(mask, max_locations=2).tolist() == [("y", "a"), ("z", "a")]
+    assert bad_locations(mask, max_locations=0).tolist() == []
+    assert bad_locations(~mask.fillna(True).astype(bool)).tolist() == [("x", "a"), ("y", "b")]
+
+
+def test_batched_violations():
+    mask = pd.DataFrame({"a": [False, True, True], "b": [True, False, np.nan]},
+                        index=["x", "y", "z"])
+    columns = column_positions(mask, mask.columns)
+    for batches in [memory_batches(3, 1), memory_batches(3, 1, memory_budget=2)]:
+        for max_locations in [None, 2, 0]:
+            locs, violations = batched_violations(mask, columns, lambda col, ser: ser, batches,
+                                                  max_locations)
+            assert locs.tolist() == bad_locations(mask, max_locations).tolist()
+            assert [(col, n, pos.tolist()) for col, n, pos in violations] == [
+                ("a", 2, [1, 2]), ("b", 1, [0])]
+
+
+def test_memory_batches():
+    assert memory_batches(5, 2, memory_budget=4) == [slice(0, 2), slice(2, 4), slice(4, 5)]
+    assert memory_batches(2, 10, memory_budget=4) == [slice(0, 1), slice(1, 2)]
+    assert memory_batches(0, 10) == []
+
+
+def test_column_positions():
+    df = pd.DataFrame([[1, 2, 3]], columns=["a", "b", "a"])
+    assert column_positions(df, ["a", "b"]) == [("a", 0), ("a", 2), ("b", 1)]
+    df.columns = ["a", "a", "b"]
+    assert column_positions(df, ["b", "a"]) == [("b", 2), ("a", 0), ("a", 1)]
+
+
+def test_bad_location_counts():
+    mask = pd.DataFrame({"a": [False, True, True], "b": [True, False, False],
+                         "c": [False, False, False]})
+    assert bad_location_counts(mask).to_dict() == {"a": 2, "b": 1}
+
+
+@pytest.mark.parametrize("ser", [
+    pd.Series([1, 2, 3]),
+    pd.Series([True, False]),
+    pd.Series([1., np.nan, np.inf]),
+    pd.Series([1., -np.inf]),
+    pd.Series([1., 2.]),
+    pd.Series([], dtype=float),
+    pd.Series(["a", None, np.nan, np.inf]),
+    pd.Series(["a", None]),
+    pd.Series(["a", np.nan]),
+    pd.Series(["a", "b"]),
+    pd.Series(pd.to_datetime(["2020-01-01", None])),
+    pd.Series(pd.Categorical(["a", None])),
+    pd.Series(pd.Categorical([1, 2, None])),
+    pd.Series([1, 2 ** 62 + 1], dtype=np.int64),
+    pd.Series([1, 2 ** 63 + 1], dtype=np.uint64),
+    pd.Series([1, 2], dtype=np.int8),
+    pd.Series([1.5, np.nan], dtype=np.float32),
+    pd.Series([1., float(2 ** 62)]),
+    pd.Series([1, None], dtype="Int64"),
+])
+@pytest.mark.parametrize("values", [[np.nan], [None], [np.inf], [-np.inf],
+                                    [np.nan, np.inf, -np.inf], [1], ["a"], [True], {"a", 2}, [],
+                                    ["a", np.nan], ["a", None], ["a", None, pd.NaT],
+                                    [1.5, None], [1., np.nan], [2 ** 62 + 1], [float(2 ** 63)],
+                                    ["2020-01-01"], list(np.array([1, 300], dtype=np.int16))])
+def test_isin_matches_pandas(ser, values):
+    expected = ser.isin(values)
+    np.testing.assert_array_equal(isin_mask(ser, values), expected.values)
+    np.testing.assert_array_equal(ValueSet(values).isin_mask(ser), expected.values)
+    assert isin_any(ser, values) == expected.any()
+
+
+def test_value_set_looks_up_numbers(monkeypatch):
+    values = ValueSet([1, 2.5, None])
+    monkeypatch.setattr(pd.Series, "isin", lambda *args: pytest.fail("isin"))
+    np.testing.assert_array_equal(values.isin_mask(pd.Series([1, 2, 3])), [True, False, False])
+    np.testing.assert_array_equal(values.isin_mask(pd.Series([1, 2.5, np.nan])),
+                                  [True, True, False])
+
+
+@pytest.mark.parametrize("ser", [
+    pd.Series(["b", "a", "b"]),
+    pd.Series(pd.Categorical(["b", None, "b"], categories=["a", "b", "c"])),
+    pd.Series(pd.Categorical([3, 1], categories=[1, 2, 3])),
+])
+def test_observed_values(ser):
+    assert sorted(map(str, observed_values(ser))) == sorted(map(str, ser.unique()))
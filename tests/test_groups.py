@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import bulwark.checks as ck
+import bulwark.decorators as dc
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"g": ["a", "b", "a", "c", "b", None, "c"],
+                         "x": [1., 2., 3., 4., np.nan, np.nan, 4.],
+                         "s": ["p", "q", "p", "r", "q", "z", "r"],
+                         "t": [1, 5, 2, 7, 6, 0, 8]})
+
+
+def _loop(df, by, func, params):
+    bad = []
+    for key, group in df.groupby(by, sort=False):
+        try:
+            func(group, **params)
+        except AssertionError:
+            bad.append(key)
+    return bad
+
+
+@pytest.mark.parametrize("func,params", [
+    (ck.has_no_nans, {}),
+    (ck.has_no_x, {"values": [4.], "columns": ["x"]}),
+    (ck.has_vals_within_range, {"items": {"x": (0, 3)}}),
+    (ck.has_vals_within_set, {"items": {"s": ["p", "q"]}}),
+    (ck.has_set_within_vals, {"items": {"s": ["p"]}}),
+    (ck.unique, {"columns": ["x", "s"]}),
+    (ck.unique, {"columns": ["t"]}),
+    (ck.has_unique_index, {}),
+    (ck.has_unique_key, {"columns": ["s", "x"]}),
+    (ck.has_vals_within_n_std, {"n": 0.5}),
+    (ck.is_monotonic, {"items": {"t": (True, True)}}),
+    (ck.one_to_many, {"unitcol": "s", "manycol": "x"}),
+    (ck.is_shape, {"shape": (2, 4)}),
+    (ck.multi_check, {"checks": {ck.has_no_nans: {}, ck.unique: {"columns": ["t"]}}}),
+    (ck.custom_check, {"check_func": lambda df: ck.is_shape(df, (2, -1))}),
+    (ck.approx_unique, {"columns": ["x", "s"]}),
+    (ck.approx_unique, {"columns": ["t"], "capacity": 1}),
+    (ck.has_approx_unique_index, {}),
+    (ck.has_distinct_count, {"items": {"x": (1, 1)}}),
+    (ck.has_distinct_count, {"items": {"s": (None, 1), "t": (2, None)}}),
+    (ck.none_missing, {"columns": ["x"]}),
+    (ck.within_set, {"items": {"s": ["p", "q"]}}),
+    (ck.within_range, {"items": {"x": (0, 3)}}),
+    (ck.unique_index, {}),
+    (ck.within_n_std, {"n": 0.5}),
+])
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_group_check_matches_loop(df, func, params):
+    expected = _loop(df, "g", func, params)
+    if expected:
+        with pytest.raises(AssertionError) as e:
+            ck.group_check(df, "g", func, **params)
+        assert str(e.value).endswith(str(expected))
+    else:
+        pd.testing.assert_frame_equal(df, ck.group_check(df, "g", func, **params))
+
+
+def test_group_check_formulations(df, monkeypatch):
+    from bulwark import groups
+
+    monkeypatch.setattr(groups, "_per_group", lambda *args: pytest.fail("looped over groups"))
+    for func in [ck.approx_unique, ck.has_approx_unique_index, ck.unique_index]:
+        with pytest.raises(AssertionError):
+            ck.group_check(df.set_index("s"), "g", func)
+    with pytest.raises(AssertionError, match=r"\['b', 'c'\]"):
+        ck.group_check(df, "g", ck.has_distinct_count, items={"x": (2, None)})
+
+
+@pytest.mark.parametrize("func,params,bad", [
+    (ck.has_vals_within_n_std, {"n": 1.1}, [1., 1., 9.]),
+    (ck.is_monotonic, {"strict": True}, [1., 3., 2.]),
+    (ck.unique, {}, [1., 2., 1.]),
+    (ck.approx_unique, {}, [1., 2., 1.]),
+])
+def test_group_check_defaults_skip_group_columns(func, params, bad):
+    df = pd.DataFrame({"g": [1] * 6, "h": [0, 0, 0, 1, 1, 1], "t": [1., 2., 3., 5., 6., 7.]})
+    pd.testing.assert_frame_equal(df, ck.group_check(df, ["g", "h"], func, **params))
+    df.loc[3:, "t"] = bad
+    with pytest.raises(AssertionError, match=r"\[\(1, 1\)\]"):
+        ck.group_check(df, ["g", "h"], func, **params)
+
+
+def test_group_check_decorator(df):
+    result = dc.GroupCheck("g", ck.has_vals_within_range, items={"t": (0, 10)})(lambda d: d)(df)
+    pd.testing.assert_frame_equal(df, result)
+    with pytest.raises(AssertionError, match=r"\['a'\]"):
+        dc.GroupCheck(["g"], ck.is_monotonic, items={"x": (False, False)})(lambda d: d)(df)
+
+
+def test_group_check_row_invariant(df):
+    with pytest.raises(AssertionError):
+        ck.group_check(df, "g", ck.has_columns, columns=["missing"])
+    with pytest.raises(ValueError):
+        ck.group_check(df, "g", ck.is_same_as, df_to_compare=df)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import pandas as pd
+import pytest
+
+import bulwark.checks as ck
+import bulwark.decorators as dc
+from bulwark import metrics
+
+
+@pytest.fixture
+def registry():
+    metrics.registry.clear()
+    yield metrics.registry
+    metrics.disable()
+    metrics.registry.clear()
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"a": [1, 2, 3], "b": [1., None, 3.]})
+
+
+def test_records_only_while_enabled(registry, df):
+    ck.has_no_nans(df, columns=["a"])
+    assert not registry.records
+
+    records = []
+    with metrics.recording(callback=records.append):
+        ck.has_no_nans(df, columns=["a"])
+        with pytest.raises(AssertionError):
+            ck.has_no_nans(df)
+    ck.has_no_nans(df, columns=["a"])
+
+    assert [(r.check, r.rows, r.cells, r.passed) for r in records] == [
+        ("has_no_nans", 3, 6, True), ("has_no_nans", 3, 6, False)]
+    assert list(registry.records) == records
+    stats = registry.stats()["has_no_nans"]
+    assert (stats["calls"], stats["failures"], stats["rows"]) == (2, 1, 6)
+
+
+def test_records_suites_and_decorators(registry, df):
+    @dc.HasNoNans(columns=["a"])
+    @dc.CustomCheck(lambda df: None)
+    def load():
+        return df
+
+    with metrics.recording():
+        load()
+        ck.multi_check(df, {ck.has_no_nans: {"columns": ["a"]}, ck.unique: {}}, fused=False)
+        ck.group_check(df, "a", ck.is_shape, shape=(1, -1))
+
+    checks = [(r.check, r.label) for r in registry.records]
+    assert checks == [
+        ("custom_check:<lambda>", load.__qualname__),
+        ("has_no_nans", load.__qualname__),
+        ("has_no_nans", None), ("unique", None), ("multi_check", None),
+        ("group_check:is_shape", None)]
+    slowest = [s["max_seconds"] for s in registry.slowest(n=2, by="max_seconds")]
+    assert slowest == sorted(s["max_seconds"] for s in registry.stats().values())[:-3:-1]
+    assert len(registry.summary(n=2).splitlines()) == 3
+
+
+def test_failing_callback_warns(registry, df):
+    def callback(record):
+        raise RuntimeError
+
+    with metrics.recording(callback=callback), pytest.warns(UserWarning):
+        ck.unique(df)
+    assert len(registry.records) == 1
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import bulwark.checks as ck
+from bulwark.parquet import parquet_check
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def path(tmp_path):
+    df = pd.DataFrame({"i": np.arange(100),
+                       "f": np.linspace(0, 1, 100),
+                       "s": ["x", "y"] * 50,
+                       "t": pd.date_range("2020-01-01", periods=100)})
+    path = tmp_path / "df.parquet"
+    df.to_parquet(path, row_group_size=25)
+    return path
+
+
+def test_parquet_check_from_metadata(path):
+    report = parquet_check(path, {ck.has_columns: {"columns": ["i", "f", "s", "t"]},
+                                  ck.has_dtypes: {"items": {"i": "int64", "s": object}},
+                                  ck.is_shape: {"shape": (100, 4)},
+                                  ck.has_no_nans: {"columns": ["i", "s", "t"]},
+                                  ck.has_no_infs: {},
+                                  ck.has_no_x: {"values": [-1, 1000], "columns": ["i"]},
+                                  ck.has_vals_within_range: {"items": {"i": (0, 99)}}})
+    assert report["row_groups"] == 4
+    assert report["row_groups_read"] == 0
+    assert report["bytes_read"] == 0
+    assert report["bytes_avoided"] == report["bytes"] > 0
+
+
+def test_parquet_check_reads_inconclusive_chunks(path):
+    # Parquet statistics don't count NaNs, so float columns are read
+    report = parquet_check(path, {ck.has_no_nans: {}})
+    assert report["row_groups_read"] == 4
+    assert 0 < report["bytes_read"] < report["bytes"]
+
+    report = parquet_check(path, {ck.has_vals_within_range: {"items": {"i": (0, 80)}}},
+                           warn=True)
+    assert report["row_groups_read"] == 1
+
+
+def test_parquet_check_failures(path):
+    with pytest.raises(AssertionError) as e:
+        parquet_check(path, {ck.is_shape: {"shape": (99, -1)},
+                             ck.has_vals_within_range: {"items": {"i": (0, 80)}},
+                             ck.unique: {"columns": ["s"]}})
+    msg = str(e.value)
+    assert "Actual shape:   (100, 4)" in msg
+    assert "Row group 3: has_vals_within_range: 19 row(s) of column 'i'" in msg
+    assert "Column 's' contains non-unique values" in msg
+
+
+def test_parquet_check_index_labels(path):
+    with pytest.raises(AssertionError) as e:
+        parquet_check(path, {ck.has_vals_within_range: {"items": {"i": (0, 98)}}})
+    assert "e.g. at index [99]" in str(e.value)
+
+
+@pytest.mark.parametrize("write_statistics", [True, False])
+def test_parquet_check_dtypes_with_nulls(tmp_path, write_statistics):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Integer and boolean columns with nulls, as written by other tools than pandas
+    table = pa.table({"i": pa.array([1, None, 3, 4], pa.int64()),
+                      "b": pa.array([True, None, False, True]),
+                      "j": pa.array([1, 2, 3, 4], pa.int64())})
+    path = tmp_path / "df.parquet"
+    pq.write_table(table, path, row_group_size=2, write_statistics=write_statistics)
+    loaded = pd.read_parquet(path)
+    items = {"i": "float64", "b": object, "j": "int64"}
+    ck.has_dtypes(loaded, items)
+    report = parquet_check(path, {ck.has_dtypes: {"items": items}})
+    assert report["row_groups_read"] == 0
+    assert (report["bytes_read"] == 0) == write_statistics
+    with pytest.raises(AssertionError):
+        parquet_check(path, {ck.has_dtypes: {"items": {"i": "int64"}}})
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import bulwark.checks as ck
+from bulwark.cache import ResultCache
+from bulwark.generic import MAX_BAD_LOCATIONS
+from bulwark.report import SAMPLE_SIZE, ValidationError, ValidationReport
+
+
+def _too_short(df):
+    if len(df) < 1000:
+        raise AssertionError("Too short")
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"a": np.arange(100.), "b": list("xy") * 50},
+                        index=np.arange(100) + 1000)
+
+
+def test_check_reports(df):
+    df.loc[[1001, 1050], "a"] = np.nan
+    with pytest.raises(ValidationError) as e:
+        ck.has_vals_within_range(df, {"a": (0, 10)})
+    violation, = e.value.report
+    assert (violation.check, violation.column, violation.count) == ("has_vals_within_range", "a",
+                                                                    88)
+    assert violation.positions.tolist() == list(range(11, 11 + SAMPLE_SIZE))
+    assert violation.labels.tolist() == list(range(1011, 1011 + SAMPLE_SIZE))
+    assert e.value.args[0] == "Outside range"
+    pd.testing.assert_series_equal(e.value.args[1], df["a"].iloc[11:11 + SAMPLE_SIZE])
+
+    with pytest.raises(ValidationError) as e:
+        ck.has_no_nans(df)
+    assert [(v.column, v.count, v.positions.tolist()) for v in e.value.report] == [
+        ("a", 2, [1, 50])]
+    assert e.value.args == ((1001, "a"), (1050, "a"))
+
+    with pytest.raises(ValidationError) as e:
+        ck.has_vals_within_set(df, {"b": ["x"]})
+    assert str(e.value) == ("has_vals_within_set: 50 row(s) of column 'b' failed, "
+                            "e.g. at index [1001, 1003, 1005, 1007, 1009, 1011, 1013, 1015, "
+                            "1017, 1019]")
+    assert e.value.args[1].index.tolist() == list(range(1001, 1021, 2))
+
+
+def test_cross_row_check_reports():
+    n = 5 * MAX_BAD_LOCATIONS
+    df = pd.DataFrame({"a": np.arange(2 * n) % 3, "b": np.repeat(np.arange(n), 2),
+                       "c": np.tile([0, 1], n)}, index=np.arange(2 * n) // 2)
+    checks = {ck.has_unique_index: {}, ck.is_monotonic: {"items": {"a": (True, False)}},
+              ck.unique: {"columns": ["b"]}, ck.one_to_many: {"unitcol": "c", "manycol": "b"}}
+    with pytest.raises(ValidationError) as e:
+        ck.multi_check(df, checks)
+    report = e.value.report
+    assert report.checks.tolist() == ["has_unique_index", "is_monotonic", "unique",
+                                      "one_to_many"]
+    assert report.columns.tolist() == [None, "a", "b", "b"]
+    assert report.counts.tolist() == [n, 2 * n // 3, n, 2 * n]
+    assert report[0].positions.tolist() == list(range(1, 2 * SAMPLE_SIZE, 2))
+    assert report[1].positions.tolist() == list(range(3, 3 * SAMPLE_SIZE + 1, 3))
+
+    # Only the first MAX_BAD_LOCATIONS failures are listed in the errors' arguments
+    for check, params in checks.items():
+        with pytest.raises(ValidationError) as e:
+            check(df, **params)
+        msg, = e.value.args
+        if check is ck.is_monotonic:
+            assert len(msg) == MAX_BAD_LOCATIONS
+        else:
+            assert len(msg) < 20 * MAX_BAD_LOCATIONS
+    with pytest.raises(ValidationError) as e:
+        ck.has_unique_index(df)
+    assert str(e.value) == "Index contains non-unique values: {}".format(
+        list(range(MAX_BAD_LOCATIONS)))
+
+
+def test_validation_error_formats_lazily(df, monkeypatch):
+    report = ValidationReport.from_columns("check", df.index, [("a", 1, np.array([0]))])
+    monkeypatch.setattr(ValidationReport, "__str__", lambda self: pytest.fail("formatted"))
+    error = ValidationError(report=report)
+    monkeypatch.undo()
+    assert error.args == ("check: 1 row(s) of column 'a' failed, e.g. at index [1000]",)
+    error.args = ("changed",)
+    assert error.args == ("changed",)
+
+
+def test_multi_check_report(df):
+    checks = {ck.has_vals_within_set: {"items": {"b": ["x"]}},
+              ck.custom_check: {"check_func": _too_short},
+              ck.has_vals_within_range: {"items": {"a": (0, 98)}}}
+    with pytest.raises(ValidationError) as e:
+        ck.multi_check(df, checks)
+    report = e.value.report
+    assert len(report) == 3
+    assert report.checks.tolist() == ["has_vals_within_set", "custom_check",
+                                      "has_vals_within_range"]
+    assert report.counts.tolist() == [50, -1, 1]
+    assert report[-1].labels.tolist() == [1099]
+    assert str(report[1]) == "_too_short is not true."
+    assert e.value.args == (str(report),)
+    assert str(e.value).splitlines()[1:] == [
+        "_too_short is not true.",
+        "has_vals_within_range: 1 row(s) of column 'a' failed, e.g. at index [1099]"]
+    assert report.to_dict()[1] == {"check": "custom_check", "column": None, "count": -1,
+                                   "positions": [], "labels": [],
+                                   "message": "_too_short is not true."}
+
+    error = pickle.loads(pickle.dumps(e.value))
+    assert isinstance(error, ValidationError)
+    assert str(error) == str(e.value)
+    assert error.report.offsets.tolist() == report.offsets.tolist() == [0, 10, 10, 11]
+
+
+def test_cached_errors_keep_reports(df):
+    cache = ResultCache()
+    for _ in range(2):
+        with pytest.raises(ValidationError) as e:
+            cache.call(ck.has_vals_within_range, df, {"items": {"a": (0, 98)}})
+        assert e.value.report.counts.tolist() == [1]
+
+
+def test_empty_report():
+    report = ValidationReport.concat([])
+    assert len(report) == 0
+    assert str(report) == ""
+    with pytest.raises(IndexError):
+        report[0]
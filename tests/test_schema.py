@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import bulwark.checks as ck
+from bulwark.generic import ValueSet
+from bulwark.schema import Schema
+
+SPEC = {"checks": [{"check": "has_columns", "columns": ["g", "a", "t"]},
+                   {"check": "has_no_nans", "columns": ["a"]},
+                   {"check": "has_vals_within_range",
+                    "items": {"a": [0, 10.0], "t": ["2020-01-01", "2020-12-31"]}},
+                   {"check": "has_vals_within_set", "items": {"g": ["x", "y"]}},
+                   {"check": "is_shape", "shape": [-1, 3]},
+                   {"check": "group_check", "by": "g", "func": "is_monotonic",
+                    "items": {"a": [True, False]}}]}
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"g": ["x", "y", "x", "y"],
+                         "a": [1, 2, 3, 4],
+                         "t": pd.date_range("2020-01-01", periods=4)})
+
+
+def _all_checks_fail(df):
+    return df.assign(g=["x", "z", "x", "y"], a=[1, np.nan, 0, 40])
+
+
+def test_schema_matches_multi_check(df):
+    schema = Schema.from_dict(SPEC)
+    assert schema.validate(df) is df
+
+    bad = _all_checks_fail(df)
+    with pytest.raises(AssertionError) as e:
+        schema.validate(bad)
+    msg = str(e.value)
+    assert e.value.args == (msg,)
+    assert len(e.value.report) >= 4
+    assert msg.count("\n") >= 3
+    assert "is_monotonic failed for 1 group(s) of g: ['x']" in msg
+
+
+def test_schema_round_trip():
+    schema = Schema.from_dict(SPEC)
+    assert Schema.from_json(schema.to_json()).to_dict() == SPEC
+    assert Schema.from_yaml(schema.to_yaml()).to_dict() == SPEC
+    assert Schema({ck.has_no_nans: {}}).to_dict() == {"checks": [{"check": "has_no_nans"}]}
+
+
+def test_schema_compiles_once(df):
+    schema = Schema.from_dict(SPEC)
+    assert isinstance(schema.checks[3][1]["items"]["g"], ValueSet)
+
+    plan = schema.plan(df)
+    assert schema.plan(df.copy()) is plan
+    bounds = plan[2][1]["items"]
+    assert bounds == {"a": (0, 10), "t": (pd.Timestamp("2020-01-01"), pd.Timestamp("2020-12-31"))}
+    assert isinstance(plan[2][1]["items"]["a"][1], int)
+    assert schema.plan(df.astype({"a": float})) is not plan
+
+
+def test_schema_custom_check(df):
+    schema = Schema([{"check": "custom_check",
+                      "check_func": "bulwark.checks.has_unique_index"}])
+    schema.validate(df)
+    with pytest.raises(AssertionError, match="has_unique_index is not true."):
+        schema.validate(df.set_index("g"))
+
+
+@pytest.mark.parametrize("checks", [
+    [{"check": "not_a_check"}],
+    [{"check": "has_no_nans", "column": ["a"]}],
+    [{"check": "is_same_as", "df_to_compare": None}],
+])
+def test_schema_rejects_invalid_checks(checks):
+    with pytest.raises(ValueError):
+        Schema(checks)
+
+
+def test_schema_round_trip_python_values(df):
+    schema = Schema({ck.has_vals_within_set: {"items": {"g": {"y", "x"}}},
+                     ck.is_shape: {"shape": (-1, 3)},
+                     ck.custom_check: {"check_func": ck.has_unique_index}})
+    expected = {"checks": [{"check": "has_vals_within_set", "items": {"g": ["x", "y"]}},
+                           {"check": "is_shape", "shape": [-1, 3]},
+                           {"check": "custom_check", "check_func": "has_unique_index"}]}
+    assert schema.to_dict() == expected
+    for loaded in [Schema.from_json(schema.to_json()), Schema.from_yaml(schema.to_yaml())]:
+        assert loaded.to_dict() == expected
+        loaded.validate(df)
+        with pytest.raises(AssertionError):
+            loaded.validate(df.assign(g=["x", "z", "x", "y"]))
+
+
+def test_schema_rejects_unimportable_functions(df):
+    schema = Schema({ck.custom_check: {"check_func": lambda df: True}})
+    schema.validate(df)
+    with pytest.raises(ValueError, match="can't be imported"):
+        schema.to_json()
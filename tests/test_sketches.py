@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bulwark.sketches import BloomFilter, HyperLogLog, duplicated_values, hash_values
+
+
+@pytest.mark.parametrize("values", [
+    pd.Series([1., 2., 3.]),
+    pd.Series([1, 2, 3], dtype=np.int8),
+    pd.Series([1, 2, 3], dtype=np.uint64),
+    pd.Series([1, 2.0, np.int16(3)], dtype=object),
+    pd.Series([1, 2, 3], dtype="Int64"),
+    pd.Series(pd.Categorical([1., 2., 3.])),
+    pd.Index([1, 2, 3]),
+])
+def test_hash_values_numbers(values):
+    expected, _ = hash_values(pd.Series([1, 2, 3]))
+    hashes, notnull = hash_values(values)
+    assert hashes.tolist() == expected.tolist()
+    assert notnull.all()
+
+
+def test_hash_values():
+    hashes, notnull = hash_values(pd.Series([1.5, np.nan, "1", 1, None, (1, 2)]))
+    assert notnull.tolist() == [True, False, True, True, False, True]
+    assert len(set(hashes.tolist())) == 4
+    assert hashes[0] == hash_values(pd.Series([1.5]))[0][0]
+    assert hashes[1] == hash_values(pd.Series(["1"]))[0][0]
+
+
+@pytest.mark.parametrize("error_rate", [0.01, 0.001])
+def test_bloom_filter(error_rate):
+    bloom = BloomFilter(10000, error_rate)
+    assert not bloom.add(pd.Series(np.arange(10000))).any()
+    assert bloom.contains(pd.Series(np.arange(10000))).all()
+    assert bloom.contains(pd.Series(np.arange(10000, 30000))).mean() < 2 * error_rate
+
+    low, high = bloom.bounds()
+    assert low <= 10000 <= high
+    assert bloom.n_new == 10000
+
+
+def test_bloom_filter_add():
+    bloom = BloomFilter(100)
+    values = pd.Index(["x", None, "y", "x", np.nan, "x"])
+    assert bloom.add(values).tolist() == [False, False, False, True, False, True]
+    assert bloom.add(pd.Series(["y", "z"])).tolist() == [True, False]
+    assert bloom.n_new == 3
+
+
+def test_bloom_filter_merge():
+    left, right = BloomFilter(1000), BloomFilter(1000)
+    left.add(pd.Series(np.arange(500)))
+    right.add(pd.Series(np.arange(500, 1000)))
+    merged = pickle.loads(pickle.dumps(left)).merge(right)
+    assert merged.contains(pd.Series(np.arange(1000))).all()
+    assert merged.n_new == 1000
+
+    with pytest.raises(ValueError):
+        left.merge(BloomFilter(2000))
+
+
+@pytest.mark.parametrize("n", [0, 10, 1000, 100000])
+def test_hyperloglog(n):
+    sketch = HyperLogLog(0.01)
+    sketch.add(pd.Series(np.arange(n, dtype=float)))
+    sketch.add(pd.Series([np.nan, 0.]))
+    low, high = sketch.bounds()
+    assert low <= max(n, 1) <= high
+    assert abs(sketch.count() - max(n, 1)) <= 4 * sketch.error_rate * max(n, 1)
+
+
+def test_hyperloglog_merge():
+    left, right = HyperLogLog(0.02), HyperLogLog(0.02)
+    left.add(pd.Series(["a{}".format(i) for i in range(60000)]))
+    right.add(pd.Series(["a{}".format(i) for i in range(40000, 100000)]))
+    merged = pickle.loads(pickle.dumps(left)).merge(right)
+    low, high = merged.bounds()
+    assert low <= 100000 <= high
+
+    with pytest.raises(ValueError):
+        left.merge(HyperLogLog(0.01))
+
+
+def test_duplicated_values():
+    values = pd.Series([1, "1", None, np.nan, 2, 2.0, 3, 3, 3])
+    assert duplicated_values(values, error_rate=0.5).tolist()[:2] == [2, 3]
+    assert pd.isna(duplicated_values(values)[-1])
+    assert not len(duplicated_values(pd.Index(np.arange(1000)), error_rate=0.5, capacity=10))
+    values = pd.Series([2, 2.0, True, np.int8(1), "2.0", (1, "x"), (1, "x")])
+    assert duplicated_values(values).tolist() == [2, True, (1, "x")]
+    index = pd.MultiIndex.from_tuples([(1, "x"), (2, "x"), (1, "x")])
+    assert duplicated_values(index).tolist() == [(1, "x")]
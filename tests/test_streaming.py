@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import bulwark.checks as ck
+from bulwark.streaming import SeenValues, StreamValidator, stream_check
+
+
+def _chunks(df, size):
+    return [df.iloc[i:i + size] for i in range(0, len(df), size)]
+
+
+def test_stream_check_passes():
+    df = pd.DataFrame({"a": np.arange(10), "b": np.linspace(0, 1, 10), "c": list("xyzxyzxyzx")})
+    checks = {ck.has_no_nans: {},
+              ck.unique: {"columns": ["a", "b"]},
+              ck.has_unique_index: {},
+              ck.has_unique_key: {"columns": ["a", "c"]},
+              ck.is_monotonic: {"items": {"a": (True, True), "b": (None, False)}},
+              ck.has_set_within_vals: {"items": {"c": ["x", "z"]}},
+              ck.has_vals_within_n_std: {"n": 3},
+              ck.one_to_many: {"unitcol": "c", "manycol": "a"},
+              ck.is_shape: {"shape": (10, 3)},
+              ck.approx_unique: {"columns": ["a", "b"], "capacity": 100},
+              ck.has_approx_unique_index: {"capacity": 100},
+              ck.has_distinct_count: {"items": {"c": (3, 3)}}}
+    assert stream_check(_chunks(df, 3), checks) == 4
+
+
+@pytest.mark.parametrize("checks,df", [
+    ({ck.unique: {"columns": ["a"]}}, pd.DataFrame({"a": [1, 2, 3, 1]})),
+    ({ck.unique: {"columns": ["a"]}}, pd.DataFrame({"a": ["x", "y", "z", "x"]})),
+    ({ck.unique: {"columns": ["a"]}}, pd.DataFrame({"a": [1, np.nan, 3, np.nan]})),
+    ({ck.has_unique_index: {}}, pd.DataFrame({"a": [1, 2, 3, 4]}, index=[0, 1, 2, 0])),
+    ({ck.has_unique_key: {"columns": ["a", "b"]}},
+     pd.DataFrame({"a": [1, 1, 2, 1], "b": ["x", "y", "x", "x"]})),
+    ({ck.is_monotonic: {"increasing": True}}, pd.DataFrame({"a": [1, 2, 1, 3]})),
+    ({ck.is_monotonic: {"strict": True}}, pd.DataFrame({"a": [1, 2, 2, 3]})),
+    ({ck.is_monotonic: {"increasing": True}},
+     pd.DataFrame({"a": pd.array([1, 2, pd.NA, 3, 2], dtype="Int64")})),
+    ({ck.has_set_within_vals: {"items": {"a": [1, 5]}}}, pd.DataFrame({"a": [1, 2, 3, 4]})),
+    ({ck.has_vals_within_n_std: {"n": 1}}, pd.DataFrame({"a": [1., 1, 1, 9]})),
+    ({ck.one_to_many: {"unitcol": "u", "manycol": "m"}},
+     pd.DataFrame({"m": ["a", "b", "a", "b"], "u": [1, 2, 1, 3]})),
+    ({ck.is_shape: {"shape": (3, -1)}}, pd.DataFrame({"a": [1, 2, 3, 4]})),
+    ({ck.has_no_nans: {}}, pd.DataFrame({"a": [1, 2, 3, np.nan]})),
+    ({ck.approx_unique: {"capacity": 100}}, pd.DataFrame({"a": [1, 1, 2, 3]})),
+    ({ck.approx_unique: {"capacity": 100}}, pd.DataFrame({"a": [1, 2, 1, 3, 1]})),
+    ({ck.has_approx_unique_index: {"capacity": 100}},
+     pd.DataFrame({"a": [1, 2, 3, 4]}, index=[0, 0, 1, 2])),
+    ({ck.has_distinct_count: {"items": {"a": (5, None)}}}, pd.DataFrame({"a": [1, 2, 3, 4]})),
+    ({ck.group_check: {"by": "g", "func": ck.has_no_nans}},
+     pd.DataFrame({"g": ["a", "b", "a", "b"], "v": [1, 2, np.nan, 3]})),
+    ({ck.within_n_std: {"n": 1}}, pd.DataFrame({"a": [1., 1, 1, 9]})),
+])
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_stream_check_matches_whole_frame(checks, df):
+    with pytest.raises(AssertionError):
+        ck.multi_check(df, checks)
+    with pytest.raises(AssertionError):
+        stream_check(_chunks(df, 2), checks)
+
+
+@pytest.mark.parametrize("df", [
+    pd.DataFrame({"m": ["a", np.nan, "b", np.nan], "u": [1, 2, 3, 4]}),
+    pd.DataFrame({"m": ["a", "b", "a", "b"], "u": [1, np.nan, np.nan, np.nan]}),
+    pd.DataFrame({"m": ["a", "b", "c", "a"], "u": [np.nan, 2, 3, np.nan]}),
+    pd.DataFrame({"m": ["a", "b", "a"], "u": [np.nan, 2, 1]}),
+])
+def test_one_to_many_nulls_match_whole_frame(df):
+    checks = {ck.one_to_many: {"unitcol": "u", "manycol": "m"}}
+    try:
+        ck.one_to_many(df, "u", "m")
+        failed = False
+    except AssertionError:
+        failed = True
+    for size in [1, 2]:
+        if failed:
+            with pytest.raises(AssertionError):
+                stream_check(_chunks(df, size), checks)
+        else:
+            stream_check(_chunks(df, size), checks)
+
+
+@pytest.mark.parametrize("params", [
+    {"increasing": True, "strict": True},
+    {"increasing": None},
+    {"items": {"t": (False, False)}},
+])
+@pytest.mark.parametrize("df", [
+    pd.DataFrame({"s": list("abab") * 3, "t": np.arange(12) // 2}),
+    pd.DataFrame({"s": list("abab") * 3, "t": [0, 5, 1, 4, 2, 3, 3, 2, 4, 1, 5, 0]}),
+    pd.DataFrame({"s": ["a", "b", np.nan, "a", "b", "a"], "t": [1, 2, 0, 1, 3, np.nan]}),
+    pd.DataFrame({"s": list("aabb") * 3, "t": [1, 2, 1, 2] * 3}),
+])
+def test_is_monotonic_by_matches_whole_frame(df, params):
+    checks = {ck.is_monotonic: dict(params, by="s")}
+    try:
+        ck.is_monotonic(df, **checks[ck.is_monotonic])
+        failed = False
+    except AssertionError:
+        failed = True
+    for size in [1, 2, 5]:
+        validator = StreamValidator(checks)
+        if failed:
+            with pytest.raises(AssertionError):
+                list(validator.validate(_chunks(df, size)))
+        else:
+            list(validator.validate(_chunks(df, size)))
+
+
+def test_stream_validator_is_lazy():
+    df = pd.DataFrame({"a": [1, 2, 3, 1]})
+    validator = StreamValidator({ck.unique: {}})
+    chunks = validator.validate(_chunks(df, 2))
+    pd.testing.assert_frame_equal(next(chunks), df.iloc[:2])
+    pd.testing.assert_frame_equal(next(chunks), df.iloc[2:])
+    with pytest.raises(AssertionError):
+        next(chunks)
+
+
+@pytest.mark.parametrize("checks,df", [
+    ({ck.group_check: {"by": "g", "func": ck.unique, "columns": ["v"]}},
+     pd.DataFrame({"g": ["a", "b", "a", "b"], "v": [1, 2, 1, 3]})),
+    ({ck.group_check: {"by": ["g", "h"], "func": ck.is_monotonic, "increasing": True}},
+     pd.DataFrame({"g": ["a", "b", "a", "b"], "h": 1, "v": [2, 1, 1, 2]})),
+    ({ck.group_check: {"by": "g", "func": ck.multi_check,
+                       "checks": {ck.unique: {"columns": ["v"]}}}},
+     pd.DataFrame({"g": ["a", "b", "a", "b"], "v": [1, 2, 1, 3]})),
+    ({ck.multi_check: {"checks": {ck.unique: {}}}}, pd.DataFrame({"a": [1, 2, 3, 1]})),
+    ({ck.multi_check: {"checks": {ck.multi_check: {"checks": {ck.has_unique_index: {}}}}}},
+     pd.DataFrame({"a": [1, 2, 3, 4]}, index=[0, 1, 2, 0])),
+    ({ck.unique_index: {}}, pd.DataFrame({"a": [1, 2, 3, 4]}, index=[0, 1, 2, 0])),
+])
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_nested_checks_match_whole_frame(checks, df):
+    with pytest.raises(AssertionError) as expected:
+        ck.multi_check(df, checks)
+    # Each chunk passes on its own
+    for chunk in _chunks(df, 2):
+        ck.multi_check(chunk, checks)
+    with pytest.raises(AssertionError) as e:
+        stream_check(_chunks(df, 2), checks)
+    if ck.group_check in checks:
+        assert str(e.value) == str(expected.value)
+    assert stream_check(_chunks(df.iloc[:2], 1), checks) == 2
+
+
+def test_group_check_merge():
+    df = pd.DataFrame({"g": ["a", "b", "a", "b", np.nan], "v": [1, 2, 3, 2, 2]})
+    checks = {ck.group_check: {"by": "g", "func": ck.unique, "columns": ["v"]}}
+    validators = [StreamValidator(checks) for _ in range(2)]
+    validators[0].update(df.iloc[:2])
+    validators[1].update(df.iloc[2:])
+    with pytest.raises(AssertionError, match=r"unique failed for 1 group\(s\) of g: \['b'\]"):
+        validators[0].merge(validators[1]).finalize()
+
+
+def test_multi_check_warn(capsys):
+    checks = {ck.multi_check: {"checks": {ck.unique: {}}, "warn": True}}
+    assert stream_check(_chunks(pd.DataFrame({"a": [1, 2, 1]}), 2), checks) == 2
+    assert "non-unique" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("checks", [
+    {ck.is_same_as: {"df_to_compare": pd.DataFrame()}},
+    {ck.custom_check: {"check_func": lambda df: True}},
+    {lambda df: df: {}},
+    {ck.group_check: {"by": "g", "func": ck.custom_check, "check_func": lambda df: True}},
+    {ck.multi_check: {"checks": {ck.is_same_as: {"df_to_compare": pd.DataFrame()}}}},
+])
+def test_stream_validator_rejects_unstreamable_checks(checks):
+    with pytest.raises(ValueError, match="can't be validated chunk-by-chunk"):
+        StreamValidator(checks)
+
+
+def test_approx_unique_confirm():
+    df = pd.DataFrame({"a": np.arange(20000), "b": np.arange(20000.)},
+                      index=np.arange(20000) % 19999)
+    df.loc[19000, "b"] = 5
+    checks = {ck.approx_unique: {"error_rate": 0.2, "capacity": 2000},
+              ck.has_approx_unique_index: {"error_rate": 0.2, "capacity": 2000}}
+    validator = StreamValidator(checks)
+    # Values flagged by the overfull filters don't fail, without being seen twice
+    with pytest.warns(UserWarning) as record:
+        for _ in validator.validate(_chunks(df, 1000)):
+            pass
+    msgs = [str(w.message) for w in record]
+    assert any(msg.startswith("Column 'a' may contain non-unique values") for msg in msgs)
+    assert any(msg.startswith("Column 'b' may contain non-unique values") for msg in msgs)
+    assert any(msg.startswith("Index may contain non-unique values") for msg in msgs)
+
+    with pytest.raises(AssertionError) as e:
+        validator.confirm(_chunks(df, 1000))
+    assert str(e.value) == ("Column 'b' contains non-unique values: [5.0]\n"
+                            "Index contains non-unique values: [0]")
+    assert not validator.unconfirmed()
+
+
+def test_approx_unique_counts_flagged_values():
+    # 3 is only flagged in the second chunk, and then seen again in the third
+    chunks = [pd.DataFrame({"a": [1, 2, 3]}), pd.DataFrame({"a": [3.0, np.nan, 5.0]}),
+              pd.DataFrame({"a": [6, 3]})]
+    checks = {ck.approx_unique: {"capacity": 100}}
+    with pytest.warns(UserWarning, match=r"1 value\(s\) were probably seen before"):
+        stream_check(chunks[:2], checks)
+    with pytest.raises(AssertionError, match=r"non-unique values: \[3.0\]"):
+        stream_check(chunks, checks)
+
+    validator = StreamValidator(checks)
+    for chunk in chunks[:2]:
+        validator.update(chunk)
+    with pytest.raises(AssertionError, match=r"non-unique values: \[3"):
+        validator.confirm(chunks[:2])
+
+
+def test_approx_unique_mergeable_counts_exactly(recwarn):
+    df = pd.DataFrame({"a": np.arange(20000)}, index=np.arange(20000) % 19999)
+    checks = {ck.approx_unique: {"error_rate": 0.2, "capacity": 2000},
+              ck.has_approx_unique_index: {"error_rate": 0.2, "capacity": 2000}}
+    validator = StreamValidator(checks, mergeable=True)
+    with pytest.raises(AssertionError) as e:
+        for _ in validator.validate(_chunks(df, 1000)):
+            pass
+    # Despite the overfull filters, there's no warning, and only the repeat fails
+    assert str(e.value) == "Index contains non-unique values: [0]"
+    assert not [w for w in recwarn if issubclass(w.category, UserWarning)]
+
+    validator = StreamValidator({ck.approx_unique: {"capacity": 100}}, mergeable=True)
+    with pytest.raises(AssertionError, match=r"non-unique values: \[3\]"):
+        for _ in validator.validate([pd.DataFrame({"a": [1, 2, 3]}),
+                                     pd.DataFrame({"a": [3, 4]})]):
+            pass
+
+
+@pytest.mark.parametrize("mergeable", [False, True])
+def test_approx_unique_merge(mergeable):
+    def validate(values):
+        validator = StreamValidator({ck.approx_unique: {"capacity": 20000}},
+                                    mergeable=mergeable)
+        validator.update(pd.DataFrame({"a": values}))
+        return validator
+
+    merged = validate(np.arange(5000)).merge(validate(np.arange(5000, 9000)))
+    merged.finalize()
+
+    merged = validate(np.arange(5000)).merge(validate(np.arange(4000, 9000)))
+    chunks = [pd.DataFrame({"a": np.arange(5000)}), pd.DataFrame({"a": np.arange(4000, 9000)})]
+    if mergeable:
+        assert re.search(r"\d{4} value\(s\) were probably seen before", merged.unconfirmed()[0])
+        with pytest.raises(AssertionError, match=r"non-unique values: \[4000, 4001,"):
+            merged.confirm(chunks)
+    else:
+        # Repeats across validators that didn't keep their hashes can only be estimated
+        with pytest.warns(UserWarning, match=r"Column 'a' may contain about \d+ value"):
+            merged.confirm(chunks)
+
+
+def test_seen_values():
+    seen = SeenValues()
+    for i in range(16):
+        assert not len(seen.add(pd.Series(np.arange(i * 10, i * 10 + 10))))
+    assert len(seen._runs) == 1
+    assert seen.add(pd.Series([5, 200, 200])).tolist() == [5, 200]